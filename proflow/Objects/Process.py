@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Callable, List, Tuple
+from typing import Callable, List, Tuple, Union
 from enum import Enum
 import dill as pickle
 
@@ -45,6 +45,7 @@ class Process:
             The type of process. Acts as a switch to decide how we run it
         gate: bool
             if false we skip the process
+            in `run_processes_batch` this can be a boolean mask over the batch
         comment: string
             a comment to display on logs and errors
         group: string
@@ -66,6 +67,20 @@ class Process:
         format_output: Callable
             If true then we use old system(SLOW!) to map the output string
             to the state (can then use special characters)
+        vectorized: bool
+            If true the function accepts arrays with a leading batch dimension and is called
+            once for the whole batch in `ProcessRunner.run_processes_batch`
+        pure: bool
+            If true the result only depends on the config, parameters and additional inputs
+            so the process can be hoisted out of the row loop (see `ProcessRunner.compile`).
+            If None this is detected from the process having no external state inputs.
+            Processes with state inputs are never hoisted
+        cache: Union[bool, int, CacheSettings]
+            If set the results are memoized on the input values in a bounded LRU.
+            Can be True, the maximum cache size or a `proflow.process_cache.CacheSettings`
+        disk_cache: bool
+            If true the results are stored in the runner's `DiskCache` and reused across runs.
+            Only use for deterministic processes
 
     """
     func: Callable[[Model_State_Shape],
@@ -89,6 +104,10 @@ class Process:
     state_outputs: Callable[[any], List[Tuple]] = field(default_factory=GET_INPUT_FACTORY)
     args: List[any] = field(default_factory=list)  # additional args
     format_output: bool = False  # If true we process the target output string
+    vectorized: bool = False  # If true the func is called once per batch
+    pure: bool = None  # If true the result is the same every row
+    cache: Union[bool, int, 'CacheSettings'] = None  # noqa: F821 memoize results
+    disk_cache: bool = False  # If true results are stored on disk
 
     def __repr__(self) -> str:
         return 'Process(' + '; '.join([
@@ -146,6 +165,10 @@ class Process:
             'state_inputs': pickle.dumps(getattr(self, "state_inputs", None)),
             'state_outputs': pickle.dumps(getattr(self, "state_outputs", None)),
             'args': getattr(self, 'args', None),
+            'vectorized': getattr(self, 'vectorized', False),
+            'pure': getattr(self, 'pure', None),
+            'cache': pickle.dumps(getattr(self, 'cache', None)),
+            'disk_cache': getattr(self, 'disk_cache', False),
         }
 
     def __setstate__(self, state):
@@ -153,7 +176,7 @@ class Process:
         for key, value in state.items():
             if key in ["func", "config_inputs", "parameters_inputs", "external_state_inputs",
                        "additional_inputs", "state_inputs",
-                       "state_outputs"]:
+                       "state_outputs", "cache"]:
                 v = pickle.loads(value)
                 setattr(self, key, v)
             else:
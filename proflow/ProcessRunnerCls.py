@@ -1,17 +1,29 @@
 from copy import deepcopy
 from datetime import datetime
+from time import perf_counter_ns
 from functools import partial, reduce
 from proflow.internal_state import Model_State_Shape
 from proflow.TimeManager import TimeManager, TimeScale
 from proflow.process_state_modifiers import map_result_to_state_fn
 from proflow.process_ins_and_outs import get_inputs_from_process, map_result_to_state
-from typing import Callable, List, NamedTuple
+from proflow.process_compiler import compile_processes
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Tuple
 
 from .parameters import Parameters_Shape
 from .external_state import External_State_Shape
 from .config import Config_Shape
 from .Objects.Process import Process, ProcessType
 from .errors import Run_Process_Error
+from .logger import ColumnarLogs
+from .log_sinks import LogSink
+from .profiler import ProcessIdCache, ProcessStats
+from .batch import run_processes_batch
+from .scheduler import ParallelScheduler
+from .process_cache import CacheInfo, ProcessCaches
+from .disk_cache import DiskCache
+from .checkpoint import AutoCheckpoint, restore_runner_checkpoint, save_runner_checkpoint
+from .fork import CopyOnWrite, fork_runner
+from .incremental import Baseline, get_dirty_processes, run_recorded
 
 
 class ProcessRunner():
@@ -24,21 +36,42 @@ class ProcessRunner():
                  DEBUG_MODE: bool = False,
                  IMMUTABLE_MODE: bool = False,
                  row_per: TimeScale = TimeScale.HOUR,
+                 COLUMNAR_LOGS: bool = False,
+                 log_sink: LogSink = None,
+                 PROFILE_MODE: bool = False,
+                 profile_sample_rate: float = 1.0,
+                 disk_cache: DiskCache = None,
                  ):
         self.config = config_in
         self.parameters = parameters_in
         self.external_state = external_state_in
         self.DEBUG_MODE = DEBUG_MODE
         self.IMMUTABLE_MODE = IMMUTABLE_MODE
-        self.state_logs = [{}]
+        self.COLUMNAR_LOGS = COLUMNAR_LOGS
+        self.state_logs = ColumnarLogs() if COLUMNAR_LOGS else [{}]
+        self.log_sink = log_sink
+        self.PROFILE_MODE = PROFILE_MODE
+        if not 0 < profile_sample_rate <= 1:
+            raise ValueError('profile_sample_rate must be in the range (0, 1]')
+        # Profile every nth call to each standard process
+        self.profile_sample_interval = max(1, round(1 / profile_sample_rate))
+        self.process_stats: Dict[str, ProcessStats] = {}
+        self._get_process_id = ProcessIdCache()
+        self.process_caches = ProcessCaches()
+        self.disk_cache = disk_cache
+        self.baseline: Baseline = None
+        # Set by `fork` when the state is shared with another runner
+        self.copy_on_write: CopyOnWrite = None
         self.time_logs = []
         self.debug_time_logs = []
         self.tm = TimeManager(row_per=row_per)
+        self.current_state = None
 
     def reset(self):
-        self.state_logs = [{}]
+        self.state_logs = ColumnarLogs() if self.COLUMNAR_LOGS else [{}]
         self.time_logs = []
         self.debug_time_logs = []
+        self.process_stats = {}
         self.tm = TimeManager(row_per=self.tm.row_per)
 
     # Define the process runner
@@ -66,6 +99,251 @@ class ProcessRunner():
         which can then be ran later with the state"""
         return partial(self.run_processes, processes)
 
+    def compile(
+        self,
+        processes: List[Process],
+        hoist_invariants: bool = False,
+    ) -> Callable[[NamedTuple], NamedTuple]:
+        """Compile the processes into a single step function.
+
+        Equivalent to `initialize_processes` but the process type, mode flags and gates are
+        resolved once and the input assembly for each process is inlined.
+        If hoist_invariants is True processes that do not depend on the state or external state
+        are only ran once. See `proflow.process_compiler.compile_processes`.
+
+        Example:
+        ```
+        step = process_runner.compile(processes)
+        for _ in range(row_count):
+            state = step(state)
+        ```
+        """
+        return compile_processes(self, processes, hoist_invariants)
+
+    def schedule(
+        self,
+        processes: List[Process],
+        max_workers: int = None,
+    ) -> 'ParallelScheduler':
+        """Get a step function that runs independent processes concurrently on a thread pool.
+
+        The processes are grouped by the state paths they read and write.
+        See `proflow.scheduler.ParallelScheduler`.
+        """
+        return ParallelScheduler(self, processes, max_workers)
+
+    def run_timeseries(
+        self,
+        processes: List[Process],
+        initial_state: NamedTuple = None,
+        n_rows: int = None,
+        row_range: Tuple[int, int] = None,
+        hoist_invariants: bool = False,
+        checkpoint: AutoCheckpoint = None,
+    ) -> NamedTuple:
+        """Run the processes once per row and advance the time manager after each row.
+
+        The processes are compiled once and the same step function is reused for every row.
+        The processes should not include `advance_time_step_process` as the time manager is
+        advanced by the row loop.
+
+        Parameters
+        ----------
+        processes : List[Process]
+            The processes to run for each row
+        initial_state : NamedTuple, optional
+            The state at the start of the first row, by default the current state
+        n_rows : int, optional
+            The number of rows to run from the current time manager row
+        row_range : Tuple[int, int], optional
+            The (start, end) rows to run. End is exclusive.
+            Allows a long external state to be processed in chunks.
+            If the time manager is behind start it is advanced to start.
+        hoist_invariants : bool, optional
+            If True processes that do not depend on the state or external state are ran once
+            at the start of the run instead of every row, by default False
+        checkpoint : AutoCheckpoint, optional
+            If set a checkpoint is saved every `checkpoint.every_n_rows` rows
+
+        Returns
+        -------
+        NamedTuple
+            The state after the final row
+
+        Raises
+        ------
+        ValueError
+            If neither n_rows or row_range is set
+            or the time manager has already passed the start row
+
+        Example:
+        ```
+        state = process_runner.run_timeseries(processes, initial_state, row_range=(0, 24))
+        state = process_runner.run_timeseries(processes, state, row_range=(24, 48))
+        ```
+        """
+        if row_range is None and n_rows is None:
+            raise ValueError('Must set n_rows or row_range')
+        start, end = row_range if row_range is not None \
+            else (self.tm.row_index, self.tm.row_index + n_rows)
+        if start < self.tm.row_index:
+            raise ValueError(
+                f'Cannot start at row {start}. Time manager is at row {self.tm.row_index}')
+        if start > self.tm.row_index:
+            self.tm.advance_row(start - self.tm.row_index)
+
+        state = initial_state if initial_state is not None else self.current_state
+        if self.COLUMNAR_LOGS:
+            self.state_logs.reserve(end)
+        step = self.compile(processes, hoist_invariants)
+        advance_row = self.tm.advance_row
+        if checkpoint is None:
+            for _ in range(start, end):
+                state = step(state)
+                advance_row()
+        else:
+            for _ in range(start, end):
+                state = step(state)
+                advance_row()
+                self.current_state = state
+                checkpoint.on_row_end(self)
+        if self.log_sink is not None:
+            self.log_sink.flush()
+        self.current_state = state
+        return state
+
+    def record_baseline(
+        self,
+        processes: List[Process],
+        initial_state: NamedTuple = None,
+        n_rows: int = None,
+    ) -> NamedTuple:
+        """Run the processes for n_rows like `run_timeseries` and record each process result.
+
+        The recorded run can then be partially ran again with `rerun`.
+        See `proflow.incremental`.
+
+        Returns
+        -------
+        NamedTuple
+            The state after the final row
+        """
+        if n_rows is None:
+            raise ValueError('Must set n_rows')
+        initial_state = initial_state if initial_state is not None else self.current_state
+        self.baseline = Baseline(
+            processes, deepcopy(initial_state), deepcopy(self.tm), n_rows)
+        if self.log_sink is not None:
+            self.log_sink.flush()
+            self.baseline.log_position = self.log_sink.get_position()
+        if self.COLUMNAR_LOGS:
+            self.state_logs.reserve(self.tm.row_index + n_rows)
+        return run_recorded(self, self.baseline)
+
+    def rerun(self, changed_paths: List[str]) -> NamedTuple:
+        """Run the recorded baseline again after changing the config or parameters.
+
+        Only the processes affected by the changed paths are called.
+        The other processes reuse their recorded results.
+
+        Parameters
+        ----------
+        changed_paths : List[str]
+            Dot notation paths starting with config or parameters e.g. "config.crop.sowing_day"
+
+        Returns
+        -------
+        NamedTuple
+            The state after the final row
+
+        Example:
+        ```
+        process_runner.record_baseline(processes, initial_state, n_rows=8760)
+        process_runner.config.crop.sowing_day = 120
+        state = process_runner.rerun(['config.crop.sowing_day'])
+        ```
+        """
+        if self.baseline is None:
+            raise ValueError('Must call record_baseline before rerun')
+        dirty = get_dirty_processes(self.baseline.processes, changed_paths)
+        return run_recorded(self, self.baseline, dirty)
+
+    def checkpoint(self, path: str):
+        """Save the current state, time manager and logs to an npz file.
+
+        See `proflow.checkpoint`.
+        """
+        save_runner_checkpoint(self, path)
+
+    def restore(self, path: str):
+        """Restore the current state, time manager and logs from a checkpoint file."""
+        restore_runner_checkpoint(self, path)
+
+    def fork(
+        self,
+        config: Config_Shape = None,
+        parameters: Parameters_Shape = None,
+        external_state: External_State_Shape = None,
+        overrides: Dict[str, Any] = None,
+        log_sink: LogSink = None,
+    ) -> 'ProcessRunner':
+        """Create a scenario runner that continues from the current state.
+
+        The state is shared so this runner and the branch write the state with copy on write
+        from now on. The branch starts with empty logs. See `proflow.fork`.
+
+        Parameters
+        ----------
+        config : Config_Shape, optional
+            The branch config, by default this runner's config
+        parameters : Parameters_Shape, optional
+            The branch parameters, by default this runner's parameters
+        external_state : External_State_Shape, optional
+            The branch external state, by default this runner's external state
+        overrides : Dict[str, Any], optional
+            Dot notation overrides starting with config, parameters or external_state
+            e.g. {"config.crop.sowing_day": 120}
+        log_sink : LogSink, optional
+            The branch log sink
+
+        Returns
+        -------
+        ProcessRunner
+            The branch runner
+
+        Example:
+        ```
+        process_runner.run_timeseries(processes, initial_state, n_rows=warm_up_rows)
+        branches = [process_runner.fork(overrides=o) for o in scenario_overrides]
+        final_states = [b.run_timeseries(processes, n_rows=scenario_rows) for b in branches]
+        ```
+        """
+        return fork_runner(self, config, parameters, external_state, overrides, log_sink)
+
+    def run_processes_batch(
+        self,
+        processes: List[Process],
+        batch_state: NamedTuple,
+        batch_size: int = None,
+        batched_config: bool = False,
+        batched_external_state: bool = False,
+    ) -> NamedTuple:
+        """Run the processes over a batch state where each leaf has a leading batch dimension.
+
+        Vectorized processes are called once for the whole batch and other processes once per
+        batch item. See `proflow.batch.run_processes_batch`.
+
+        Example:
+        ```
+        batch_state = Model_State_Shape(temperature=np.zeros(cell_count))
+        for _ in range(row_count):
+            batch_state = process_runner.run_processes_batch(processes, batch_state)
+            process_runner.tm.advance_row()
+        ```
+        """
+        return run_processes_batch(
+            self, processes, batch_state, batch_size, batched_config, batched_external_state)
+
     def process_switcher(
         self,
         prev_state: Model_State_Shape,
@@ -75,6 +353,8 @@ class ProcessRunner():
     ):
         """Ran for each process on state."""
         if process.ptype == ProcessType.STANDARD:
+            if self.PROFILE_MODE:
+                return self.run_process_profile(prev_state, process, *args, **kwargs)
             if self.DEBUG_MODE:
                 return self.run_process_debug(prev_state, process, *args, **kwargs)
             else:
@@ -90,9 +370,6 @@ class ProcessRunner():
         process: Process,
     ):
         row_index = self.tm.row_index
-        if row_index >= len(self.state_logs):
-            new_rows = [{} for i in range(row_index - len(self.state_logs) + 1)]
-            self.state_logs += new_rows
         args, kwargs = get_inputs_from_process(
             process,
             prev_state,
@@ -101,10 +378,21 @@ class ProcessRunner():
             self.external_state,
             row_index,
         )
-
-        self.state_logs[row_index] = {**self.state_logs[row_index], **kwargs}
+        self.write_logs(row_index, kwargs)
         return prev_state
 
+    def write_logs(self, row_index: int, values: dict):
+        """Merge the values into the logs for the row."""
+        if self.log_sink is not None:
+            self.log_sink.log(row_index, values)
+        elif self.COLUMNAR_LOGS:
+            self.state_logs.log(row_index, values)
+        else:
+            if row_index >= len(self.state_logs):
+                new_rows = [{} for i in range(row_index - len(self.state_logs) + 1)]
+                self.state_logs += new_rows
+            self.state_logs[row_index] = {**self.state_logs[row_index], **values}
+
     def run_process_time(
         self,
         prev_state: NamedTuple,  # Can be state or parameter
@@ -148,16 +436,13 @@ class ProcessRunner():
         config: Config_Shape = self.config
         parameters: Parameters_Shape = self.parameters
         external_state: External_State_Shape = self.external_state
-        IMMUTABLE_MODE: bool = self.IMMUTABLE_MODE
         row_index: int = self.tm.row_index
 
-        modified_state = deepcopy(prev_state) if IMMUTABLE_MODE else prev_state
-
         if not process.gate:
-            return modified_state
+            return prev_state
         args, kwargs = get_inputs_from_process(
             process,
-            modified_state,
+            prev_state,
             config,
             parameters,
             external_state,
@@ -165,13 +450,10 @@ class ProcessRunner():
         )
 
         # RUN PROCESS FUNC
-        result = process.func(*args, **kwargs)
+        result = process.func(*args, **kwargs) if not (process.cache or process.disk_cache) \
+            else self.call_process_func(process, args, kwargs)
 
-        output_state = map_result_to_state(modified_state, process.state_outputs, result) \
-            if not process.format_output else \
-            map_result_to_state_fn(modified_state, process.state_outputs, result)
-
-        return output_state
+        return self.map_outputs(prev_state, process, result)
 
     def run_process_debug(
         self,
@@ -216,13 +498,12 @@ class ProcessRunner():
         config: Config_Shape = self.config
         parameters: Parameters_Shape = self.parameters
         external_state: External_State_Shape = self.external_state
-        IMMUTABLE_MODE: bool = self.IMMUTABLE_MODE
         row_index: int = self.tm.row_index
         args, kwargs = None, None
         if not process.gate:
             return prev_state
         try:
-            modified_state = deepcopy(prev_state) if IMMUTABLE_MODE else prev_state
+            modified_state = prev_state
             process_id = process.comment or getattr(process.func, '__name__', 'Unknown')
             start_time_input_setup = datetime.now()
 
@@ -242,7 +523,9 @@ class ProcessRunner():
             # RUN PROCESS FUNC
             # Log time taken for process
             start_time = datetime.now()
-            result = process.func(*args, **kwargs)
+            result = process.func(*args, **kwargs) \
+                if not (process.cache or process.disk_cache) \
+                else self.call_process_func(process, args, kwargs)
             end_time = datetime.now()
             time_diff = (end_time - start_time)
             execution_time = time_diff.total_seconds() * 1000
@@ -252,9 +535,7 @@ class ProcessRunner():
             start_time_output_setup = datetime.now()
 
             # TODO: This is expensive!
-            output_state = map_result_to_state(modified_state, process.state_outputs, result) \
-                if not process.format_output else \
-                map_result_to_state_fn(modified_state, process.state_outputs, result)
+            output_state = self.map_outputs(modified_state, process, result)
 
             end_time_output_setup = datetime.now()
             time_diff_output_setup = (end_time_output_setup - start_time_output_setup)
@@ -271,9 +552,100 @@ class ProcessRunner():
         except Exception as e:
             raise Run_Process_Error(process, e, modified_state, args, kwargs) from e
 
+    def run_process_profile(
+        self,
+        prev_state: NamedTuple,  # Can be state or parameter
+        process: Process,
+    ) -> NamedTuple:
+        """Run a single process and record its timings in `process_stats`.
+
+        A low overhead alternative to `run_process_debug`.
+        The input mapping, function and output mapping times are measured with
+        `perf_counter_ns` and aggregated in place in the ProcessStats for the process.
+        Only every `profile_sample_interval` call to each process is timed, starting with the
+        first call. Other calls run as `run_process`.
+
+        Parameters
+        ----------
+        prev_state : NamedTuple
+            Model state prior to this process being ran
+        process: Process
+            The process to run
+
+        Returns
+        -------
+        Model State
+            Model State after process
+        """
+        if not process.gate:
+            return prev_state
+        process_id = self._get_process_id(process)
+        stats = self.process_stats.get(process_id)
+        if stats is None:
+            stats = self.process_stats[process_id] = ProcessStats(process_id)
+        stats.call_count += 1
+        if (stats.call_count - 1) % self.profile_sample_interval:
+            return self.run_process(prev_state, process)
+
+        t_start = perf_counter_ns()
+        args, kwargs = get_inputs_from_process(
+            process,
+            prev_state,
+            self.config,
+            self.parameters,
+            self.external_state,
+            self.tm.row_index,
+        )
+        t_inputs = perf_counter_ns()
+        result = process.func(*args, **kwargs) if not (process.cache or process.disk_cache) \
+            else self.call_process_func(process, args, kwargs)
+        t_func = perf_counter_ns()
+        output_state = self.map_outputs(prev_state, process, result)
+        t_outputs = perf_counter_ns()
+        stats.record(t_inputs - t_start, t_func - t_inputs, t_outputs - t_func)
+        return output_state
+
+    def map_outputs(self, state: Any, process: Process, result: Any) -> Any:
+        """Write the process result to the state with the process state_outputs.
+
+        In IMMUTABLE_MODE only the objects along each output path are copied.
+        If the state is shared with a forked runner the outputs are written with
+        `copy_on_write`. Otherwise the state is modified in place.
+        """
+        if process.format_output or self.IMMUTABLE_MODE:
+            return map_result_to_state_fn(state, process.state_outputs, result)
+        if self.copy_on_write is not None:
+            return self.copy_on_write.map_result(state, process.state_outputs, result)
+        return map_result_to_state(state, process.state_outputs, result)
+
+    def call_process_func(self, process: Process, args: List[Any], kwargs: dict) -> Any:
+        """Call the process function through its memory and disk caches."""
+        func = process.func
+        if process.disk_cache and self.disk_cache is not None:
+            def disk_cached_func(*args, **kwargs):
+                return self.disk_cache.call(process, args, kwargs)
+            func = disk_cached_func
+        if process.cache:
+            return self.process_caches.get(process).call(func, args, kwargs)
+        return func(*args, **kwargs)
+
+    def cache_info(self) -> Dict[str, CacheInfo]:
+        """Get the hits, misses and size of each cached process keyed by process id."""
+        return self.process_caches.info(self._get_process_id)
+
+    def read_logs(self) -> Iterator[dict]:
+        """Lazily iterate over the logged rows.
+
+        If a log sink is set the rows are read back from disk one chunk at a time.
+        """
+        if self.log_sink is not None:
+            return self.log_sink.read_rows()
+        return iter(self.state_logs)
+
     def reset_logs(self):
         self.time_logs = []
         self.debug_time_logs = []
+        self.process_stats = {}
 
 
 def advance_time_step_process():
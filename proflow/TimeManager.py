@@ -52,8 +52,8 @@ class TimeManager():
             self.advance_minute(by)
         if self.row_per == TimeScale.SECOND:
             self.advance_second(by)
-        if self.row_per == TimeScale.DAY:
-            self.advance_day(by)
+        if self.row_per == TimeScale.MILLISECOND:
+            self.advance_millisecond(by)
 
     def advance_day(self, by: int = 1):
         """advance a day by 1 and advance the row index if it is the row_per."""
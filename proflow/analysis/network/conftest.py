@@ -0,0 +1,7 @@
+import pytest
+from vendor.test_helpers import get_benchmark_time
+
+
+@pytest.fixture(scope="session", autouse=True)
+def benchmark_fixture():
+    yield get_benchmark_time()
@@ -1,24 +1,123 @@
+"""Export the process network as node-link JSON or Graphviz DOT.
+
+`write_json` and `write_dot` write each node and edge as it is read from the iterables so the
+graph is never held in memory. `asjson` builds the node-link data in memory and returns it.
+Edges are directed from the process that wrote the state to the process that reads it.
+Edges with a target of -1 (no writer) are skipped.
+
+The JSON is in the networkx node-link format of a MultiDiGraph with the link key "links" and
+the node id key "id". Parallel edges between the same nodes get an incrementing "key".
+Unlike networkx the links are written in the order of the edges instead of grouped by node.
+
+networkx is only required for `to_networkx`.
+"""
 import json
+from contextlib import contextmanager
 from dataclasses import asdict
-from typing import List
-import networkx as nx
+from typing import Dict, Iterable, Iterator, TextIO, Tuple, Union
+
 from proflow.analysis.network.extract_nodes_and_edges import Edge, Node
 
+OutputFile = Union[str, TextIO]
 
-def asjson(nodes: List[Node], edges: List[Edge], output_file: str):
-    G = nx.MultiDiGraph()
-    for n in nodes:
-        G.add_node(n.index, **asdict(n))
 
-    edge_data = [(e.target, e.source, asdict(e)) for e in edges if e.target != -1]
-    G.add_edges_from(edge_data)
+@contextmanager
+def _open_output(output_file: OutputFile) -> Iterator[TextIO]:
+    if isinstance(output_file, str):
+        with open(output_file, 'w') as f:
+            yield f
+    else:
+        yield output_file
+
+
+def _node_data(n: Node) -> dict:
+    return {**asdict(n), 'id': n.index}
+
+
+def _iter_links(edges: Iterable[Edge]) -> Iterator[dict]:
+    edge_keys: Dict[Tuple[int, int], int] = {}
+    for e in edges:
+        if e.target == -1:
+            continue
+        key = edge_keys.get((e.target, e.source), 0)
+        edge_keys[(e.target, e.source)] = key + 1
+        yield {**asdict(e), 'source': e.target, 'target': e.source, 'key': key}
+
+
+def write_json(nodes: Iterable[Node], edges: Iterable[Edge], output_file: OutputFile):
+    """Write the nodes and edges as node-link JSON.
+
+    Parameters
+    ----------
+    nodes : Iterable[Node]
+        The process nodes
+    edges : Iterable[Edge]
+        The state edges from `get_successive_edges`
+    output_file : Union[str, TextIO]
+        The file path or an open text file
+    """
+    with _open_output(output_file) as f:
+        f.write('{"directed": true, "multigraph": true, "graph": {}, "nodes": [')
+        for i, n in enumerate(nodes):
+            f.write((', ' if i else '') + json.dumps(_node_data(n)))
+        f.write('], "links": [')
+        for i, link in enumerate(_iter_links(edges)):
+            f.write((', ' if i else '') + json.dumps(link))
+        f.write(']}')
 
-    # %%
-    json_graph_data = nx.json_graph.node_link_data(
-        G,
-        dict(source='source', target='target', name='id',
-             key='key', link='links')
-    )
 
-    json.dump(json_graph_data, open(output_file, "w"))
+def _dot_string(val) -> str:
+    return '"' + str(val).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def write_dot(nodes: Iterable[Node], edges: Iterable[Edge], output_file: OutputFile):
+    """Write the nodes and edges as a Graphviz DOT digraph.
+
+    Nodes are labeled with the process function name and edges with the state key.
+    """
+    with _open_output(output_file) as f:
+        f.write('digraph {\n')
+        for n in nodes:
+            f.write(f'  {n.index} [label={_dot_string(n.name)} tooltip={_dot_string(n.text)}];\n')
+        for link in _iter_links(edges):
+            label = _dot_string(link['name'])
+            f.write(f'  {link["source"]} -> {link["target"]} [label={label}];\n')
+        f.write('}\n')
+
+
+def node_link_data(nodes: Iterable[Node], edges: Iterable[Edge]) -> dict:
+    """Get the nodes and edges as node-link data. The in memory equivalent of `write_json`."""
+    return {
+        'directed': True,
+        'multigraph': True,
+        'graph': {},
+        'nodes': [_node_data(n) for n in nodes],
+        'links': list(_iter_links(edges)),
+    }
+
+
+def asjson(nodes: Iterable[Node], edges: Iterable[Edge], output_file: str) -> dict:
+    """Write the nodes and edges as node-link JSON and return the node-link data.
+
+    Use `write_json` to write large graphs without holding them in memory.
+    """
+    json_graph_data = node_link_data(nodes, edges)
+    with open(output_file, 'w') as f:
+        json.dump(json_graph_data, f)
     return json_graph_data
+
+
+def to_networkx(nodes: Iterable[Node], edges: Iterable[Edge]):
+    """Build a networkx MultiDiGraph of the nodes and edges.
+
+    Requires networkx to be installed.
+    """
+    try:
+        import networkx as nx
+    except ImportError as e:
+        raise ImportError('to_networkx requires networkx') from e
+    G = nx.MultiDiGraph()
+    for n in nodes:
+        G.add_node(n.index, **asdict(n))
+    G.add_edges_from((e.target, e.source, asdict(e)) for e in edges if e.target != -1)
+    return G
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+
+from .extract_nodes_and_edges import Edge, Node
+from .export import asjson, to_networkx, write_dot, write_json
+
+DEMO_NODES = [
+    Node(index=0, x=0, y=0, name='a', text='Demo process a'),
+    Node(index=1, x=1, y=0, name='b', text='Demo "process" b'),
+    Node(index=2, x=2, y=0, name='c', text='Demo process c'),
+]
+
+DEMO_EDGES = [
+    Edge(source=0, target=-1, name='info.today'),
+    Edge(source=1, target=0, name='info.tomorrow'),
+    Edge(source=2, target=0, name='info.tomorrow'),
+    Edge(source=2, target=1, name='info.today'),
+    Edge(source=2, target=0, name='info.hour'),
+]
+
+
+def test_write_json():
+    f = io.StringIO()
+    write_json(iter(DEMO_NODES), iter(DEMO_EDGES), f)
+    out = json.loads(f.getvalue())
+    assert out['directed'] and out['multigraph'] and out['graph'] == {}
+    assert out['nodes'][1] == {
+        'index': 1, 'x': 1, 'y': 0, 'name': 'b', 'text': 'Demo "process" b', 'id': 1}
+    assert out['links'] == [
+        {'source': 0, 'target': 1, 'name': 'info.tomorrow', 'key': 0},
+        {'source': 0, 'target': 2, 'name': 'info.tomorrow', 'key': 0},
+        {'source': 1, 'target': 2, 'name': 'info.today', 'key': 0},
+        {'source': 0, 'target': 2, 'name': 'info.hour', 'key': 1},
+    ]
+
+
+def test_write_json_matches_json_dump():
+    f = io.StringIO()
+    write_json(DEMO_NODES, [], f)
+    data = json.loads(f.getvalue())
+    assert f.getvalue() == json.dumps(data)
+
+
+def test_write_json_matches_networkx(tmp_path):
+    nx = pytest.importorskip('networkx')
+    output_file = str(tmp_path / 'graph.json')
+    out = asjson(DEMO_NODES, DEMO_EDGES, output_file)
+    f = io.StringIO()
+    write_json(DEMO_NODES, DEMO_EDGES, f)
+    with open(output_file) as json_file:
+        assert json_file.read() == f.getvalue()
+    expected = nx.node_link_data(
+        to_networkx(DEMO_NODES, DEMO_EDGES),
+        source='source', target='target', name='id', key='key', edges='links')
+    assert out['nodes'] == expected['nodes']
+
+    def sort_links(links):
+        return sorted(links, key=lambda link: json.dumps(link, sort_keys=True))
+    assert sort_links(out['links']) == sort_links(expected['links'])
+    assert {k: v for k, v in out.items() if k not in ('nodes', 'links')} == \
+        {k: v for k, v in expected.items() if k not in ('nodes', 'links')}
+
+
+def test_write_dot():
+    f = io.StringIO()
+    write_dot(DEMO_NODES, DEMO_EDGES, f)
+    lines = f.getvalue().splitlines()
+    assert lines[0] == 'digraph {'
+    assert lines[2] == '  1 [label="b" tooltip="Demo \\"process\\" b"];'
+    assert lines[4] == '  0 -> 1 [label="info.tomorrow"];'
+    assert len(lines) == 9
+    assert lines[-1] == '}'
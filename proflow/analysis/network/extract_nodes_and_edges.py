@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from proflow.Objects.Process import Process
 from proflow.process_inspector import inspect_process_to_interfaces
+from proflow.parallel_inspector import inspect_processes_to_interfaces
 
 
 @dataclass
@@ -29,8 +30,16 @@ class Node_Link_Data:
 
 def get_process_link_data(
     processes: List[Process],
+    parallel: bool = False,
+    max_workers: int = None,
 ) -> Tuple[List[Node_Link_Data]]:
-    process_links = [inspect_process_to_interfaces(process) for process in processes]
+    """Get the state keys read and written by each process.
+
+    If parallel is True the processes are inspected on a process pool with max_workers.
+    See `proflow.parallel_inspector`.
+    """
+    process_links = inspect_processes_to_interfaces(processes, max_workers) if parallel \
+        else [inspect_process_to_interfaces(process) for process in processes]
     # TODO: Handle config and other inputs here
     state_inputs_link_data = [
         Node_Link_Data(i, inp.from_) for i, p in enumerate(process_links) for inp in p.state_inputs
@@ -46,19 +55,23 @@ def get_successive_edges(
     state_inputs: List[Node_Link_Data],
     state_outputs: List[Node_Link_Data],
 ) -> List[Edge]:
-    """Get a link from 1 process to the next using its modification to the state."""
+    """Get a link from 1 process to the next using its modification to the state.
+
+    The state outputs before each input are the outputs at a lower list position than the
+    input. A single forward pass keeps the most recent node to output each state key.
+    """
     links = []
+    last_writer: Dict[str, int] = {}
+    output_count = len(state_outputs)
+    next_output = 0
     for i, s_input in enumerate(state_inputs):
-        # get state outputs before this node
-        lookup_state_outputs = list(state_outputs[:i])[::-1]
-        try:
-            # Find the most recent node to output this input
-            target_output_index = next(
-                oput.node_index for oput in lookup_state_outputs if oput.state_key == s_input.state_key)
-        except:
-            # If not found link is null
-            target_output_index = -1
-        # print(n)
+        # Add the state outputs before this input
+        while next_output < min(i, output_count):
+            oput = state_outputs[next_output]
+            last_writer[oput.state_key] = oput.node_index
+            next_output += 1
+        # If not found link is null
+        target_output_index = last_writer.get(s_input.state_key, -1)
         edge = Edge(source=s_input.node_index, target=target_output_index, name=s_input.state_key)
         links.append(edge)
     return links
@@ -1,3 +1,8 @@
+import random
+from timeit import repeat
+
+import pytest
+
 from proflow.tests.demodata import DEMO_PROCESSES
 from .extract_nodes_and_edges import get_process_link_data, get_successive_edges, \
     process_to_node, processes_to_nodes, Node_Link_Data, Edge, Node, processes_to_nodes_and_edges
@@ -40,6 +45,12 @@ def test_get_process_link_data():
     assert out == (DEMO_STATE_INPUTS, DEMO_STATE_OUTPUTS)
 
 
+def test_get_process_link_data_parallel():
+    """Test get_process_link_data returns the same data when ran in parallel."""
+    out = get_process_link_data(DEMO_PROCESSES, parallel=True, max_workers=2)
+    assert out == (DEMO_STATE_INPUTS, DEMO_STATE_OUTPUTS)
+
+
 def test_get_successive_edges():
     """Test get_successive_edges returns correct data."""
     out = get_successive_edges(
@@ -80,3 +91,42 @@ def test_processes_to_nodes_and_edges():
         ]
     )
     assert out == (DEMO_NODES, DEMO_EDGES)
+
+
+def get_successive_edges_reference(state_inputs, state_outputs):
+    """The original quadratic implementation."""
+    links = []
+    for i, s_input in enumerate(state_inputs):
+        lookup_state_outputs = list(state_outputs[:i])[::-1]
+        target_output_index = next((
+            oput.node_index for oput in lookup_state_outputs
+            if oput.state_key == s_input.state_key), -1)
+        links.append(Edge(source=s_input.node_index, target=target_output_index,
+                          name=s_input.state_key))
+    return links
+
+
+def get_synthetic_link_data(process_count, key_count, seed=0):
+    rng = random.Random(seed)
+    state_inputs = [
+        Node_Link_Data(i, f'state.k{rng.randrange(key_count)}')
+        for i in range(process_count) for _ in range(2)]
+    state_outputs = [
+        Node_Link_Data(i, f'state.k{rng.randrange(key_count)}') for i in range(process_count)]
+    return state_inputs, state_outputs
+
+
+@pytest.mark.parametrize('process_count, key_count', [(0, 1), (50, 5), (300, 40)])
+def test_get_successive_edges_matches_reference(process_count, key_count):
+    state_inputs, state_outputs = get_synthetic_link_data(process_count, key_count)
+    assert get_successive_edges(state_inputs, state_outputs) == \
+        get_successive_edges_reference(state_inputs, state_outputs)
+    assert get_successive_edges(state_outputs, state_inputs) == \
+        get_successive_edges_reference(state_outputs, state_inputs)
+
+
+def test_get_successive_edges_time(benchmark_fixture):
+    state_inputs, state_outputs = get_synthetic_link_data(100000, 1000)
+    t1 = min(repeat(lambda: get_successive_edges(state_inputs, state_outputs),
+                    number=1, repeat=3))
+    assert t1 < 1.0 / benchmark_fixture
@@ -0,0 +1,185 @@
+"""Run a process list over a batch of states at once.
+
+In a batch state the numeric leaves are NumPy arrays with a leading batch dimension of
+size B e.g. one entry per grid cell.
+
+Processes with `vectorized=True` are called once per step with the whole batch.
+Other processes are called once per batch item with a `BatchItemView` of the state that
+reads and writes the item's entry in each batched array.
+The process functions are called through the runner's process and disk caches.
+
+A process gate can be a boolean mask of shape (B,).
+Vectorized processes are still called for the whole batch but their outputs are only
+written where the mask is True. Other processes are only called for the masked items.
+"""
+from dataclasses import is_dataclass
+from typing import TYPE_CHECKING, Any, Callable, List, Tuple
+
+import numpy as np
+
+from .helpers import compile_setter, rgetattr
+from .Objects.Process import Process, ProcessType
+from .process_ins_and_outs import get_inputs_from_process, map_result_to_state
+
+if TYPE_CHECKING:
+    from .ProcessRunnerCls import ProcessRunner
+
+
+class BatchItemView:
+    """View of a single item of a batched dataclass.
+
+    Arrays with a leading dimension of batch_size are indexed by the item index.
+    Nested dataclasses are returned as views. Other values are shared by all items.
+    """
+    __slots__ = ('_obj', '_index', '_batch_size')
+
+    def __init__(self, obj: object, index: int, batch_size: int):
+        object.__setattr__(self, '_obj', obj)
+        object.__setattr__(self, '_index', index)
+        object.__setattr__(self, '_batch_size', batch_size)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('__'):
+            raise AttributeError(name)
+        val = getattr(self._obj, name)
+        if isinstance(val, np.ndarray) and val.ndim and val.shape[0] == self._batch_size:
+            item = val[self._index]
+            return item.item() if isinstance(item, np.generic) else item
+        if is_dataclass(val):
+            return BatchItemView(val, self._index, self._batch_size)
+        return val
+
+    def __setattr__(self, name: str, val: Any):
+        current = getattr(self._obj, name)
+        if isinstance(current, np.ndarray) and current.ndim \
+                and current.shape[0] == self._batch_size:
+            current[self._index] = val
+        else:
+            setattr(self._obj, name, val)
+
+    def __repr__(self) -> str:
+        return f'BatchItemView({type(self._obj).__name__}, {self._index})'
+
+
+def get_batch_size(batch_state: object) -> int:
+    """Get the batch size from the first array leaf of the batch state."""
+    for val in vars(batch_state).values():
+        if isinstance(val, np.ndarray) and val.ndim:
+            return val.shape[0]
+        if is_dataclass(val):
+            try:
+                return get_batch_size(val)
+            except ValueError:
+                pass
+    raise ValueError('Batch state does not contain any batched arrays')
+
+
+def map_result_to_batch_state(
+    batch_state: object,
+    output_map: Callable[[Any], List[Tuple[Any, str]]],
+    result: Any,
+    mask: np.ndarray = None,
+) -> object:
+    """Write the result of a vectorized process to the batch state.
+
+    If a mask is set batched targets only take the new values where the mask is True.
+    """
+    for val, target in output_map(result):
+        if mask is not None:
+            current = rgetattr(batch_state, target)
+            if isinstance(current, np.ndarray) and current.shape[:1] == mask.shape:
+                item_mask = mask.reshape(mask.shape + (1,) * (current.ndim - 1))
+                val = np.where(item_mask, val, current)
+            elif not mask.any():
+                continue
+        compile_setter(target)(batch_state, val)
+    return batch_state
+
+
+def _batch_gate(gate: Any, batch_size: int) -> Tuple[bool, np.ndarray]:
+    """Get if the process should run and the mask. The mask is None if all items run."""
+    if isinstance(gate, np.ndarray):
+        if gate.shape != (batch_size,):
+            raise ValueError(f'Gate mask shape {gate.shape} does not match batch ({batch_size},)')
+        if gate.all():
+            return True, None
+        return bool(gate.any()), gate
+    return bool(gate), None
+
+
+def run_processes_batch(
+    runner: 'ProcessRunner',
+    processes: List[Process],
+    batch_state: object,
+    batch_size: int = None,
+    batched_config: bool = False,
+    batched_external_state: bool = False,
+) -> object:
+    """Run the processes over every item in the batch state.
+
+    The batch state is modified in place.
+
+    Parameters
+    ----------
+    runner : ProcessRunner
+        The process runner that holds the config, parameters, external state and logs
+    processes : List[Process]
+        The processes to run
+    batch_state : object
+        A dataclass state where each numeric leaf has a leading batch dimension
+    batch_size : int, optional
+        The batch size, by default the leading dimension of the first array in the state
+    batched_config : bool, optional
+        If True the config arrays also have a leading batch dimension and non vectorized
+        processes get a view of their batch item
+    batched_external_state : bool, optional
+        If True the external state arrays have a leading batch dimension
+        e.g. data[batch_index, row_index]
+
+    Returns
+    -------
+    object
+        The batch state
+    """
+    batch_size = batch_size if batch_size is not None else get_batch_size(batch_state)
+    config = runner.config
+    parameters = runner.parameters
+    external_state = runner.external_state
+    items = [BatchItemView(batch_state, b, batch_size) for b in range(batch_size)]
+    item_configs = [BatchItemView(config, b, batch_size) for b in range(batch_size)] \
+        if batched_config else [config] * batch_size
+    item_external_states = \
+        [BatchItemView(external_state, b, batch_size) for b in range(batch_size)] \
+        if batched_external_state else [external_state] * batch_size
+
+    for process in processes:
+        if process.ptype == ProcessType.TIME:
+            runner.run_process_time(batch_state, process)
+            continue
+        row_index = runner.tm.row_index
+        if process.ptype == ProcessType.LOG:
+            _, kwargs = get_inputs_from_process(
+                process, batch_state, config, parameters, external_state, row_index)
+            # Batched arrays are updated in place so must be copied into the logs
+            runner.write_logs(row_index, {
+                k: v.copy() if isinstance(v, np.ndarray) else v for k, v in kwargs.items()})
+            continue
+
+        should_run, mask = _batch_gate(process.gate, batch_size)
+        if not should_run:
+            continue
+        if process.vectorized:
+            args, kwargs = get_inputs_from_process(
+                process, batch_state, config, parameters, external_state, row_index)
+            result = runner.call_process_func(process, args, kwargs)
+            map_result_to_batch_state(batch_state, process.state_outputs, result, mask)
+            continue
+        batch_indexes = range(batch_size) if mask is None else np.flatnonzero(mask)
+        for b in batch_indexes:
+            args, kwargs = get_inputs_from_process(
+                process, items[b], item_configs[b], parameters, item_external_states[b],
+                row_index)
+            result = runner.call_process_func(process, args, kwargs)
+            map_result_to_state(items[b], process.state_outputs, result)
+    runner.current_state = batch_state
+    return batch_state
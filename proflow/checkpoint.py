@@ -0,0 +1,157 @@
+"""Save and restore the progress of a long run.
+
+A checkpoint stores the runner's current state, time manager and logs in a single
+uncompressed .npz file. The objects are pickled with dill but NumPy arrays are written as
+native .npy entries in the archive and referenced from the pickle, so large arrays are not
+copied into the pickle.
+
+When a `LogSink` is used its buffered rows are flushed when the checkpoint is saved and the
+written chunk files are stored in the checkpoint. On restore the runner's log sink continues
+after those chunks so the rows logged before the checkpoint are kept.
+
+Example:
+```
+process_runner.run_timeseries(
+    processes, initial_state, n_rows=262800,
+    checkpoint=AutoCheckpoint('checkpoints', every_n_rows=8760))
+
+# After a crash
+process_runner = ProcessRunner(config, external_state, parameters)
+process_runner.restore(AutoCheckpoint('checkpoints', every_n_rows=8760).latest())
+process_runner.run_timeseries(processes, row_range=(process_runner.tm.row_index, 262800))
+```
+"""
+import io
+import os
+import re
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import dill
+import numpy as np
+
+if TYPE_CHECKING:
+    from .ProcessRunnerCls import ProcessRunner
+
+OBJECTS_KEY = '__objects__'
+CHECKPOINT_FILE_PATTERN = re.compile(r'^checkpoint_(\d+)\.npz$')
+
+
+class _ArrayPickler(dill.Pickler):
+    """Pickler that moves NumPy arrays out of the pickle into the arrays dict."""
+
+    def __init__(self, file, arrays: Dict[str, np.ndarray]):
+        super().__init__(file)
+        self.arrays = arrays
+
+    def persistent_id(self, obj: Any):
+        if type(obj) is np.ndarray and not obj.dtype.hasobject:
+            key = f'arr_{len(self.arrays)}'
+            self.arrays[key] = obj
+            return key
+        return None
+
+
+class _ArrayUnpickler(dill.Unpickler):
+    def __init__(self, file, arrays):
+        super().__init__(file)
+        self.arrays = arrays
+
+    def persistent_load(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+
+def dump_checkpoint(path: str, objects: Dict[str, Any]):
+    """Write the objects to an npz file. The file is replaced atomically."""
+    arrays: Dict[str, np.ndarray] = {}
+    buffer = io.BytesIO()
+    _ArrayPickler(buffer, arrays).dump(objects)
+    arrays[OBJECTS_KEY] = np.frombuffer(buffer.getbuffer(), dtype=np.uint8)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {k: data[k] for k in data.files}
+    buffer = io.BytesIO(arrays.pop(OBJECTS_KEY).tobytes())
+    return _ArrayUnpickler(buffer, arrays).load()
+
+
+def save_runner_checkpoint(runner: 'ProcessRunner', path: str):
+    log_sink_position = None
+    if runner.log_sink is not None:
+        runner.log_sink.flush()
+        log_sink_position = runner.log_sink.get_position()
+    dump_checkpoint(path, {
+        'current_state': runner.current_state,
+        'tm': runner.tm,
+        'state_logs': runner.state_logs,
+        'time_logs': runner.time_logs,
+        'debug_time_logs': runner.debug_time_logs,
+        'log_sink_position': log_sink_position,
+    })
+
+
+def restore_runner_checkpoint(runner: 'ProcessRunner', path: str):
+    objects = load_checkpoint(path)
+    log_sink_position = objects.pop('log_sink_position', None)
+    if log_sink_position is not None and runner.log_sink is not None:
+        runner.log_sink.set_position(log_sink_position)
+    for key, val in objects.items():
+        setattr(runner, key, val)
+
+
+class AutoCheckpoint:
+    """Save a checkpoint every n rows of `ProcessRunner.run_timeseries`.
+
+    Checkpoints are saved to `directory/checkpoint_<row_index>.npz` where row_index is the
+    next row to run. Only the latest `keep` checkpoints are kept.
+
+    Parameters
+    ----------
+    directory : str
+        The directory to save the checkpoints to. Created if it does not exist.
+    every_n_rows : int
+        The number of rows between checkpoints
+    keep : int, optional
+        The number of checkpoints to keep, by default 2
+    """
+
+    def __init__(self, directory: str, every_n_rows: int, keep: int = 2):
+        if every_n_rows < 1 or keep < 1:
+            raise ValueError('every_n_rows and keep must be at least 1')
+        self.directory = directory
+        self.every_n_rows = every_n_rows
+        self.keep = keep
+
+    def checkpoints(self) -> List[str]:
+        """Get the checkpoint paths ordered from oldest to newest."""
+        if not os.path.isdir(self.directory):
+            return []
+        matches = [CHECKPOINT_FILE_PATTERN.match(f) for f in os.listdir(self.directory)]
+        return [
+            os.path.join(self.directory, m.group(0))
+            for m in sorted((m for m in matches if m), key=lambda m: int(m.group(1)))]
+
+    def latest(self) -> str:
+        """Get the path of the newest checkpoint. None if there are none."""
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def on_row_end(self, runner: 'ProcessRunner'):
+        """Save a checkpoint if the runner is at a checkpoint row."""
+        row_index = runner.tm.row_index
+        if row_index % self.every_n_rows:
+            return
+        runner.checkpoint(os.path.join(self.directory, f'checkpoint_{row_index:09d}.npz'))
+        for path in self.checkpoints()[:-self.keep]:
+            os.remove(path)
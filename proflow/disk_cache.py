@@ -0,0 +1,175 @@
+"""Persistent on disk cache of process results.
+
+Processes opt in with `Process(disk_cache=True)` and the runner is given a DiskCache with
+`ProcessRunner(disk_cache=DiskCache('.proflow_cache'))`.
+
+Each result is stored in a content addressed file in the cache directory. The key is a hash
+of the process function code, its closure and defaults, the process comment and the input
+values. NumPy array results are stored as .npy files and other results are dill pickled.
+
+When the directory grows past `max_bytes` the least recently used results are removed.
+
+NOTE: Only deterministic processes should use the disk cache. Changes to functions called by
+the process function do not change the key.
+"""
+import hashlib
+import os
+import tempfile
+from types import CodeType
+from typing import Any, Dict, List, Tuple
+
+import dill
+import numpy as np
+
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+def _code_fingerprint(code: CodeType) -> tuple:
+    """Get the parts of a code object that change its behaviour.
+
+    The file name and line numbers are left out so that moving a function does not change it.
+    """
+    return (
+        code.co_code,
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars,
+        tuple(_code_fingerprint(c) if isinstance(c, CodeType) else c for c in code.co_consts),
+    )
+
+
+def stable_value(val: Any) -> Any:
+    """Convert a value to a form that serializes the same way in every run.
+
+    NumPy arrays are converted to their dtype, shape and bytes and functions to their
+    fingerprint. Other values are serialized with dill.
+    """
+    if isinstance(val, np.ndarray):
+        return ('ndarray', val.dtype.str, val.shape, val.tobytes())
+    if isinstance(val, (list, tuple)):
+        return (type(val).__name__, [stable_value(v) for v in val])
+    if isinstance(val, dict):
+        return ('dict', [(k, stable_value(v)) for k, v in sorted(val.items())])
+    if callable(val) and hasattr(val, '__code__'):
+        return ('function', get_func_fingerprint(val))
+    return dill.dumps(val)
+
+
+def get_func_fingerprint(func: Any) -> bytes:
+    """Get a stable serialization of a function's code, closure values and defaults."""
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return dill.dumps(func)
+    closure = [stable_value(c.cell_contents) for c in (func.__closure__ or ())]
+    return dill.dumps((
+        _code_fingerprint(code),
+        closure,
+        stable_value(func.__defaults__),
+        stable_value(func.__kwdefaults__),
+    ))
+
+
+class DiskCache:
+    """A directory of process results.
+
+    Parameters
+    ----------
+    directory : str
+        The cache directory. Created if it does not exist.
+    max_bytes : int, optional
+        The maximum total size of the cached results, by default 1GB
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._func_fingerprints: Dict[int, Tuple[Any, bytes]] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(os.path.getsize(p) for p in self._cached_files())
+
+    def _cached_files(self) -> List[str]:
+        return [
+            os.path.join(root, f) for root, _, files in os.walk(self.directory)
+            for f in files if f.endswith(('.npy', '.pkl'))]
+
+    def _get_func_fingerprint(self, process) -> bytes:
+        cached = self._func_fingerprints.get(id(process))
+        if cached is not None and cached[0] is process:
+            return cached[1]
+        fingerprint = get_func_fingerprint(process.func)
+        self._func_fingerprints[id(process)] = (process, fingerprint)
+        return fingerprint
+
+    def get_key(self, process, args: List[Any], kwargs: Dict[str, Any]) -> str:
+        """Get the content address of the process result for the inputs."""
+        return hashlib.sha256(dill.dumps((
+            self._get_func_fingerprint(process),
+            process.comment,
+            stable_value(list(args)),
+            stable_value(kwargs),
+        ))).hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ext)
+
+    def _read(self, key: str) -> Tuple[bool, Any]:
+        for ext in ('.npy', '.pkl'):
+            path = self._path(key, ext)
+            try:
+                if ext == '.npy':
+                    result = np.load(path, allow_pickle=False)
+                else:
+                    with open(path, 'rb') as f:
+                        result = dill.load(f)
+            except FileNotFoundError:
+                continue
+            # Mark as recently used
+            os.utime(path)
+            return True, result
+        return False, None
+
+    def _write(self, key: str, result: Any):
+        is_array = isinstance(result, np.ndarray) and not result.dtype.hasobject
+        path = self._path(key, '.npy' if is_array else '.pkl')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so that a partially written result is never read
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            if is_array:
+                np.save(f, result, allow_pickle=False)
+            else:
+                dill.dump(result, f)
+        os.replace(tmp_path, path)
+        self._size += os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def call(self, process, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Get the result from disk or call the process function and store its result."""
+        key = self.get_key(process, args, kwargs)
+        found, result = self._read(key)
+        if found:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = process.func(*args, **kwargs)
+        self._write(key, result)
+        return result
+
+    def evict(self, max_bytes: int = None):
+        """Remove the least recently used results until the cache is under max_bytes."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        files = sorted(
+            ((os.path.getmtime(p), os.path.getsize(p), p) for p in self._cached_files()))
+        self._size = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if self._size <= max_bytes:
+                break
+            os.remove(path)
+            self._size -= size
+
+    def clear(self):
+        self.evict(0)
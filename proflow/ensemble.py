@@ -0,0 +1,236 @@
+"""Run many independent model runs in parallel.
+
+The `EnsembleRunner` runs the same process list against many
+(config, parameters, external_state, initial_state) jobs on a process pool.
+
+The process list factory is dill pickled once and sent to each worker when the worker
+starts. Each worker builds the process list once and reuses it for every job it runs.
+
+Example:
+```
+ensemble = EnsembleRunner(get_processes, n_rows=8760, max_workers=8, chunksize=4)
+results = ensemble.run([
+    (config, parameters, external_state, initial_state)
+    for config in site_configs
+])
+final_states = [r.state for r in results if r.ok]
+```
+
+To avoid pickling a large external state for every job publish it to shared memory with
+`proflow.shared_external_state.publish_external_state` and pass the handle in the jobs.
+"""
+import pickle
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import wraps
+from typing import Any, Callable, List, Sequence, Tuple, Union
+
+import dill
+
+from .ProcessRunnerCls import ProcessRunner
+from .Objects.Process import Process, ProcessType
+from .errors import Ensemble_Job_Error, Run_Process_Error
+from .shared_external_state import SharedExternalStateHandle, attach_external_state
+
+
+@dataclass
+class EnsembleJob:
+    """A single model run in an ensemble."""
+    config: Any
+    parameters: Any
+    external_state: Any
+    initial_state: Any
+
+
+@dataclass
+class EnsembleResult:
+    """The result of a single ensemble job.
+
+    Parameters:
+        index: int
+            The position of the job in the submitted jobs
+        state: Any
+            The final state. None if the job failed
+        logs: Any
+            The runner state_logs. None if the job failed
+        error: Exception
+            The error raised by the job. None if the job succeeded.
+            Errors raised by a process function are reported as a Run_Process_Error.
+            If the error cannot be pickled it is replaced by an Ensemble_Job_Error
+    """
+    index: int
+    state: Any = None
+    logs: Any = None
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+JobInput = Union[EnsembleJob, Tuple[Any, Any, Any, Any]]
+
+# Set in each worker by `_init_worker`
+_worker_processes: List[Process] = None
+_worker_settings: dict = None
+
+
+def _init_worker(process_factory_pickled: bytes, settings: dict):
+    global _worker_processes, _worker_settings
+    _worker_processes = dill.loads(process_factory_pickled)()
+    _worker_settings = settings
+
+
+def _with_error_context(process: Process) -> Process:
+    """Copy a standard process with a function that raises its errors as a Run_Process_Error.
+
+    The row index is added to the error by `run_job`.
+    """
+    if process.ptype != ProcessType.STANDARD:
+        return process
+    func = process.func
+
+    @wraps(func)
+    def run_with_error_context(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            raise Run_Process_Error(process, e, None, args, kwargs) from e
+    return replace(process, func=run_with_error_context)
+
+
+def _add_row_index(error: Exception, runner: ProcessRunner) -> Exception:
+    if isinstance(error, Run_Process_Error) and error.row_index is None \
+            and runner is not None:
+        error.row_index = runner.tm.row_index
+    return error
+
+
+def _is_picklable(obj: Any) -> bool:
+    try:
+        pickle.loads(pickle.dumps(obj))
+        return True
+    except Exception:
+        return False
+
+
+def _job_error(index: int, error: Exception) -> Ensemble_Job_Error:
+    return Ensemble_Job_Error(
+        index, type(error).__name__, str(error),
+        ''.join(traceback.format_exception(type(error), error, error.__traceback__)))
+
+
+def _picklable_error(index: int, error: Exception) -> Exception:
+    """Check the error can be sent back from the worker.
+
+    If a Run_Process_Error cannot be pickled its state is dropped and its original error is
+    replaced by an Ensemble_Job_Error if needed.
+    """
+    if _is_picklable(error):
+        return error
+    if isinstance(error, Run_Process_Error):
+        original = error.error if _is_picklable(error.error) else _job_error(index, error.error)
+        process_error = Run_Process_Error(
+            error.process, original, None, None, None, row_index=error.row_index)
+        process_error.args_str = error.args_str
+        process_error.kwargs_str = error.kwargs_str
+        if _is_picklable(process_error):
+            return process_error
+    return _job_error(index, error)
+
+
+def run_job(
+    index: int,
+    job: JobInput,
+    processes: List[Process],
+    n_rows: int = None,
+    runner_kwargs: dict = None,
+) -> EnsembleResult:
+    """Run a single ensemble job on a new ProcessRunner.
+
+    If n_rows is set the processes are ran once per row with `run_timeseries` otherwise
+    they are ran once with `run_processes`.
+    If the external state is a SharedExternalStateHandle it is attached from shared memory.
+    Errors are caught and returned on the result. Errors raised by a process function are
+    raised as a Run_Process_Error with the row index. In DEBUG_MODE errors raised by the
+    input and output functions are also reported as a Run_Process_Error.
+    """
+    job = job if isinstance(job, EnsembleJob) else EnsembleJob(*job)
+    runner = None
+    try:
+        external_state = attach_external_state(job.external_state) \
+            if isinstance(job.external_state, SharedExternalStateHandle) \
+            else job.external_state
+        runner = ProcessRunner(
+            job.config, external_state, job.parameters, **(runner_kwargs or {}))
+        if not runner.DEBUG_MODE:
+            # DEBUG_MODE already reports errors as a Run_Process_Error
+            processes = [_with_error_context(p) for p in processes]
+        state = runner.run_timeseries(processes, job.initial_state, n_rows=n_rows) \
+            if n_rows is not None else runner.run_processes(processes, job.initial_state)
+        return EnsembleResult(index, state, runner.state_logs)
+    except Exception as e:
+        return EnsembleResult(index, error=_picklable_error(index, _add_row_index(e, runner)))
+
+
+def _run_job_in_worker(indexed_job: Tuple[int, JobInput]) -> EnsembleResult:
+    index, job = indexed_job
+    return run_job(index, job, _worker_processes, **_worker_settings)
+
+
+class EnsembleRunner:
+    """Run the same processes for many independent jobs on a process pool.
+
+    Parameters
+    ----------
+    process_factory : Callable[[], List[Process]]
+        Returns the processes to run for each job. Called once per worker.
+    n_rows : int, optional
+        The number of rows to run for each job with `run_timeseries`.
+        If None the processes are ran once per job.
+    max_workers : int, optional
+        The number of worker processes, by default the number of cpus.
+        If 0 the jobs are ran in the current process.
+    chunksize : int, optional
+        The number of jobs to send to a worker at a time, by default 1
+    runner_kwargs : dict, optional
+        Additional keyword arguments for each ProcessRunner e.g. DEBUG_MODE
+    mp_context : multiprocessing.context.BaseContext, optional
+        The multiprocessing context for the pool
+    """
+
+    def __init__(
+        self,
+        process_factory: Callable[[], List[Process]],
+        n_rows: int = None,
+        max_workers: int = None,
+        chunksize: int = 1,
+        runner_kwargs: dict = None,
+        mp_context=None,
+    ):
+        self.process_factory = process_factory
+        self.n_rows = n_rows
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self.runner_kwargs = runner_kwargs or {}
+        self.mp_context = mp_context
+
+    def run(self, jobs: Sequence[JobInput]) -> List[EnsembleResult]:
+        """Run all jobs and return the results in the order they were submitted.
+
+        A failing job does not stop the other jobs. Its error is returned on its result.
+        """
+        settings = {'n_rows': self.n_rows, 'runner_kwargs': self.runner_kwargs}
+        if self.max_workers == 0:
+            processes = self.process_factory()
+            return [run_job(i, job, processes, **settings) for i, job in enumerate(jobs)]
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(dill.dumps(self.process_factory), settings),
+        ) as executor:
+            return list(executor.map(
+                _run_job_in_worker, enumerate(jobs), chunksize=self.chunksize))
@@ -7,13 +7,17 @@ new_line = '\n'
 
 
 class Run_Process_Error(Exception):
-    def __init__(self, process: 'Process', error: Exception, state, args, kwargs):  # noqa F821
+    def __init__(
+        self, process: 'Process', error: Exception, state, args, kwargs,  # noqa F821
+        row_index: int = None,
+    ):
 
         process_id = process.comment or getattr(process.func, '__name__', 'Unknown')
         self.message = f'Failed to run "{process_id}"'
         self.error = error
         self.state = state
         self.process = process
+        self.row_index = row_index
         self.args_str = json.dumps(args, indent=4, cls=AdvancedJsonEncoder)
         self.kwargs_str = json.dumps(kwargs, indent=4, cls=AdvancedJsonEncoder)
         try:
@@ -26,7 +30,8 @@ class Run_Process_Error(Exception):
             """
 
     def __str__(self):
-        return f"""{self.message}
+        row = f' at row {self.row_index}' if self.row_index is not None else ''
+        return f"""{self.message}{row}
 ---------- Python Error ----------
 
 {str(self.error)}
@@ -49,3 +54,21 @@ kwargs:
         # TODO: Find better way of showing state in error
         #  state:
         #  \n{state_print}
+
+
+class Ensemble_Job_Error(Exception):
+    """Picklable report of an exception raised by an ensemble job in a worker process.
+
+    The original exception may not be picklable so the error type, message and
+    traceback are kept as strings.
+    """
+
+    def __init__(self, job_index: int, error_type: str, message: str, traceback: str = ''):
+        super().__init__(job_index, error_type, message, traceback)
+        self.job_index = job_index
+        self.error_type = error_type
+        self.message = message
+        self.traceback = traceback
+
+    def __str__(self):
+        return f'Job {self.job_index} failed with {self.error_type}\n\n{self.message}'
@@ -0,0 +1,283 @@
+"""Flat array backed state store.
+
+`FlatState` lays out all the scalar numeric leaves of a dataclass state in one contiguous
+NumPy buffer and keeps a precomputed `path -> slot` index.
+
+The processes run on `FlatState.state`. This is a proxy of the original state where
+reading or writing a numeric leaf reads or writes its slot in the buffer.
+Numeric lists and arrays are returned as views of the buffer.
+Snapshotting, diffing and logging the state are then buffer copies.
+
+Example:
+```
+flat = FlatState(Model_State_Shape())
+state = process_runner.run_processes(processes, flat.state)
+snapshot = flat.snapshot()
+state = process_runner.run_processes(processes, state)
+changes = flat.diff(snapshot)
+model_state = flat.to_state()
+```
+
+NOTE: The layout is fixed when the FlatState is created.
+Numeric lists and arrays can be updated in place but not resized.
+Dicts, strings and other values are kept on a copy of the original state and are not
+stored in the buffer.
+FlatState does not support IMMUTABLE_MODE or format_output processes.
+"""
+from copy import deepcopy
+from dataclasses import fields, is_dataclass, replace
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+
+NUMERIC_TYPES = (bool, int, float, np.bool_, np.integer, np.floating)
+
+
+def is_numeric(val: Any) -> bool:
+    return isinstance(val, NUMERIC_TYPES)
+
+
+def as_numeric_array(val: Any) -> Union[np.ndarray, None]:
+    """Convert a numeric list or array to an array. Returns None if val is not numeric."""
+    if isinstance(val, np.ndarray):
+        return val if val.dtype.kind in 'biuf' else None
+    if not isinstance(val, (list, tuple)) or len(val) == 0:
+        return None
+    try:
+        arr = np.asarray(val)
+    except ValueError:
+        # Ragged list
+        return None
+    return arr if arr.dtype.kind in 'biuf' and arr.size > 0 else None
+
+
+SCALAR_TYPES = {t: t for t in (bool, int, float)}
+SCALAR_TYPES.update({t.__name__: t for t in (bool, int, float)})
+
+
+def cast_scalar(val: Any, annotation: Any = None) -> type:
+    """Get the python type to convert a buffer value back to.
+
+    The field annotation is used if it is a scalar type so that `c: float = 0` reads as a float.
+    """
+    if annotation in SCALAR_TYPES:
+        return SCALAR_TYPES[annotation]
+    if isinstance(val, (bool, np.bool_)):
+        return bool
+    if isinstance(val, (int, np.integer)):
+        return int
+    return float
+
+
+class FlatStateNode:
+    """Proxy of a dataclass node in a FlatState.
+
+    Numeric leaves are read from and written to the FlatState buffer.
+    All other attributes are read from and written to the original object.
+    """
+    __slots__ = ('_fs_prefix', '_fs_obj', '_fs_buffer', '_fs_scalars', '_fs_children')
+
+    def __init__(
+        self,
+        prefix: str,
+        obj: object,
+        buffer: np.ndarray,
+        scalars: Dict[str, Tuple[int, type]],
+        children: Dict[str, Any],
+    ):
+        object.__setattr__(self, '_fs_prefix', prefix)
+        object.__setattr__(self, '_fs_obj', obj)
+        object.__setattr__(self, '_fs_buffer', buffer)
+        object.__setattr__(self, '_fs_scalars', scalars)
+        object.__setattr__(self, '_fs_children', children)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('__') or name.startswith('_fs_'):
+            raise AttributeError(name)
+        slot = self._fs_scalars.get(name)
+        if slot is not None:
+            return slot[1](self._fs_buffer[slot[0]])
+        child = self._fs_children.get(name)
+        if child is not None:
+            return child
+        return getattr(self._fs_obj, name)
+
+    def __setattr__(self, name: str, val: Any):
+        slot = self._fs_scalars.get(name)
+        if slot is not None:
+            self._fs_buffer[slot[0]] = val
+            return
+        child = self._fs_children.get(name)
+        if isinstance(child, np.ndarray):
+            child[...] = val
+        elif child is not None:
+            raise TypeError(
+                f'Cannot replace "{self._fs_prefix}{name}". '
+                'Only numeric leaves of a FlatState node can be set.')
+        else:
+            object.__setattr__(self._fs_obj, name, val)
+
+    def __repr__(self) -> str:
+        return f'FlatStateNode("{self._fs_prefix}")'
+
+
+class FlatState:
+    """Store the scalar numeric leaves of a dataclass state in one NumPy buffer.
+
+    Parameters
+    ----------
+    state : object
+        The dataclass state to flatten. This is copied and not modified.
+    dtype : np.dtype, optional
+        The buffer dtype, by default np.float64
+
+    Attributes
+    ----------
+    buffer : np.ndarray
+        The values of all numeric leaves
+    index : Dict[str, int]
+        Maps the dot notation path of each numeric leaf to its slot in the buffer
+    paths : List[str]
+        The dot notation path of each slot
+    arrays : Dict[str, Tuple[int, Tuple[int]]]
+        Maps the path of each numeric list or array to its start slot and shape
+    state : FlatStateNode
+        The state proxy to pass to the process runner
+    """
+
+    def __init__(self, state: object, dtype: np.dtype = np.float64):
+        if not is_dataclass(state):
+            raise TypeError(f'FlatState requires a dataclass state but got {type(state)}')
+        self.template = deepcopy(state)
+        self.index: Dict[str, int] = {}
+        self.paths: List[str] = []
+        self.arrays: Dict[str, Tuple[int, Tuple[int]]] = {}
+        self._array_is_list: Dict[str, bool] = {}
+        self._array_dtypes: Dict[str, np.dtype] = {}
+        self._casts: Dict[str, type] = {}
+        values = []
+        self._layout(self.template, '', values)
+        self.buffer = np.array(values, dtype=dtype)
+        self.state = self._build_node(self.template, '')
+
+    def _layout(self, obj: object, prefix: str, values: list):
+        """Assign a slot to every numeric leaf in depth first order."""
+        for f in fields(obj):
+            val = getattr(obj, f.name)
+            path = f'{prefix}{f.name}'
+            if is_numeric(val):
+                self.index[path] = len(self.paths)
+                self._casts[path] = cast_scalar(val, f.type)
+                self.paths.append(path)
+                values.append(val)
+                continue
+            arr = as_numeric_array(val)
+            if arr is not None:
+                self.arrays[path] = (len(self.paths), arr.shape)
+                self._array_is_list[path] = not isinstance(val, np.ndarray)
+                self._array_dtypes[path] = arr.dtype
+                for nd_index in np.ndindex(arr.shape):
+                    element_path = '.'.join([path, *map(str, nd_index)])
+                    self.index[element_path] = len(self.paths)
+                    self.paths.append(element_path)
+                values.extend(arr.ravel().tolist())
+            elif is_dataclass(val):
+                self._layout(val, f'{path}.', values)
+            elif isinstance(val, list) and val and all(is_dataclass(v) for v in val):
+                for i, v in enumerate(val):
+                    self._layout(v, f'{path}.{i}.', values)
+
+    def _build_node(self, obj: object, prefix: str) -> FlatStateNode:
+        scalars = {}
+        children = {}
+        for f in fields(obj):
+            val = getattr(obj, f.name)
+            path = f'{prefix}{f.name}'
+            if path in self.index:
+                scalars[f.name] = (self.index[path], self._casts[path])
+            elif path in self.arrays:
+                start, shape = self.arrays[path]
+                size = int(np.prod(shape))
+                children[f.name] = self.buffer[start:start + size].reshape(shape)
+            elif is_dataclass(val):
+                children[f.name] = self._build_node(val, f'{path}.')
+            elif isinstance(val, list) and val and all(is_dataclass(v) for v in val):
+                children[f.name] = [self._build_node(v, f'{path}.{i}.') for i, v in enumerate(val)]
+        return FlatStateNode(prefix, obj, self.buffer, scalars, children)
+
+    def read(self, path: str) -> Any:
+        """Read a value from the state using its dot notation path."""
+        slot = self.index.get(path)
+        if slot is not None:
+            cast = self._casts.get(path)
+            return cast(self.buffer[slot]) if cast else self.buffer[slot]
+        if path in self.arrays:
+            start, shape = self.arrays[path]
+            return self.buffer[start:start + int(np.prod(shape))].reshape(shape)
+        from .helpers import rgetattr
+        return rgetattr(self.state, path)
+
+    def write(self, path: str, val: Any):
+        """Write a value to the state using its dot notation path."""
+        slot = self.index.get(path)
+        if slot is not None:
+            self.buffer[slot] = val
+            return
+        from .helpers import rsetattr
+        rsetattr(self.state, path, val)
+
+    def snapshot(self) -> np.ndarray:
+        """Get a copy of the buffer."""
+        return self.buffer.copy()
+
+    def restore(self, snapshot: np.ndarray):
+        """Set the buffer values from a snapshot."""
+        self.buffer[:] = snapshot
+
+    def diff(self, snapshot: np.ndarray, other: np.ndarray = None) -> Dict[str, Tuple[Any, Any]]:
+        """Get the numeric leaves that differ between two snapshots.
+
+        Parameters
+        ----------
+        snapshot : np.ndarray
+            The snapshot to compare from
+        other : np.ndarray, optional
+            The snapshot to compare to, by default the current buffer
+
+        Returns
+        -------
+        Dict[str, Tuple[Any, Any]]
+            Maps the path of each changed leaf to the (old, new) values
+        """
+        other = self.buffer if other is None else other
+        changed = np.nonzero(~((snapshot == other) | (np.isnan(snapshot) & np.isnan(other))))[0]
+        return {self.paths[i]: (snapshot[i], other[i]) for i in changed}
+
+    def as_dict(self, snapshot: np.ndarray = None) -> Dict[str, Any]:
+        """Map each numeric leaf path to its value in the snapshot or current buffer."""
+        values = self.buffer if snapshot is None else snapshot
+        return dict(zip(self.paths, values.tolist()))
+
+    def _export(self, node: FlatStateNode, obj: object, prefix: str) -> object:
+        changes = {}
+        for f in fields(obj):
+            path = f'{prefix}{f.name}'
+            if path in self.index:
+                changes[f.name] = self.read(path)
+            elif path in self.arrays:
+                arr = self.read(path).astype(self._array_dtypes[path])
+                changes[f.name] = arr.tolist() if self._array_is_list[path] else arr
+            elif f.name in node._fs_children:
+                child = node._fs_children[f.name]
+                changes[f.name] = [
+                    self._export(c, c._fs_obj, f'{path}.{i}.') for i, c in enumerate(child)
+                ] if isinstance(child, list) else self._export(child, child._fs_obj, f'{path}.')
+        return replace(obj, **changes)
+
+    def to_state(self) -> object:
+        """Build a regular dataclass state from the buffer.
+
+        Numeric lists are converted back to lists and scalars to their original python type.
+        Values that are not stored in the buffer are shared with the FlatState.
+        """
+        return self._export(self.state, self.template, '')
@@ -0,0 +1,142 @@
+"""Branch a runner into scenarios that share the state of a common warm up run.
+
+`ProcessRunner.fork` returns a new runner that starts from the parent's current state and
+time manager. The state is not copied. Instead the parent and the branch each get a
+`CopyOnWrite` that copies each object on an output path the first time it is written
+through. Later writes modify the copy in place so each runner copies the parts of the state
+it writes once and shares the rest.
+
+The mode flags of the parent are not changed. Steps compiled before the fork must be compiled
+again as they write the state in place.
+
+NOTE: Process functions that modify their inputs in place will modify the shared state.
+"""
+from copy import copy
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Set, Tuple
+
+from .helpers import rgetattr, rsetattr
+from .process_state_modifiers import map_result_to_state_fn
+
+if TYPE_CHECKING:
+    from .ProcessRunnerCls import ProcessRunner
+    from .log_sinks import LogSink
+
+OVERRIDE_SOURCES = ('config', 'parameters', 'external_state')
+
+
+def apply_overrides(runner_inputs: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply dot notation overrides e.g. {"config.crop.sowing_day": 120} to the runner inputs.
+
+    The inputs are not modified. Only the objects along the override paths are copied.
+
+    Raises
+    ------
+    ValueError
+        If a path does not start with config, parameters or external_state
+    """
+    grouped = {source: [] for source in OVERRIDE_SOURCES}
+    for path, val in overrides.items():
+        source, _, sub_path = path.partition('.')
+        if source not in grouped or not sub_path:
+            raise ValueError(
+                f'Override "{path}" must start with one of {", ".join(OVERRIDE_SOURCES)}')
+        grouped[source].append((val, sub_path))
+    return {
+        source: map_result_to_state_fn(val, lambda _, outputs=grouped[source]: outputs, None)
+        if grouped[source] else val
+        for source, val in runner_inputs.items()
+    }
+
+
+class CopyOnWrite:
+    """Write process outputs to a state that is shared with other runners.
+
+    The state and each object along an output path are replaced by a shallow copy the first
+    time they are written through. The copied objects are tracked by their path and are
+    modified in place by later writes. A value written to a path is not a copy so it is
+    copied again before it is written into.
+
+    If a different state object is passed in, e.g. a new initial state, the tracked paths are
+    cleared.
+    """
+
+    def __init__(self):
+        self._state = None
+        # Paths of the objects that have been copied. '' is the state itself
+        self._copied: Set[str] = set()
+        self.copy_count = 0
+
+    def _copy(self, obj: Any, path: str) -> Any:
+        self._copied.add(path)
+        self.copy_count += 1
+        return copy(obj)
+
+    def set(self, state: Any, target: str, val: Any) -> Any:
+        """Set the value at the dot notation target. Returns the state to use from now on."""
+        if state is not self._state:
+            self._copied = set()
+        if '' not in self._copied:
+            state = self._copy(state, '')
+        self._state = state
+        *parents, key = target.split('.')
+        node = state
+        path = ''
+        for part in parents:
+            path = f'{path}.{part}' if path else part
+            child = rgetattr(node, part)
+            if path not in self._copied:
+                child = self._copy(child, path)
+                rsetattr(node, part, child)
+            node = child
+        rsetattr(node, key, val)
+        if target in self._copied:
+            # The copies inside the replaced object are no longer in the state
+            prefix = target + '.'
+            self._copied = {p for p in self._copied if p != target and not p.startswith(prefix)}
+        return state
+
+    def map_result(
+        self,
+        state: Any,
+        output_map: Callable[[Any], List[Tuple[Any, str]]],
+        result: Any,
+    ) -> Any:
+        """Same as `map_result_to_state` without modifying the shared objects."""
+        for val, target in output_map(result):
+            state = self.set(state, target, val)
+        return state
+
+
+def fork_runner(
+    runner: 'ProcessRunner',
+    config: Any = None,
+    parameters: Any = None,
+    external_state: Any = None,
+    overrides: Dict[str, Any] = None,
+    log_sink: 'LogSink' = None,
+) -> 'ProcessRunner':
+    runner_inputs = apply_overrides({
+        'config': config if config is not None else runner.config,
+        'parameters': parameters if parameters is not None else runner.parameters,
+        'external_state': external_state if external_state is not None
+        else runner.external_state,
+    }, overrides or {})
+    branch = type(runner)(
+        runner_inputs['config'],
+        runner_inputs['external_state'],
+        runner_inputs['parameters'],
+        DEBUG_MODE=runner.DEBUG_MODE,
+        IMMUTABLE_MODE=runner.IMMUTABLE_MODE,
+        row_per=runner.tm.row_per,
+        COLUMNAR_LOGS=runner.COLUMNAR_LOGS,
+        log_sink=log_sink,
+        PROFILE_MODE=runner.PROFILE_MODE,
+        profile_sample_rate=1 / runner.profile_sample_interval,
+        disk_cache=runner.disk_cache,
+    )
+    branch.tm = copy(runner.tm)
+    branch.current_state = runner.current_state
+    # The parent must not modify the shared state in place either
+    runner.copy_on_write = CopyOnWrite()
+    branch.copy_on_write = CopyOnWrite()
+    return branch
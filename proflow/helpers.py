@@ -1,6 +1,15 @@
 from .Objects.Process import Process
-from typing import Any, Union, List, Optional
-from functools import reduce
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Union, List, Optional
+from functools import lru_cache
+
+#: Maximum number of compiled paths to keep
+PATH_CACHE_SIZE = 4096
+#: Maximum number of compiled output setters to keep
+SETTER_CACHE_SIZE = 4096
+
+_MISSING = object()
+_SET_ATTR = object()
 
 
 def check_types(self):
@@ -47,24 +56,212 @@ def print_process(**kwargs) -> Process:
     )
 
 
+def _chain_getters(getters: List[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """Combine a list of getters into a single getter."""
+    if len(getters) == 1:
+        return getters[0]
+    if len(getters) == 2:
+        g0, g1 = getters
+        return lambda obj: g1(g0(obj))
+    if len(getters) == 3:
+        g0, g1, g2 = getters
+        return lambda obj: g2(g1(g0(obj)))
+
+    def get_chain(obj):
+        for g in getters:
+            obj = g(obj)
+        return obj
+    return get_chain
+
+
+class CompiledPath:
+    """Getter for a dot notation path that has been parsed in advance.
+
+    The first time an object type is seen the path is walked the same way as the original
+    rgetattr. The types found at each step are used to build a chain of
+    `operator.attrgetter` and `operator.itemgetter` calls for that object type.
+    Consecutive attributes are combined into a single attrgetter.
+
+    If the types in the object change and the getter chain fails the path is walked again.
+
+    Use `compile_path` to get a cached instance.
+
+    Example:
+    ```
+    get_na = compile_path('nested.na')
+    for state in states:
+        na = get_na(state)
+    ```
+    """
+    __slots__ = ('path', 'keys', '_getters')
+
+    def __init__(self, path: Union[str, tuple, Any]):
+        self.path = path
+        self.keys = path.split('.') if isinstance(path, str) \
+            else list(path) if isinstance(path, (list, tuple)) else [path]
+        self._getters: Dict[type, Callable[[Any], Any]] = {}
+
+    def _specialise(self, obj: object, *args) -> Any:
+        """Walk the path and build the getter chain for the type of obj."""
+        getters = []
+        attr_keys = []
+        cacheable = True
+        value = obj
+        for key in self.keys:
+            if isinstance(value, list) or type(value).__module__ == 'numpy':
+                key = int(key)
+                step = 'item'
+                value = value[key]
+            elif isinstance(value, dict):
+                step = 'item'
+                value = value[key]
+            else:
+                step = 'attr'
+                found = getattr(value, key, _MISSING)
+                if found is _MISSING:
+                    # The default value is used so the chain does not represent the object
+                    cacheable = False
+                    found = getattr(value, key, *args)
+                value = found
+            if step == 'attr' and isinstance(key, str):
+                attr_keys.append(key)
+                continue
+            if attr_keys:
+                getters.append(attrgetter('.'.join(attr_keys)))
+                attr_keys = []
+            getters.append(itemgetter(key) if step == 'item' else
+                           lambda v, key=key: getattr(v, key))
+        if attr_keys:
+            getters.append(attrgetter('.'.join(attr_keys)))
+        if cacheable:
+            self._getters[type(obj)] = _chain_getters(getters)
+        return value
+
+    def __call__(self, obj: object, *args) -> Any:
+        getter = self._getters.get(type(obj))
+        if getter is not None:
+            try:
+                return getter(obj)
+            except (AttributeError, KeyError, IndexError, TypeError):
+                pass
+        return self._specialise(obj, *args)
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _compile_path(path: Union[str, tuple, Any]) -> CompiledPath:
+    return CompiledPath(path)
+
+
+def compile_path(path: Union[str, List[str]]) -> CompiledPath:
+    """Get the cached compiled getter for a dot notation path.
+
+    Hot loops can hold the returned accessor to skip the cache lookup.
+
+    Parameters
+    ----------
+    path : Union[str, List[str]]
+        Either a dot notation string or list of strings
+
+    Returns
+    -------
+    CompiledPath
+        A callable that takes the object (and optional default) and returns the nested value
+    """
+    return _compile_path(tuple(path) if isinstance(path, list) else path)
+
+
 def rgetattr(obj: object, attr: Union[str, List[str]], *args):
     """Get nested properties with dot notation or list of string path.
 
     https://stackoverflow.com/questions/31174295/getattr-and-setattr-on-nested-subobjects-chained-properties
 
+    The parsed path is cached. See `compile_path`.
+
     Properties
     ----------
     obj: object  [description]
     attr: OneOf[str, List[str]]  Either a dot notation string or list of strings
     """
-    def _getattr(obj, attr):
-        return obj[int(attr)] if isinstance(obj, list) \
-            else obj[int(attr)] if type(obj).__module__ == 'numpy' \
-            else obj[attr] if isinstance(obj, dict) \
-            else getattr(obj, attr, *args)
-    attr_list = attr if isinstance(attr, list) else attr.split(
-        '.') if isinstance(attr, str) else [attr]
-    return reduce(_getattr, [obj] + attr_list)
+    get_attr = _compile_path(attr) if isinstance(attr, str) else compile_path(attr)
+    return get_attr(obj, *args)
+
+
+class CompiledSetter:
+    """Setter for a dot notation target that has been parsed in advance.
+
+    The target is split into the parent path and the final key once.
+    The assignment to the final key is specialised to the type of the parent
+    (list, dict, numpy or attribute) the first time a parent type is seen.
+
+    WARNING: MUTATES THE INPUT OBJECT
+
+    Use `compile_setter` to get a cached instance.
+
+    Example:
+    ```
+    setter = compile_setter('nested.na')
+    setter(state, 4)
+    assert state.nested.na == 4
+    ```
+    """
+    __slots__ = ('target', 'parent_path', 'key', '_get_parent', '_item_keys')
+
+    def __init__(self, target: Union[str, tuple, Any]):
+        if isinstance(target, str):
+            pre, _, post = target.rpartition('.')
+            parent_path = pre.split('.') if pre else []
+        elif isinstance(target, (list, tuple)):
+            parent_path, post = list(target[:-1]), target[-1]
+        else:
+            parent_path, post = [], target
+        self.target = target
+        self.parent_path = parent_path
+        self.key = post
+        self._get_parent = compile_path(parent_path) if parent_path else None
+        # parent type -> the item key to set or _SET_ATTR
+        self._item_keys: Dict[type, Any] = {}
+
+    def _specialise(self, parent: object) -> Any:
+        if isinstance(parent, list) or type(parent).__module__ == 'numpy':
+            item_key = int(self.key)
+        elif isinstance(parent, dict):
+            item_key = self.key
+        else:
+            item_key = _SET_ATTR
+        self._item_keys[type(parent)] = item_key
+        return item_key
+
+    def __call__(self, obj: object, val: Any) -> object:
+        parent = obj if self._get_parent is None else self._get_parent(obj)
+        item_key = self._item_keys.get(type(parent), _MISSING)
+        if item_key is _MISSING:
+            item_key = self._specialise(parent)
+        if item_key is _SET_ATTR:
+            setattr(parent, self.key, val)
+        else:
+            parent[item_key] = val
+        return obj
+
+
+@lru_cache(maxsize=SETTER_CACHE_SIZE)
+def _compile_setter(target: Union[str, tuple, Any]) -> CompiledSetter:
+    return CompiledSetter(target)
+
+
+def compile_setter(target: Union[str, List[str]]) -> CompiledSetter:
+    """Get the cached compiled setter for a dot notation target.
+
+    Parameters
+    ----------
+    target : Union[str, List[str]]
+        Either a dot notation string or list of strings
+
+    Returns
+    -------
+    CompiledSetter
+        A callable that takes the object and new value and sets the value on the object
+    """
+    return _compile_setter(tuple(target) if isinstance(target, list) else target)
 
 
 def rsetattr(obj: object, attr: Union[str, List[str]], val: Any):
@@ -72,25 +269,16 @@ def rsetattr(obj: object, attr: Union[str, List[str]], val: Any):
 
     https://stackoverflow.com/questions/31174295/getattr-and-setattr-on-nested-subobjects-chained-properties
 
+    The parsed target is cached. See `compile_setter`.
+
     Properties
     ----------
     obj: object  [description]
     attr: OneOf[str, List[str]]  Either a dot notation string or list of strings
     val: any
     """
-    # obj_copy = deepcopy(obj) # deep copy takes 10 times as long!
-    obj_copy = obj
-    pre, _, post = [attr[0], '.', '.'.join(attr[1:])] if isinstance(attr, list) \
-        else attr.rpartition('.') if isinstance(attr, str) else [None, None, attr]
-    # target = deepcopy(rgetattr(obj, pre) if pre else obj)
-    target = rgetattr(obj_copy, pre) if pre else obj_copy
-    if isinstance(target, list):
-        target[int(post)] = val
-    elif isinstance(target, dict):
-        target[post] = val
-    else:
-        setattr(target, post, val)
-    return obj_copy
+    set_attr = _compile_setter(attr) if isinstance(attr, str) else compile_setter(attr)
+    return set_attr(obj, val)
 
 
 def lget(v: Optional[List[any]], i: int, fallback_value=None) -> any:
@@ -0,0 +1,170 @@
+"""Rerun a recorded timeseries after changing the config or parameters.
+
+`ProcessRunner.record_baseline` runs the processes like `run_timeseries` and records the
+result of every standard process for each row.
+`ProcessRunner.rerun(changed_paths)` then reruns the timeseries from the same initial state
+but only calls the processes that are affected by the changed config and parameter paths.
+The other processes have their recorded results written to the state.
+
+A process is affected if its config or parameters inputs read a changed path or its state
+inputs read a state path that is written by an affected process. As the state is carried
+between rows this is checked for the whole process list until no more processes are affected.
+The paths are recovered with `parse_state_reads` and `parse_state_writes`.
+Processes that cannot be parsed are treated as affected.
+
+The recorded results of the affected processes are replaced so reruns can be chained.
+
+NOTE: Config and parameters that are used outside of the input functions e.g. in gates or
+function closures are not tracked. The recorded results are copied so use more memory than
+the logs.
+"""
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Set, Tuple, Union
+
+from .Objects.Process import Process, ProcessType
+from .process_inspector import parse_state_reads, parse_state_writes
+from .process_ins_and_outs import get_inputs_from_process
+from .scheduler import any_paths_overlap
+from .TimeManager import TimeManager
+
+if TYPE_CHECKING:
+    from .ProcessRunnerCls import ProcessRunner
+
+INPUT_SOURCES = ('config', 'parameters')
+
+
+@dataclass
+class Baseline:
+    """A recorded timeseries run.
+
+    Parameters:
+        processes: List[Process]
+            The processes ran for each row
+        initial_state: Any
+            A copy of the state at the start of the first row
+        tm: TimeManager
+            A copy of the time manager at the start of the first row
+        n_rows: int
+            The number of rows ran
+        results: List[List[Any]]
+            The result of each process for each row. None for processes that did not run
+        log_position: Dict[str, Any]
+            The runner's log sink position at the start of the first row. None if no log sink
+    """
+    processes: List[Process]
+    initial_state: Any
+    tm: TimeManager
+    n_rows: int
+    results: List[List[Any]] = field(default_factory=list)
+    log_position: Union[Dict[str, Any], None] = None
+
+
+def split_changed_paths(changed_paths: List[str]) -> Tuple[Set[str], Set[str]]:
+    """Split paths such as "config.a.b" into the changed config and parameters paths.
+
+    Raises
+    ------
+    ValueError
+        If a path does not start with config or parameters
+    """
+    changed = {source: set() for source in INPUT_SOURCES}
+    for path in changed_paths:
+        source, _, sub_path = path.partition('.')
+        if source not in changed:
+            raise ValueError(
+                f'Changed path "{path}" must start with one of {", ".join(INPUT_SOURCES)}')
+        changed[source].add(sub_path)
+    return changed['config'], changed['parameters']
+
+
+def _reads_changed(map_inputs_fn, changed: Set[str]) -> bool:
+    if not changed:
+        return False
+    reads = parse_state_reads(map_inputs_fn)
+    return reads is None or any_paths_overlap(reads, changed)
+
+
+def get_dirty_processes(processes: List[Process], changed_paths: List[str]) -> List[bool]:
+    """Get which processes are affected by the changed config and parameters paths.
+
+    Parameters
+    ----------
+    processes : List[Process]
+        The processes ran for each row
+    changed_paths : List[str]
+        Dot notation paths starting with config or parameters e.g. "config.crop.sowing_day"
+
+    Returns
+    -------
+    List[bool]
+        True for each process that must be ran again
+    """
+    changed_config, changed_parameters = split_changed_paths(changed_paths)
+    dirty = [
+        p.ptype == ProcessType.STANDARD and (
+            _reads_changed(p.config_inputs, changed_config) or
+            _reads_changed(p.parameters_inputs, changed_parameters))
+        for p in processes]
+    dirty_state: Set[str] = set()
+    reads = [
+        parse_state_reads(p.state_inputs) if p.ptype == ProcessType.STANDARD else set()
+        for p in processes]
+    updated = True
+    while updated:
+        updated = False
+        for i, process in enumerate(processes):
+            if not dirty[i] and (reads[i] is None or any_paths_overlap(reads[i], dirty_state)):
+                dirty[i] = True
+            if dirty[i]:
+                writes = parse_state_writes(process.state_outputs)
+                # An empty path is the whole state
+                writes = {''} if writes is None else writes
+                if not writes <= dirty_state:
+                    dirty_state |= writes
+                    updated = True
+    return dirty
+
+
+def run_recorded(
+    runner: 'ProcessRunner',
+    baseline: Baseline,
+    dirty: Union[List[bool], None] = None,
+) -> Any:
+    """Run the baseline rows calling the dirty processes and replaying the others.
+
+    If dirty is None every process is ran and the results are recorded.
+    """
+    processes = baseline.processes
+    recording = dirty is None
+    dirty = dirty if dirty is not None else [True] * len(processes)
+    if recording:
+        baseline.results = [[None] * len(processes) for _ in range(baseline.n_rows)]
+    runner.tm = deepcopy(baseline.tm)
+    if runner.log_sink is not None and baseline.log_position is not None:
+        # The rows are logged again so the sink continues from where the baseline started
+        runner.log_sink.set_position(baseline.log_position)
+    state = deepcopy(baseline.initial_state)
+    for row_results in baseline.results:
+        row_index = runner.tm.row_index
+        for i, process in enumerate(processes):
+            if process.ptype != ProcessType.STANDARD:
+                state = runner.process_switcher(state, process)
+                continue
+            if not process.gate:
+                continue
+            if dirty[i]:
+                args, kwargs = get_inputs_from_process(
+                    process, state, runner.config, runner.parameters, runner.external_state,
+                    row_index)
+                result = runner.call_process_func(process, args, kwargs)
+                # Copied so later processes cannot modify the recorded result in place
+                row_results[i] = deepcopy(result)
+            else:
+                result = deepcopy(row_results[i])
+            state = runner.map_outputs(state, process, result)
+        runner.tm.advance_row()
+    if runner.log_sink is not None:
+        runner.log_sink.flush()
+    runner.current_state = state
+    return state
@@ -0,0 +1,154 @@
+"""On disk cache of process inspector results shared between Python sessions.
+
+Enable with `use_disk_cache('.proflow_inspector_cache')`. The parsed sources, input maps and
+output maps of the map functions are then stored on disk when they miss the in memory
+`PARSE_CACHE`.
+
+Results are grouped into one file per source file named by a hash of the source file path
+and a hash of its content. Within the file each result is keyed by the kind of parse and the
+function's line range, name and bytecode. When a source file changes only its results are
+parsed again and the old file is removed on the next flush.
+The cache is flushed at exit.
+
+Example:
+```
+from proflow.inspector_cache import use_disk_cache
+use_disk_cache('.proflow_inspector_cache')
+nodes, edges = extract_nodes_and_edges(processes)
+```
+"""
+import atexit
+import dis
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from types import CodeType
+from typing import Any, Dict, Tuple
+
+from .process_inspector import PARSE_CACHE, ParseCache
+
+#: The kinds of parse stored on disk. Full module ASTs are not stored
+PERSISTED_KINDS = frozenset(['source', 'inputs', 'outputs', 'output_lines', 'map_fn_ast'])
+
+
+def get_line_range(code: CodeType) -> Tuple[int, int]:
+    """Get the first and last source line of a code object."""
+    lines = [line for _, line in dis.findlinestarts(code) if line is not None]
+    return code.co_firstlineno, max(lines, default=code.co_firstlineno)
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class InspectorDiskCache:
+    """A directory of parsed map functions grouped by source file.
+
+    Parameters
+    ----------
+    directory : str
+        The cache directory. Results are stored in a sub directory per Python version.
+    """
+
+    kinds = PERSISTED_KINDS
+
+    def __init__(self, directory: str):
+        self.directory = os.path.join(directory, f'py{sys.version_info[0]}{sys.version_info[1]}')
+        self.hits = 0
+        self.misses = 0
+        # source path -> (mtime, content hash)
+        self._content_hashes: Dict[str, Tuple[float, str]] = {}
+        # source path -> (content hash, results, dirty)
+        self._files: Dict[str, Tuple[str, Dict[tuple, Any], bool]] = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _get_content_hash(self, source_path: str) -> str:
+        mtime = os.stat(source_path).st_mtime
+        cached = self._content_hashes.get(source_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(source_path, 'rb') as f:
+            content_hash = _hash(f.read())
+        self._content_hashes[source_path] = (mtime, content_hash)
+        return content_hash
+
+    def _cache_file_prefix(self, source_path: str) -> str:
+        return _hash(source_path.encode()) + '-'
+
+    def _cache_file_path(self, source_path: str, content_hash: str) -> str:
+        return os.path.join(
+            self.directory, f'{self._cache_file_prefix(source_path)}{content_hash}.pkl')
+
+    def _get_results(self, source_path: str) -> Dict[tuple, Any]:
+        content_hash = self._get_content_hash(source_path)
+        loaded = self._files.get(source_path)
+        if loaded is not None and loaded[0] == content_hash:
+            return loaded[1]
+        try:
+            with open(self._cache_file_path(source_path, content_hash), 'rb') as f:
+                results = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            results = {}
+        self._files[source_path] = (content_hash, results, False)
+        return results
+
+    @staticmethod
+    def _result_key(kind: str, code: CodeType) -> tuple:
+        return (kind, *get_line_range(code), code.co_name, code.co_code)
+
+    def get(self, kind: str, code: CodeType) -> Tuple[bool, Any]:
+        """Get (found, result) for the kind of parse of the code object."""
+        source_path = os.path.abspath(code.co_filename)
+        try:
+            results = self._get_results(source_path)
+        except OSError:
+            # Not defined in a file
+            return False, None
+        key = self._result_key(kind, code)
+        if key in results:
+            self.hits += 1
+            return True, results[key]
+        self.misses += 1
+        return False, None
+
+    def set(self, kind: str, code: CodeType, result: Any):
+        source_path = os.path.abspath(code.co_filename)
+        try:
+            results = self._get_results(source_path)
+        except OSError:
+            return
+        results[self._result_key(kind, code)] = result
+        content_hash, _, _ = self._files[source_path]
+        self._files[source_path] = (content_hash, results, True)
+
+    def flush(self):
+        """Write the changed source file results and remove outdated results."""
+        for source_path, (content_hash, results, dirty) in self._files.items():
+            if not dirty:
+                continue
+            path = self._cache_file_path(source_path, content_hash)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            prefix = self._cache_file_prefix(source_path)
+            for file_name in os.listdir(self.directory):
+                if file_name.startswith(prefix) and file_name != os.path.basename(path):
+                    os.remove(os.path.join(self.directory, file_name))
+            self._files[source_path] = (content_hash, results, False)
+
+    def clear(self):
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.pkl'):
+                os.remove(os.path.join(self.directory, file_name))
+        self._files = {}
+
+
+def use_disk_cache(directory: str, parse_cache: ParseCache = PARSE_CACHE) -> InspectorDiskCache:
+    """Store the parse cache results in the directory. The results are flushed at exit."""
+    disk_cache = InspectorDiskCache(directory)
+    parse_cache.disk_cache = disk_cache
+    atexit.register(disk_cache.flush)
+    return disk_cache
@@ -0,0 +1,196 @@
+"""Log sinks that spill the state logs to disk in chunks.
+
+By default the process runner keeps every logged row in memory until the run ends.
+A log sink buffers `chunk_rows` rows and then writes them to a chunk file so that the
+memory used by the logs stays flat regardless of the run length.
+
+Example:
+```
+process_runner = ProcessRunner(log_sink=NpzLogSink('out/logs', chunk_rows=8760))
+process_runner.run_timeseries(processes, initial_state, n_rows=8760 * 30)
+for row in process_runner.read_logs():
+    ...
+```
+"""
+import csv
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from .logger import ColumnarLogs
+
+ROW_INDEX_KEY = '_row_index'
+
+
+class LogSink(ABC):
+    """Base class for log sinks.
+
+    Subclasses implement `_write_chunk` and `_read_chunk` for the file format.
+
+    Parameters
+    ----------
+    directory : str
+        The directory to write the chunk files to. Created if it does not exist.
+    chunk_rows : int, optional
+        The number of rows to buffer before writing a chunk, by default 1024
+    """
+    ext = ''
+
+    def __init__(self, directory: str, chunk_rows: int = 1024):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.chunk_paths: List[str] = []
+        self._buffer = ColumnarLogs(n_rows=chunk_rows, chunk_size=chunk_rows)
+        self._chunk_start = None
+        # All rows before this have been written to disk
+        self._next_row = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def log(self, row_index: int, values: Dict[str, Any]):
+        """Add the values to the row. Writes the buffered rows when the chunk is full.
+
+        Rows must be logged in order. A row can be logged again until its chunk is written.
+
+        Raises
+        ------
+        ValueError
+            If the row is before the buffered rows or has already been written to disk
+        """
+        if row_index < self._next_row:
+            raise ValueError(f'Row {row_index} has already been written to disk')
+        if self._chunk_start is not None and row_index < self._chunk_start:
+            raise ValueError(
+                f'Row {row_index} is before the buffered rows starting at {self._chunk_start}')
+        if self._chunk_start is None:
+            self._chunk_start = row_index
+        elif row_index - self._chunk_start >= self.chunk_rows:
+            self.flush()
+            self._chunk_start = row_index
+        self._buffer.log(row_index - self._chunk_start, values)
+
+    def _buffered_columns(self) -> Dict[str, np.ndarray]:
+        columns = self._buffer.as_dict()
+        columns[ROW_INDEX_KEY] = np.arange(
+            self._chunk_start, self._chunk_start + len(self._buffer))
+        return columns
+
+    def flush(self):
+        """Write the buffered rows to a new chunk file."""
+        if self._chunk_start is None or len(self._buffer) == 0:
+            return
+        path = os.path.join(self.directory, f'chunk_{len(self.chunk_paths):06d}{self.ext}')
+        self._write_chunk(path, self._buffered_columns())
+        self.chunk_paths.append(path)
+        self._next_row = self._chunk_start + len(self._buffer)
+        self._buffer = ColumnarLogs(n_rows=self.chunk_rows, chunk_size=self.chunk_rows)
+        self._chunk_start = None
+
+    def close(self):
+        self.flush()
+
+    def get_position(self) -> Dict[str, Any]:
+        """Get the written chunks and next row so that a later sink can continue from them.
+
+        The buffered rows must be flushed first.
+        """
+        return {'chunk_paths': list(self.chunk_paths), 'next_row': self._next_row}
+
+    def set_position(self, position: Dict[str, Any]):
+        """Continue from a position from `get_position`. Discards the buffered rows."""
+        self.chunk_paths = list(position['chunk_paths'])
+        self._next_row = position['next_row']
+        self._buffer = ColumnarLogs(n_rows=self.chunk_rows, chunk_size=self.chunk_rows)
+        self._chunk_start = None
+
+    def read_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Lazily read each chunk as a dict of columns.
+
+        Only one chunk is loaded at a time. The rows that have not been written yet are
+        returned as the final chunk.
+        """
+        for path in self.chunk_paths:
+            yield self._read_chunk(path)
+        if self._chunk_start is not None and len(self._buffer):
+            yield self._buffered_columns()
+
+    def read_rows(self) -> Iterator[Dict[str, Any]]:
+        """Lazily read each logged row as a dict."""
+        for chunk in self.read_chunks():
+            keys = [k for k in chunk if k != ROW_INDEX_KEY]
+            for i in range(len(chunk[ROW_INDEX_KEY])):
+                yield {k: _to_python(chunk[k][i]) for k in keys}
+
+    @abstractmethod
+    def _write_chunk(self, path: str, columns: Dict[str, np.ndarray]):
+        pass
+
+    @abstractmethod
+    def _read_chunk(self, path: str) -> Dict[str, np.ndarray]:
+        pass
+
+
+def _to_python(val: Any) -> Any:
+    return val.item() if isinstance(val, np.generic) else val
+
+
+class NpzLogSink(LogSink):
+    """Write each chunk as a NumPy .npz archive with one array per log key."""
+    ext = '.npz'
+
+    def _write_chunk(self, path: str, columns: Dict[str, np.ndarray]):
+        np.savez(path, **columns)
+
+    def _read_chunk(self, path: str) -> Dict[str, np.ndarray]:
+        with np.load(path, allow_pickle=True) as data:
+            return {k: data[k] for k in data.files}
+
+
+class CsvLogSink(LogSink):
+    """Write each chunk as a csv file. Columns that can be parsed as floats are read as floats."""
+    ext = '.csv'
+
+    def _write_chunk(self, path: str, columns: Dict[str, np.ndarray]):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns.keys())
+            writer.writerows(zip(*[col.tolist() for col in columns.values()]))
+
+    def _read_chunk(self, path: str) -> Dict[str, np.ndarray]:
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            keys = next(reader)
+            values = list(zip(*reader)) or [[] for _ in keys]
+        columns = {}
+        for k, col in zip(keys, values):
+            try:
+                columns[k] = np.array(col, dtype=np.float64)
+            except ValueError:
+                columns[k] = np.array(col, dtype=object)
+        columns[ROW_INDEX_KEY] = columns[ROW_INDEX_KEY].astype(int)
+        return columns
+
+
+class ParquetLogSink(LogSink):
+    """Write each chunk as a parquet file. Requires pyarrow to be installed."""
+    ext = '.parquet'
+
+    def __init__(self, directory: str, chunk_rows: int = 1024):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError('ParquetLogSink requires pyarrow') from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        super().__init__(directory, chunk_rows)
+
+    def _write_chunk(self, path: str, columns: Dict[str, np.ndarray]):
+        table = self._pa.table({
+            k: col if col.dtype != object else col.tolist() for k, col in columns.items()})
+        self._pq.write_table(table, path)
+
+    def _read_chunk(self, path: str) -> Dict[str, np.ndarray]:
+        table = self._pq.read_table(path)
+        return {k: table.column(k).to_numpy(zero_copy_only=False) for k in table.column_names}
@@ -1,5 +1,8 @@
 
-from typing import Callable, List
+from numbers import Number
+from typing import Any, Callable, Dict, Iterator, List
+
+import numpy as np
 
 from .internal_state import Model_State_Shape
 from .Objects.Process import Process, ProcessType
@@ -13,6 +16,122 @@ def merge_logs(logs, index, **kwargs):
         return {**kwargs}
 
 
+class ColumnarLogs:
+    """Store logs as one preallocated NumPy column per log key.
+
+    An alternative to the list of dicts `state_logs` where the keys are only discovered
+    once and each row is written directly into the columns.
+    Numeric values are stored in float64 columns and all other values in object columns.
+    The columns grow in chunks of `chunk_size` rows.
+    Rows where a key was not logged are NaN (or None for object columns).
+
+    Parameters
+    ----------
+    n_rows : int, optional
+        The number of rows to preallocate, by default 0
+    chunk_size : int, optional
+        The number of rows to grow the columns by, by default 1024
+
+    Example:
+    ```
+    process_runner = ProcessRunner(COLUMNAR_LOGS=True)
+    process_runner.run_timeseries(processes, initial_state, n_rows=8760)
+    df = process_runner.state_logs.to_dataframe()
+    ```
+    """
+
+    def __init__(self, n_rows: int = 0, chunk_size: int = 1024):
+        self.chunk_size = chunk_size
+        self.capacity = 0
+        self.row_count = 0
+        self.columns: Dict[str, np.ndarray] = {}
+        self.reserve(n_rows)
+
+    def reserve(self, n_rows: int):
+        """Grow the columns so that they can hold at least n_rows."""
+        if n_rows <= self.capacity:
+            return
+        chunks = -(-(n_rows - self.capacity) // self.chunk_size)
+        new_capacity = self.capacity + chunks * self.chunk_size
+        self.columns = {
+            k: self._extend_column(col, new_capacity) for k, col in self.columns.items()}
+        self.capacity = new_capacity
+
+    @staticmethod
+    def _empty_column(dtype: np.dtype, size: int) -> np.ndarray:
+        return np.full(size, np.nan if dtype == np.float64 else None, dtype=dtype)
+
+    def _extend_column(self, col: np.ndarray, size: int) -> np.ndarray:
+        new_col = self._empty_column(col.dtype, size)
+        new_col[:len(col)] = col
+        return new_col
+
+    def _add_column(self, key: str, val: Any) -> np.ndarray:
+        is_numeric = isinstance(val, (Number, np.number)) and not isinstance(val, (bool, np.bool_))
+        col = self._empty_column(np.float64 if is_numeric else object, self.capacity)
+        self.columns[key] = col
+        return col
+
+    def __getstate__(self) -> dict:
+        # Only the logged rows are stored. The columns are grown again by the next log
+        return {
+            **self.__dict__,
+            'capacity': self.row_count,
+            'columns': {k: col[:self.row_count] for k, col in self.columns.items()},
+        }
+
+    def log(self, row_index: int, values: Dict[str, Any]):
+        """Write the values to the row. Replaces existing values for the same keys."""
+        if row_index >= self.capacity:
+            self.reserve(row_index + 1)
+        if row_index >= self.row_count:
+            self.row_count = row_index + 1
+        columns = self.columns
+        for key, val in values.items():
+            col = columns.get(key)
+            if col is None:
+                col = self._add_column(key, val)
+            try:
+                col[row_index] = val
+            except (TypeError, ValueError):
+                # Non numeric value logged to a numeric column
+                col = columns[key] = col.astype(object)
+                col[row_index] = val
+
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        """Get the logged rows of each column. The arrays are views of the columns."""
+        return {k: col[:self.row_count] for k, col in self.columns.items()}
+
+    def to_dataframe(self):
+        """Get the logs as a pandas DataFrame.
+
+        The columns are not copied before they are passed to pandas but pandas may still copy
+        them when it groups columns of the same dtype into blocks. Modifying the DataFrame
+        should not be relied on to modify the logs.
+
+        Requires pandas to be installed.
+        """
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError('ColumnarLogs.to_dataframe requires pandas') from e
+        return pd.DataFrame(self.as_dict(), copy=False)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __getitem__(self, row_index: int) -> Dict[str, Any]:
+        if row_index < 0:
+            row_index += self.row_count
+        if not 0 <= row_index < self.row_count:
+            raise IndexError(f'Row {row_index} has not been logged')
+        return {k: col[row_index].item() if col.dtype == np.float64 else col[row_index]
+                for k, col in self.columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(self.row_count))
+
+
 def log_values(
     state_inputs: Callable[[Model_State_Shape], List[I]],
     additional_inputs: Callable[[List[I]], None] = lambda: []
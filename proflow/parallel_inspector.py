@@ -0,0 +1,216 @@
+"""Inspect the processes of a whole model on a process pool.
+
+`inspect_processes_to_interfaces` returns the same results as calling
+`inspect_process_to_interfaces` on each process but the map functions are grouped by the
+file they are defined in. Each worker parses a file once and locates the map functions in the
+module AST by their line number and argument names. The source of each map function is cut
+from the shared file lines so the function sources are not read and parsed one at a time.
+
+Map functions that cannot be located in the module AST fall back to the standard parser.
+Map functions without a code object are inspected in the calling process.
+
+The map functions are sent to the workers as marshalled code objects so the workers must run
+the same Python version.
+
+Example:
+```
+parsed = inspect_processes_to_interfaces(processes, max_workers=8)
+```
+"""
+import ast
+import inspect
+import linecache
+import marshal
+import types
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from .Objects.Interface import I
+from .Objects.Process import Process
+from .process_inspector import (
+    PARSE_CACHE,
+    ProflowParsingError,
+    fieldNotEmpty,
+    get_inputs,
+    get_inputs_list_from_function_def,
+    get_outputs_from_lambda_body,
+    parse_inputs_to_interface,
+    parse_outputs_to_interface,
+)
+
+Parsed = namedtuple(
+    'Parsed', 'config_inputs state_inputs parameter_inputs additional_inputs state_outputs')
+
+#: The process fields that are inspected and if they are outputs
+INSPECTED_FIELDS = {
+    'config_inputs': False,
+    'state_inputs': False,
+    'additional_inputs': False,
+    'state_outputs': True,
+}
+
+#: (process index, field name, code object or marshalled code)
+InspectItem = Tuple[int, str, Union[types.CodeType, bytes]]
+#: (process index, field name, interfaces or error message, is error)
+InspectResult = Tuple[int, str, Union[List[I], str], bool]
+
+
+def _make_function(code: types.CodeType) -> Callable:
+    closure = tuple(types.CellType() for _ in code.co_freevars)
+    return types.FunctionType(code, {}, code.co_name, None, closure)
+
+
+def _get_function_nodes(
+    module_tree: ast.Module,
+) -> Dict[int, List[Union[ast.Lambda, ast.FunctionDef]]]:
+    """Get the lambda and function definition nodes by their first line number."""
+    nodes = defaultdict(list)
+    for node in ast.walk(module_tree):
+        if isinstance(node, ast.Lambda):
+            nodes[node.lineno].append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            lineno = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            nodes[lineno].append(node)
+    return nodes
+
+
+def _find_function_node(
+    nodes: Dict[int, List[Union[ast.Lambda, ast.FunctionDef]]],
+    code: types.CodeType,
+) -> Union[ast.Lambda, ast.FunctionDef, None]:
+    """Find the node of the code object. None if there is not exactly one match."""
+    arg_names = list(code.co_varnames[:code.co_argcount])
+    matches = [
+        n for n in nodes.get(code.co_firstlineno, [])
+        if [a.arg for a in n.args.args] == arg_names and
+        (isinstance(n, ast.Lambda) or n.name == code.co_name)
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+
+def _seed_parse_cache(
+    fn: Callable,
+    lines: List[str],
+    node: Union[ast.Lambda, ast.FunctionDef, None],
+    is_output: bool,
+):
+    """Store the function source and parsed map from the shared file in the parse cache."""
+    code = fn.__code__
+    # Equivalent to inspect.getsource with the file lines already loaded
+    PARSE_CACHE.set('source', fn, ''.join(inspect.getblock(lines[code.co_firstlineno - 1:])))
+    if node is None:
+        return
+    try:
+        inputs_list = node.body if isinstance(node, ast.Lambda) \
+            else get_inputs_list_from_function_def(node)
+        if is_output:
+            PARSE_CACHE.set('outputs', fn, get_outputs_from_lambda_body(inputs_list))
+        else:
+            PARSE_CACHE.set('inputs', fn, get_inputs(inputs_list))
+    except Exception:
+        # Parsed again by the standard parser so that errors are handled the same way
+        pass
+
+
+def inspect_file(source_path: str, items: List[InspectItem]) -> List[InspectResult]:
+    """Inspect the map functions that are defined in the source file."""
+    results = []
+    try:
+        lines = linecache.getlines(source_path)
+        nodes = _get_function_nodes(ast.parse(''.join(lines)))
+    except (OSError, SyntaxError, ValueError):
+        lines, nodes = None, {}
+    for process_index, field_name, code in items:
+        fn = _make_function(marshal.loads(code) if isinstance(code, bytes) else code)
+        is_output = INSPECTED_FIELDS[field_name]
+        try:
+            if lines:
+                _seed_parse_cache(fn, lines, _find_function_node(nodes, fn.__code__), is_output)
+            interfaces = parse_outputs_to_interface(fn) if is_output \
+                else parse_inputs_to_interface(fn)
+            results.append((process_index, field_name, interfaces, False))
+        except Exception as e:
+            results.append((process_index, field_name, str(e), True))
+    return results
+
+
+def _inspect_field(map_fn: Callable, is_output: bool) -> Any:
+    if not fieldNotEmpty(map_fn):
+        return fieldNotEmpty(map_fn)
+    return parse_outputs_to_interface(map_fn) if is_output else parse_inputs_to_interface(map_fn)
+
+
+def inspect_processes_to_interfaces(
+    processes: List[Process],
+    max_workers: int = None,
+    mp_context=None,
+) -> List[Parsed]:
+    """Inspect each process like `inspect_process_to_interfaces` using a process pool.
+
+    Parameters
+    ----------
+    processes : List[Process]
+        The processes to inspect
+    max_workers : int, optional
+        The number of worker processes, by default the number of CPUs.
+        If 0 the files are inspected in the calling process
+    mp_context : multiprocessing.context.BaseContext, optional
+        The multiprocessing context used to start the workers
+
+    Returns
+    -------
+    List[Parsed]
+        The parsed interfaces of each process in the original order
+
+    Raises
+    ------
+    ProflowParsingError
+        For the first process in order that failed to be inspected
+    """
+    fields: List[Dict[str, Any]] = [{} for _ in processes]
+    items_by_file: Dict[str, List[InspectItem]] = defaultdict(list)
+    errors: Dict[int, str] = {}
+    for i, process in enumerate(processes):
+        for field_name, is_output in INSPECTED_FIELDS.items():
+            map_fn = getattr(process, field_name)
+            code = getattr(map_fn, '__code__', None)
+            if code is not None and fieldNotEmpty(map_fn):
+                items_by_file[code.co_filename].append(
+                    (i, field_name, code if max_workers == 0 else marshal.dumps(code)))
+                continue
+            try:
+                fields[i][field_name] = _inspect_field(map_fn, is_output)
+            except Exception as e:
+                errors.setdefault(i, str(e))
+
+    source_paths = list(items_by_file)
+    if max_workers == 0:
+        file_results = map(inspect_file, source_paths, items_by_file.values())
+        results = [r for file_result in file_results for r in file_result]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            results = [
+                r for file_result in executor.map(
+                    inspect_file, source_paths, [items_by_file[p] for p in source_paths])
+                for r in file_result]
+
+    for process_index, field_name, value, is_error in results:
+        if is_error:
+            errors[process_index] = errors.get(process_index, value)
+        else:
+            fields[process_index][field_name] = value
+    if errors:
+        first_error = min(errors)
+        raise ProflowParsingError(errors[first_error], processes[first_error])
+    return [
+        Parsed(
+            config_inputs=f['config_inputs'],
+            state_inputs=f['state_inputs'],
+            # Matches inspect_process_to_interfaces
+            parameter_inputs=f['state_inputs'],
+            additional_inputs=f['additional_inputs'],
+            state_outputs=f['state_outputs'],
+        )
+        for f in fields
+    ]
@@ -0,0 +1,180 @@
+"""Memoize process results on their input values.
+
+A process opts in with `Process(cache=True)`, `Process(cache=maxsize)` or
+`Process(cache=CacheSettings(...))`. The ProcessRunner keeps a bounded LRU per process that is
+keyed on the args and kwargs from `get_inputs_from_process`. On a hit the process function
+is not called.
+
+Inputs that hash by identity, e.g. dataclass and other mutable objects, are keyed on their
+content with `proflow.disk_cache.stable_value` so modifying them in place does not return a
+stale result. Calls with inputs that cannot be keyed are not cached and count as a miss.
+
+NOTE: Cached results are shared between rows so must not be modified in place.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from .disk_cache import stable_value
+
+DEFAULT_CACHE_SIZE = 128
+
+KeyFn = Callable[[List[Any], Dict[str, Any]], Hashable]
+
+
+@dataclass
+class CacheSettings:
+    """Process cache settings.
+
+    Parameters:
+        maxsize: int
+            The maximum number of results to keep
+        key_fn: Callable[[List[Any], Dict[str, Any]], Hashable]
+            Get the cache key from the process args and kwargs.
+            By default the values are converted with `make_hashable`.
+            Can be used to e.g. round NumPy inputs so near identical inputs share a result.
+    """
+    maxsize: int = DEFAULT_CACHE_SIZE
+    key_fn: KeyFn = None
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+def make_hashable(val: Any) -> Hashable:
+    """Convert a process input to a hashable key.
+
+    NumPy arrays are keyed on their dtype, shape and bytes.
+    Lists, tuples and dicts are converted recursively.
+    Objects without their own hash are keyed on their type and content.
+
+    Raises
+    ------
+    TypeError
+        If the value cannot be converted
+    """
+    if isinstance(val, np.ndarray):
+        return ('ndarray', val.dtype.str, val.shape, val.tobytes())
+    if isinstance(val, (list, tuple)):
+        return (type(val).__name__, tuple(make_hashable(v) for v in val))
+    if isinstance(val, dict):
+        return ('dict', tuple((k, make_hashable(v)) for k, v in sorted(val.items())))
+    if isinstance(val, set):
+        return ('set', frozenset(make_hashable(v) for v in val))
+    if val is None or type(val).__hash__ not in (object.__hash__, None):
+        hash(val)
+        return val
+    try:
+        return ('object', type(val).__qualname__, stable_value(val))
+    except Exception as e:
+        raise TypeError(f'Cannot make a cache key from {type(val).__name__}') from e
+
+
+def default_key(args: List[Any], kwargs: Dict[str, Any]) -> Hashable:
+    return make_hashable(args), make_hashable(kwargs)
+
+
+def get_cache_settings(cache: Union[bool, int, CacheSettings]) -> CacheSettings:
+    """Get the settings from the `Process.cache` value."""
+    if isinstance(cache, CacheSettings):
+        return cache
+    if cache is True:
+        return CacheSettings()
+    if isinstance(cache, int) and cache > 0:
+        return CacheSettings(maxsize=cache)
+    raise ValueError(f'Invalid process cache setting: {cache}')
+
+
+class ProcessCache:
+    """A bounded LRU of process results.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of results to keep, by default DEFAULT_CACHE_SIZE
+    key_fn : KeyFn, optional
+        Get the cache key from the args and kwargs, by default `default_key`
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, key_fn: KeyFn = None):
+        self.maxsize = maxsize
+        self.key_fn = key_fn or default_key
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict = OrderedDict()
+
+    def call(self, func: Callable, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Get the cached result or call func and cache its result.
+
+        If the key cannot be made from the inputs func is called without caching.
+        """
+        try:
+            key = self.key_fn(args, kwargs)
+        except TypeError:
+            self.misses += 1
+            return func(*args, **kwargs)
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            result = func(*args, **kwargs)
+            self._results[key] = result
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+            return result
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def clear(self):
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self._results), self.maxsize)
+
+
+class ProcessCaches:
+    """The caches of each process run by a ProcessRunner.
+
+    Caches are held per process object so that processes that share a function but have
+    different closures or args do not share results.
+    """
+
+    def __init__(self):
+        self._caches: Dict[int, Tuple[Any, ProcessCache]] = {}
+
+    def get(self, process) -> ProcessCache:
+        cached = self._caches.get(id(process))
+        if cached is not None and cached[0] is process:
+            return cached[1]
+        settings = get_cache_settings(process.cache)
+        cache = ProcessCache(settings.maxsize, settings.key_fn)
+        self._caches[id(process)] = (process, cache)
+        return cache
+
+    def info(self, get_process_id: Callable[[Any], str]) -> Dict[str, CacheInfo]:
+        """Get the cache info of each process keyed by process id.
+
+        If processes share an id the later ones are suffixed with their position e.g. "#2".
+        """
+        out = {}
+        for process, cache in self._caches.values():
+            process_id = get_process_id(process)
+            key = process_id
+            n = 1
+            while key in out:
+                n += 1
+                key = f'{process_id}#{n}'
+            out[key] = cache.info()
+        return out
+
+    def clear(self):
+        self._caches = {}
@@ -0,0 +1,260 @@
+"""Compile a list of processes into a single fused step function.
+
+The ProcessRunner dispatches every process through `process_switcher` on every timestep.
+This re-checks the process type, debug mode, gate and output mode each time and builds
+the input lists with `get_inputs_from_process`.
+
+`compile_processes` resolves all of this once and generates the source for a single
+`step(state)` function where the dispatch and the args/kwargs assembly are inlined for
+each process.
+"""
+import linecache
+from copy import deepcopy
+from itertools import count
+from typing import TYPE_CHECKING, Callable, List
+
+from .Objects.Process import Process, ProcessType, GET_INPUT_FACTORY_INNER
+from .helpers import compile_setter
+from .process_inspector import STATIC_PATH_SEGMENT, parse_state_writes
+from .process_ins_and_outs import get_inputs_from_process
+from .process_state_modifiers import map_result_to_state_fn
+from .scheduler import any_paths_overlap
+from .internal_state import Model_State_Shape
+
+if TYPE_CHECKING:
+    from .ProcessRunnerCls import ProcessRunner
+
+_COMPILED_ID = count()
+
+
+def has_inputs(map_inputs_fn: Callable) -> bool:
+    """Check if a process input function has been set."""
+    return map_inputs_fn is not GET_INPUT_FACTORY_INNER
+
+
+def is_invariant_process(process: Process) -> bool:
+    """Check if the process gives the same result on every row.
+
+    Processes with state inputs are never invariant as they are ran before the state exists.
+    Otherwise uses `process.pure` if set or checks that the process has no external state
+    inputs.
+    """
+    if process.ptype != ProcessType.STANDARD or not process.gate:
+        return False
+    if has_inputs(process.state_inputs):
+        return False
+    if process.pure is not None:
+        return process.pure
+    return not has_inputs(process.external_state_inputs)
+
+
+def _is_write_once(i: int, processes: List[Process], targets: List[str]) -> bool:
+    """Check that no other process can overwrite the targets of process i."""
+    if not all(STATIC_PATH_SEGMENT.match(part) for t in targets for part in t.split('.')):
+        return False
+    for j, other in enumerate(processes):
+        if j == i or other.ptype != ProcessType.STANDARD or not other.gate:
+            continue
+        writes = parse_state_writes(other.state_outputs)
+        if writes is None or any_paths_overlap(writes, set(targets)):
+            return False
+    return True
+
+
+def _compile_hoisted_process(
+    i: int,
+    process: Process,
+    processes: List[Process],
+    runner: 'ProcessRunner',
+    namespace: dict,
+) -> List[str]:
+    """Run an invariant process now and generate the source lines that write its outputs.
+
+    If nothing else writes to the output targets they are only written on the first call.
+    Otherwise a deep copy of the cached outputs is written every call so that writes into
+    the outputs by later processes do not change the cached values.
+    """
+    args, kwargs = get_inputs_from_process(
+        process, None, runner.config, runner.parameters, runner.external_state,
+        runner.tm.row_index)
+    result = process.func(*args, **kwargs)
+    if runner.IMMUTABLE_MODE:
+        namespace[f'so_{i}'] = process.state_outputs
+        namespace[f'result_{i}'] = result
+        return [f'    state = map_result_to_state_fn(state, so_{i}, result_{i})']
+    if process.format_output:
+        namespace[f'so_{i}'] = process.state_outputs
+        namespace[f'result_{i}'] = result
+        return [f'    state = map_result_to_state_fn(state, so_{i}, deepcopy(result_{i}))']
+    if runner.copy_on_write is not None:
+        # The outputs are copied before they are written into
+        namespace[f'process_{i}'] = process
+        namespace[f'result_{i}'] = result
+        return [f'    state = runner.map_outputs(state, process_{i}, result_{i})']
+
+    outputs = list(process.state_outputs(result))
+    namespace[f'hoisted_{i}'] = [(compile_setter(target), val) for val, target in outputs]
+    if not _is_write_once(i, processes, [target for _, target in outputs]):
+        return [
+            f'    for setter, val in hoisted_{i}:',
+            '        setter(state, deepcopy(val))',
+        ]
+    namespace['write_once_pending'].add(i)
+    return [
+        f'    if {i} in write_once_pending:',
+        f'        for setter, val in hoisted_{i}:',
+        '            setter(state, val)',
+        f'        write_once_pending.discard({i})',
+    ]
+
+
+def _compile_standard_process(
+    i: int,
+    process: Process,
+    namespace: dict,
+    IMMUTABLE_MODE: bool = False,
+    copy_on_write: bool = False,
+) -> List[str]:
+    """Generate the source lines that run a standard process inline.
+
+    Only the input functions that have been set on the process are called.
+    The args and kwargs are assembled in the same order as `get_inputs_from_process`.
+    """
+    namespace[f'func_{i}'] = process.func
+    namespace[f'pargs_{i}'] = process.args
+    namespace[f'so_{i}'] = process.state_outputs
+
+    # Sources that can provide both args and kwargs in `get_inputs_from_process` order
+    positional_sources = [
+        (process.config_inputs, 'ci', 'config'),
+        (process.state_inputs, 'si', 'state'),
+        (process.additional_inputs, 'ai', ''),
+        (process.external_state_inputs, 'ei', 'external_state, tm.row_index'),
+    ]
+    input_calls = []
+    for fn, name, call_args in positional_sources:
+        if has_inputs(fn):
+            namespace[f'{name}_{i}'] = fn
+            input_calls.append(f'{name}_{i}({call_args})')
+
+    lines = []
+    if input_calls:
+        lines.append(f'    inputs = {" + ".join(input_calls)}')
+    # parameters only ever map to kwargs
+    kwarg_sources = 'inputs' if input_calls else ''
+    if has_inputs(process.parameters_inputs):
+        namespace[f'pi_{i}'] = process.parameters_inputs
+        kwarg_sources = f'{kwarg_sources} + pi_{i}(parameters)' if input_calls \
+            else f'pi_{i}(parameters)'
+
+    call_args = [f'*pargs_{i}'] if process.args else []
+    if input_calls:
+        lines.append('    args = [inp.from_ for inp in inputs if inp.as_ is None]')
+        call_args.append('*args')
+    if kwarg_sources:
+        lines.append(
+            f'    kwargs = {{inp.as_: inp.from_ for inp in {kwarg_sources} '
+            f'if inp.as_ is not None}}')
+        call_args.append('**kwargs')
+    lines.append(f'    result = func_{i}({", ".join(call_args)})')
+
+    if process.format_output or IMMUTABLE_MODE:
+        lines.append(f'    state = map_result_to_state_fn(state, so_{i}, result)')
+    elif copy_on_write:
+        namespace[f'process_{i}'] = process
+        lines.append(f'    state = runner.map_outputs(state, process_{i}, result)')
+    else:
+        lines.append(f'    for val, target in so_{i}(result):')
+        lines.append('        compile_setter(target)(state, val)')
+    return lines
+
+
+def compile_processes(
+    runner: 'ProcessRunner',
+    processes: List[Process],
+    hoist_invariants: bool = False,
+) -> Callable[[Model_State_Shape], Model_State_Shape]:
+    """Compile a list of processes into a single step function.
+
+    The process type, DEBUG_MODE, PROFILE_MODE, IMMUTABLE_MODE, gate and format_output flags
+    and whether the runner writes with copy on write (see `proflow.fork`) are resolved at
+    compile time. Processes with a False gate are removed.
+
+    The runner's config, parameters and external state are bound at compile time.
+    If these are replaced on the runner the processes must be recompiled.
+    The time manager is looked up on each call so that `runner.reset()` is respected.
+
+    If hoist_invariants is True processes that only depend on the config, parameters and
+    additional inputs (see `is_invariant_process`) are ran once at compile time.
+    Their outputs are then copied into the state on each call or, if no other process writes
+    to the same state fields, only written on the first call. Call `step.reset_hoisted()`
+    before reusing the step with a new state.
+
+    Parameters
+    ----------
+    runner : ProcessRunner
+        The process runner to compile the processes against
+    processes : List[Process]
+        The processes to compile
+    hoist_invariants : bool, optional
+        If True run invariant processes once at compile time, by default False
+
+    Returns
+    -------
+    Callable[[Model_State_Shape], Model_State_Shape]
+        A function that runs all processes on the input state and returns the new state
+
+    """
+    namespace = {
+        'runner': runner,
+        'config': runner.config,
+        'parameters': runner.parameters,
+        'external_state': runner.external_state,
+        'compile_setter': compile_setter,
+        'map_result_to_state_fn': map_result_to_state_fn,
+        'deepcopy': deepcopy,
+        'write_once_pending': set(),
+    }
+    body = []
+    for i, process in enumerate(processes):
+        if process.ptype == ProcessType.STANDARD and not process.gate:
+            continue
+        comment = process.comment or getattr(process.func, '__name__', '')
+        body.append(f'    # {i}: {" ".join(comment.splitlines())}')
+        if process.ptype == ProcessType.TIME:
+            namespace[f'func_{i}'] = process.func
+            body.append(f'    func_{i}(tm=runner.tm)')
+        elif process.ptype == ProcessType.LOG:
+            namespace[f'process_{i}'] = process
+            body.append(f'    state = runner.run_process_log(state, process_{i})')
+        elif hoist_invariants and is_invariant_process(process):
+            body += _compile_hoisted_process(i, process, processes, runner, namespace)
+        elif runner.PROFILE_MODE:
+            namespace[f'process_{i}'] = process
+            body.append(f'    state = runner.run_process_profile(state, process_{i})')
+        elif runner.DEBUG_MODE:
+            namespace[f'process_{i}'] = process
+            body.append(f'    state = runner.run_process_debug(state, process_{i})')
+        elif process.cache or process.disk_cache:
+            namespace[f'process_{i}'] = process
+            body.append(f'    state = runner.run_process(state, process_{i})')
+        else:
+            body += _compile_standard_process(
+                i, process, namespace, runner.IMMUTABLE_MODE, runner.copy_on_write is not None)
+
+    source = '\n'.join([
+        'def step(state):',
+        '    tm = runner.tm',
+        *body,
+        '    runner.current_state = state',
+        '    return state',
+    ])
+    filename = f'<proflow-compiled-{next(_COMPILED_ID)}>'
+    # Register the source so that tracebacks can show the generated lines
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, 'exec'), namespace)
+    step = namespace['step']
+    step.__source__ = source
+    write_once = set(namespace['write_once_pending'])
+    step.reset_hoisted = lambda: namespace['write_once_pending'].update(write_once)
+    return step
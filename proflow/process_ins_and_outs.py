@@ -1,7 +1,7 @@
 """Functions that get input args from the process and modify state from outputs in process."""
 from typing import Any, Callable, List
 
-from .helpers import rsetattr
+from .helpers import compile_setter
 from .Objects.Process import Process
 from .internal_state import Model_State_Shape
 from .config import Config_Shape
@@ -68,6 +68,8 @@ def map_result_to_state(
     """Update the state based on an output mapping.
     WARNING: MUTATES STATE
 
+    The output targets are parsed once and cached. See `proflow.helpers.compile_setter`.
+
     using `_result` as an output key will map the entire result to the state target
 
     Parameters
@@ -85,5 +87,5 @@ def map_result_to_state(
         [description]
     """
     for from_, as_ in output_map(result):
-        rsetattr(prev_state, as_, from_)
+        compile_setter(as_)(prev_state, from_)
     return prev_state
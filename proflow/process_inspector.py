@@ -1,10 +1,13 @@
 from collections import namedtuple
-from typing import List, Tuple, TYPE_CHECKING, Callable, Union, Dict
+from copy import copy
+from typing import Any, List, NamedTuple, Tuple, TYPE_CHECKING, Callable, Union, Dict
 import inspect
+import os
 import re
 import warnings
 import ast
 import textwrap
+from types import CodeType
 
 from proflow.Objects.Interface import I
 
@@ -86,15 +89,111 @@ class ProflowParsingAstError(Exception):
 ArgMap = Dict[str, str]
 
 
+class ParseCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
+def _get_mtime(code: CodeType) -> Union[float, None]:
+    try:
+        return os.stat(code.co_filename).st_mtime
+    except OSError:
+        return None
+
+
+class ParseCache:
+    """Cache of parsed map functions keyed by the function code object.
+
+    The source file modification time is stored with each entry so that entries are
+    invalidated when the source file changes.
+    Functions without a code object are not cached.
+
+    If `disk_cache` is set misses are looked up in it before parsing.
+    See `proflow.inspector_cache`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.disk_cache = None
+        self._entries: Dict[Tuple[str, Any], Tuple[float, Any]] = {}
+
+    def get(self, kind: str, fn: Callable, parse: Callable[[Callable], Any]) -> Any:
+        """Get the cached result of parse(fn) for the kind of parse."""
+        code = getattr(fn, '__code__', None)
+        if code is None:
+            return parse(fn)
+        mtime = _get_mtime(code)
+        key = (kind, code)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        result = self._parse(kind, fn, parse)
+        self._entries[key] = (mtime, result)
+        return result
+
+    def set(self, kind: str, fn: Callable, result: Any):
+        """Store a result that was parsed elsewhere e.g. from a shared module AST."""
+        code = fn.__code__
+        self._entries[(kind, code)] = (_get_mtime(code), result)
+
+    def _parse(self, kind: str, fn: Callable, parse: Callable[[Callable], Any]) -> Any:
+        disk_cache = self.disk_cache
+        if disk_cache is None or kind not in disk_cache.kinds:
+            return parse(fn)
+        found, result = disk_cache.get(kind, fn.__code__)
+        if not found:
+            result = parse(fn)
+            disk_cache.set(kind, fn.__code__, result)
+        return result
+
+    def info(self) -> ParseCacheInfo:
+        return ParseCacheInfo(self.hits, self.misses, len(self._entries))
+
+    def clear(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+
+#: Shared by parse_inputs, parse_outputs and the process inspection functions
+PARSE_CACHE = ParseCache()
+
+
+def get_source(fn: Callable) -> str:
+    """Get the source of a function using the parse cache."""
+    return PARSE_CACHE.get('source', fn, inspect.getsource)
+
+
+def _parse_source(fn: Callable) -> Tuple[str, ast.Module]:
+    source_code = textwrap.dedent(get_source(fn))
+    return source_code, ast.parse(source_code)
+
+
+def get_source_ast(fn: Callable) -> Tuple[str, ast.Module]:
+    """Get the dedented source and AST of a function using the parse cache.
+
+    NOTE: The AST is shared so must not be modified.
+    """
+    return PARSE_CACHE.get('ast', fn, _parse_source)
+
+
 def strip_out_comments(string: str) -> str:
     r = re.compile(r'#.*?$', re.MULTILINE)
     return r.sub('', string)
 
 
 def extract_output_lines(map_inputs_fn: Callable[[object], List[str]]) -> List[str]:
+    return list(PARSE_CACHE.get('output_lines', map_inputs_fn, _extract_output_lines))
+
+
+def _extract_output_lines(map_inputs_fn: Callable[[object], List[str]]) -> List[str]:
     outputs_source = None
     try:
-        outputs_source = strip_out_comments(inspect.getsource(map_inputs_fn))
+        outputs_source = strip_out_comments(get_source(map_inputs_fn))
         if outputs_source[0:len("def GET_INPUT_FACTORY_INNER")] == "def GET_INPUT_FACTORY_INNER":
             return []
 
@@ -103,7 +202,7 @@ def extract_output_lines(map_inputs_fn: Callable[[object], List[str]]) -> List[s
         # Get lines
         r = re.compile(r'(?: |\[|^)\((.*?)\)(?:,|$)$', re.DOTALL | re.MULTILINE)
         matches = r.finditer(output_map_raw)
-        lines = (g for match in matches if match is not None for g in match.groups())
+        lines = [g for match in matches if match is not None for g in match.groups()]
         return lines
     except AttributeError as error:
         warnings.warn(Warning(f"""Failed to parse output lines
@@ -703,17 +802,28 @@ def get_outputs_from_lambda_body(input_list: ast.List):
     return input_mapping
 
 
+def _parse_inputs_map(map_inputs_fn: Callable[[any], List[I]]) -> ArgMap:
+    _, ast_tree = get_source_ast(map_inputs_fn)
+    return get_inputs(get_inputs_list(ast_tree.body[0]))
+
+
+def _parse_outputs_map(map_outputs_fn: Callable[[any], List[I]]) -> dict:
+    _, ast_tree = get_source_ast(map_outputs_fn)
+    return get_outputs_from_lambda_body(get_inputs_list(ast_tree.body[0]))
+
+
 def parse_inputs(
     map_inputs_fn: Callable[[any], List[I]], allow_errors: bool = True, silent=False,
 ) -> dict:
-    source_code = textwrap.dedent(inspect.getsource(map_inputs_fn))
-    ast_tree = ast.parse(source_code)
+    source_code = textwrap.dedent(get_source(map_inputs_fn))
     if source_code[0:5] == "field":
         return {}  # input function is not set
     try:
-        inputs_list = get_inputs_list(ast_tree.body[0])
-        inputs_map = get_inputs(inputs_list)
-        return inputs_map
+        inputs_map = PARSE_CACHE.get('inputs', map_inputs_fn, _parse_inputs_map)
+        return copy(inputs_map)
+    except SyntaxError:
+        # The source could not be parsed at all
+        raise
     except ProflowParsingError as e:
         if not silent:
             print("ProFlowParsingError\n==================")
@@ -741,6 +851,7 @@ def parse_inputs(
             return {}
     except Exception as e:
         if not allow_errors:
+            _, ast_tree = get_source_ast(map_inputs_fn)
             print("ProFlowParsingFunctionError\n==================")
             print(source_code)
             print("============")
@@ -760,12 +871,9 @@ def parse_inputs(
 
 
 def parse_outputs_b(map_inputs_fn: Callable[[any], List[I]]) -> dict:
-    source_code = textwrap.dedent(inspect.getsource(map_inputs_fn))
     try:
-        ast_tree = ast.parse(source_code)
-        inputs_list = get_inputs_list(ast_tree.body[0])
-        inputs_map = get_outputs_from_lambda_body(inputs_list)
-        return inputs_map
+        inputs_map = PARSE_CACHE.get('outputs', map_inputs_fn, _parse_outputs_map)
+        return copy(inputs_map)
     except Exception as e:
         raise e from e
 
@@ -830,3 +938,127 @@ def inspect_process_to_interfaces(process: 'Process'):
         )
     except Exception as e:
         raise ProflowParsingError(str(e), process)
+
+
+#: A path segment that can be resolved without running the process
+STATIC_PATH_SEGMENT = re.compile(r'^(?:[A-Za-z_][A-Za-z0-9_]*|\d+)$')
+
+
+def _get_map_fn_ast(map_fn: Callable) -> Union[ast.Lambda, ast.FunctionDef, None]:
+    """Get the lambda or function definition of a process map function.
+
+    Returns None if the source cannot be found or contains more than one function.
+    """
+    return PARSE_CACHE.get('map_fn_ast', map_fn, _parse_map_fn_ast)
+
+
+def _parse_map_fn_ast(map_fn: Callable) -> Union[ast.Lambda, ast.FunctionDef, None]:
+    try:
+        source_code = textwrap.dedent(get_source(map_fn)).strip()
+    except (OSError, TypeError):
+        return None
+    # Lambda source can end inside the Process call e.g. `lambda result: [...]),`
+    # so the trailing commas and brackets are removed one at a time until it parses
+    while True:
+        try:
+            ast_tree = ast.parse(source_code)
+            break
+        except SyntaxError:
+            if not source_code or source_code[-1] not in ',)':
+                return None
+            source_code = source_code[:-1].rstrip()
+    fns = [n for n in ast.walk(ast_tree) if isinstance(n, (ast.Lambda, ast.FunctionDef))]
+    if len(fns) != 1 or not fns[0].args.args:
+        return None
+    return fns[0]
+
+
+def _get_static_path(node: ast.AST, root_name: str) -> Union[str, None]:
+    """Get the static part of an attribute and subscript chain on root_name.
+
+    E.g. `state.matrix[state.ind][0]` returns "matrix".
+    Returns None if the chain is not on root_name.
+    """
+    parts = []
+    while True:
+        if isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        elif isinstance(node, ast.Subscript):
+            index = node.slice
+            if isinstance(index, ast.Constant) and isinstance(index.value, (int, str)) \
+                    and STATIC_PATH_SEGMENT.match(str(index.value)):
+                parts.append(str(index.value))
+            else:
+                # Anything below a dynamic index could be read
+                parts = []
+            node = node.value
+        elif isinstance(node, ast.Name):
+            return '.'.join(reversed(parts)) if node.id == root_name else None
+        else:
+            return None
+
+
+def parse_state_reads(map_inputs_fn: Callable) -> Union[set, None]:
+    """Get the state paths that a state_inputs function reads.
+
+    Every access on the state argument is recovered, including ones used as indexes.
+    Paths are cut at the first dynamic index so they are a conservative superset.
+    An empty path means the whole state is read.
+
+    Returns
+    -------
+    Union[set, None]
+        Dot notation state paths or None if the function could not be parsed
+    """
+    if map_inputs_fn.__name__ == 'GET_INPUT_FACTORY_INNER':
+        return set()
+    fn_tree = _get_map_fn_ast(map_inputs_fn)
+    if fn_tree is None:
+        return None
+    root_name = fn_tree.args.args[0].arg
+    chain_children = {
+        id(n.value) for n in ast.walk(fn_tree) if isinstance(n, (ast.Attribute, ast.Subscript))}
+    paths = set()
+    for node in ast.walk(fn_tree):
+        if isinstance(node, (ast.Attribute, ast.Subscript, ast.Name)) \
+                and id(node) not in chain_children:
+            path = _get_static_path(node, root_name)
+            if path is not None:
+                paths.add(path)
+    return paths
+
+
+def parse_state_writes(map_outputs_fn: Callable) -> Union[set, None]:
+    """Get the state paths that a state_outputs function writes to.
+
+    Targets are cut at the first segment that is not a plain key e.g. "a.+" returns "a".
+
+    Returns
+    -------
+    Union[set, None]
+        Dot notation state paths or None if the function could not be parsed
+    """
+    if map_outputs_fn.__name__ == 'GET_INPUT_FACTORY_INNER':
+        return set()
+    fn_tree = _get_map_fn_ast(map_outputs_fn)
+    if fn_tree is None:
+        return None
+    body = fn_tree.body
+    if isinstance(fn_tree, ast.FunctionDef):
+        body = body[-1].value if body and isinstance(body[-1], ast.Return) else None
+    if not isinstance(body, ast.List):
+        return None
+    paths = set()
+    for elt in body.elts:
+        if not (isinstance(elt, ast.Tuple) and len(elt.elts) == 2 and
+                isinstance(elt.elts[1], ast.Constant) and
+                isinstance(elt.elts[1].value, str)):
+            return None
+        static_parts = []
+        for part in elt.elts[1].value.split('.'):
+            if not STATIC_PATH_SEGMENT.match(part):
+                break
+            static_parts.append(part)
+        paths.add('.'.join(static_parts))
+    return paths
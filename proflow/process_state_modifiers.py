@@ -1,8 +1,8 @@
 """Functions that modify state without mutation."""
-from dataclasses import is_dataclass, replace
+from dataclasses import is_dataclass
 from functools import partial, reduce
 from typing import List
-from copy import deepcopy
+from copy import copy
 
 from .helpers import rgetattr
 from .Objects.Interface import I
@@ -12,7 +12,11 @@ from .internal_state import Model_State_Shape
 def get_new_val_fn(attr, acc):
     """sets the value based on the type of input.
 
-    Same as get_new_val but does not mutate the state
+    Same as get_new_val but does not mutate the state.
+    Only the object itself is copied. Its children are shared with the original object.
+    Objects that are not a list, dict or numpy array are copied with `copy` and their
+    attributes set. Dataclasses are not rebuilt with `dataclasses.replace` so fields with
+    init=False are kept and __post_init__ is not ran again.
 
     Parameters
     ----------
@@ -27,11 +31,8 @@ def get_new_val_fn(attr, acc):
         The modified object
 
     """
-    # NOTE: We can speed this up by removeing the replace and deepcopy functions
-    if is_dataclass(attr):
-        return replace(attr, **acc)
     if isinstance(attr, list) or type(attr).__module__ == 'numpy':
-        list_copy = deepcopy(attr)
+        list_copy = copy(attr)
         for k, v in acc.items():
             if k == '+':
                 list_copy.append(v)
@@ -39,14 +40,18 @@ def get_new_val_fn(attr, acc):
                 list_copy[int(k)] = v
         return list_copy
     if isinstance(attr, dict):
-        dict_copy = deepcopy(attr)
+        dict_copy = copy(attr)
         for k, v in acc.items():
             dict_copy[k] = v
         return dict_copy
 
     # TODO: Handle named tuple
-    # TODO: Handle numpy
-    raise Exception(f'Invalid type: {type(attr)}')
+    obj_copy = copy(attr)
+    # Also sets the fields of frozen dataclasses
+    set_attr = object.__setattr__ if is_dataclass(attr) else setattr
+    for k, v in acc.items():
+        set_attr(obj_copy, k, v)
+    return obj_copy
 
 
 def build_up_args(
@@ -84,6 +89,25 @@ def build_up_args(
 
 
 def replace_state_val(initial_state, target, val):
+    """Replace the value at the target without mutating the initial state.
+
+    Uses path copying. Only the objects along the target path are copied.
+    All other objects are shared between the initial and the output state.
+
+    Parameters
+    ----------
+    initial_state : object
+        Object to update
+    target : str
+        Dot notation target e.g. "nested.na"
+    val : Any
+        The new value
+
+    Returns
+    -------
+    object
+        A copy of the initial state with the new value set at the target
+    """
     target_split = target.split('.')
     target_indexes = reversed(list(range(len(target_split[0:-1]))))
 
@@ -98,7 +122,69 @@ def replace_state_val(initial_state, target, val):
     return final_state
 
 
-# TODO: Find optimized version of implementing non mutable version
+class OutputTrie(dict):
+    """A branch in the trie of output targets.
+
+    Maps each key to either the new value or a child OutputTrie.
+    """
+
+
+def insert_output(trie: OutputTrie, target_split: List[str], val) -> bool:
+    """Insert an output into the output trie.
+
+    Parameters
+    ----------
+    trie : OutputTrie
+        The root of the output trie
+    target_split : List[str]
+        Dotstring target split into list
+    val : Any
+        The new value
+
+    Returns
+    -------
+    bool
+        False if the output could not be inserted because it writes inside a value
+        or appends to a list that is already set in this trie.
+    """
+    node = trie
+    for k in target_split[:-1]:
+        child = node.get(k)
+        if child is None:
+            child = node[k] = OutputTrie()
+        elif not isinstance(child, OutputTrie):
+            return False
+        node = child
+    k = target_split[-1]
+    if k == '+' and k in node:
+        return False
+    # A later value replaces any earlier writes inside the old value
+    node[k] = val
+    return True
+
+
+def apply_output_trie(initial_state, trie: OutputTrie):
+    """Rebuild each object in the output trie once without mutating the initial state.
+
+    Parameters
+    ----------
+    initial_state : object
+        Object to update
+    trie : OutputTrie
+        The output trie built with `insert_output`
+
+    Returns
+    -------
+    object
+        A copy of the initial state with the new values set
+    """
+    acc = {
+        k: apply_output_trie(rgetattr(initial_state, k), v) if isinstance(v, OutputTrie) else v
+        for k, v in trie.items()
+    }
+    return get_new_val_fn(initial_state, acc)
+
+
 def map_result_to_state_fn(
     prev_state: Model_State_Shape,
     output_map: List[I],
@@ -106,7 +192,10 @@ def map_result_to_state_fn(
 ) -> Model_State_Shape:
     """Update the state based on an output mapping.
 
-    Without state mutation.
+    Without state mutation. Untouched parts of the state are shared with the previous state.
+
+    The outputs are grouped by shared prefix into an OutputTrie so that each object
+    on the output paths is only copied once for all the outputs.
 
     NOTE: This uses old output setup but is immutable and can use complex characters in target
 
@@ -127,14 +216,15 @@ def map_result_to_state_fn(
         [description]
     """
     active_state = prev_state
+    trie = OutputTrie()
     for from_, as_ in output_map(result):
-        # NOTE: Below is depreciated. We now get result directly in process definition
-        # we recursively get the nested value
-        # result_item = rgetattr(result, from_) if from_ != '_result' else result
-
-        # Then recursively set the new value at each level as a copy (This is expensive!)
-        active_state = replace_state_val(active_state, as_, from_)
-    return active_state
+        target_split = as_.split('.')
+        if not insert_output(trie, target_split, from_):
+            # Output depends on an earlier output so we apply the earlier outputs first
+            active_state = apply_output_trie(active_state, trie)
+            trie = OutputTrie()
+            insert_output(trie, target_split, from_)
+    return apply_output_trie(active_state, trie) if trie else active_state
 
 
 # Version of get_new_val that mutates state but is much quicker!
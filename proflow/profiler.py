@@ -0,0 +1,90 @@
+"""Low overhead per process profiling.
+
+Used by the ProcessRunner when PROFILE_MODE is set.
+Timings use `time.perf_counter_ns` and are aggregated in place in a `ProcessStats` per
+process instead of appending a log entry per call.
+"""
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from .Objects.Process import Process
+
+
+@dataclass
+class ProcessStats:
+    """Aggregated timings for a single process. All times are in nanoseconds.
+
+    Parameters:
+        process_id: str
+            The stable id of the process. See `get_process_id`
+        count: int
+            The number of sampled calls
+        call_count: int
+            The number of calls including the calls that were not sampled
+        total_ns: int
+            The total time spent in the process function
+        min_ns: int
+            The fastest call to the process function
+        max_ns: int
+            The slowest call to the process function
+        input_ns: int
+            The total time spent mapping the inputs
+        output_ns: int
+            The total time spent mapping the outputs to the state
+    """
+    process_id: str
+    count: int = 0
+    call_count: int = 0
+    total_ns: int = 0
+    min_ns: int = None
+    max_ns: int = None
+    input_ns: int = 0
+    output_ns: int = 0
+
+    def record(self, input_ns: int, func_ns: int, output_ns: int):
+        self.count += 1
+        self.total_ns += func_ns
+        self.input_ns += input_ns
+        self.output_ns += output_ns
+        if self.min_ns is None or func_ns < self.min_ns:
+            self.min_ns = func_ns
+        if self.max_ns is None or func_ns > self.max_ns:
+            self.max_ns = func_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+
+def get_process_id(process: Process) -> str:
+    """Get an id for the process that is stable between runs.
+
+    Made up of the process comment (or function name) and the location the function is
+    defined so that processes with the same comment do not share stats.
+    """
+    func = process.func
+    name = process.comment or getattr(func, '__qualname__', None) \
+        or getattr(func, '__name__', None) or type(func).__name__
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return name
+    return f'{name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+class ProcessIdCache:
+    """Cache the process ids by object id.
+
+    The process is stored with its id so that a reused object id is not mistaken for a cached
+    process.
+    """
+
+    def __init__(self):
+        self._ids: Dict[int, Tuple[Process, str]] = {}
+
+    def __call__(self, process: Process) -> str:
+        cached = self._ids.get(id(process))
+        if cached is not None and cached[0] is process:
+            return cached[1]
+        process_id = get_process_id(process)
+        self._ids[id(process)] = (process, process_id)
+        return process_id
@@ -0,0 +1,161 @@
+"""Run independent processes in a timestep concurrently.
+
+The state paths each process reads and writes are recovered from the source of its
+`state_inputs` and `state_outputs` with `parse_state_reads` and `parse_state_writes`.
+A process depends on an earlier process if either writes a path the other reads or writes.
+The processes are grouped into levels where every dependency of a process is in an earlier
+level. The processes in a level are ran on a thread pool.
+
+The outputs of a level are applied to the state in the original process order after all the
+processes in the level have ran. This keeps the serial semantics of `run_processes`,
+including last writer wins for overlapping outputs.
+
+Processes that cannot be parsed, time and log processes act as barriers and run on their own.
+
+The process functions are called through the runner's process caches. In DEBUG_MODE and
+PROFILE_MODE, and for levels with a disk cached process, the processes in a level are ran one
+at a time with `ProcessRunner.process_switcher` so that the timings and disk cache are kept.
+
+NOTE: Process functions that mutate their inputs in place are not detected.
+Only NumPy heavy processes that release the GIL will run faster.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, List, NamedTuple, Set, Union
+
+from .Objects.Process import Process, ProcessType
+from .process_inspector import parse_state_reads, parse_state_writes
+from .process_ins_and_outs import get_inputs_from_process
+
+if TYPE_CHECKING:
+    from .ProcessRunnerCls import ProcessRunner
+
+
+class ProcessAccess(NamedTuple):
+    """The state paths a process reads and writes. None if unknown."""
+    reads: Union[Set[str], None]
+    writes: Union[Set[str], None]
+
+    @property
+    def is_barrier(self) -> bool:
+        return self.reads is None or self.writes is None
+
+
+def paths_overlap(a: str, b: str) -> bool:
+    """Check if one path is the same as or inside the other. An empty path is the whole state."""
+    if not a or not b or a == b:
+        return True
+    return a.startswith(b + '.') or b.startswith(a + '.')
+
+
+def any_paths_overlap(a: Set[str], b: Set[str]) -> bool:
+    return any(paths_overlap(x, y) for x in a for y in b)
+
+
+def get_process_access(process: Process) -> ProcessAccess:
+    if process.ptype != ProcessType.STANDARD:
+        return ProcessAccess(None, None)
+    return ProcessAccess(
+        parse_state_reads(process.state_inputs),
+        parse_state_writes(process.state_outputs),
+    )
+
+
+def depends_on(later: ProcessAccess, earlier: ProcessAccess) -> bool:
+    """Check if the later process must run after the earlier process."""
+    if later.is_barrier or earlier.is_barrier:
+        return True
+    return any_paths_overlap(earlier.writes, later.reads) \
+        or any_paths_overlap(earlier.reads, later.writes) \
+        or any_paths_overlap(earlier.writes, later.writes)
+
+
+def build_levels(processes: List[Process]) -> List[List[int]]:
+    """Group the process indexes into levels that can be ran concurrently.
+
+    Standard processes with a False gate are removed.
+    """
+    active = [i for i, p in enumerate(processes)
+              if not (p.ptype == ProcessType.STANDARD and not p.gate)]
+    access = {i: get_process_access(processes[i]) for i in active}
+    process_level = {}
+    for n, i in enumerate(active):
+        process_level[i] = max(
+            (process_level[j] + 1 for j in active[:n] if depends_on(access[i], access[j])),
+            default=0)
+    levels = [[] for _ in range(max(process_level.values(), default=-1) + 1)]
+    for i in active:
+        levels[process_level[i]].append(i)
+    return levels
+
+
+class ParallelScheduler:
+    """Run a list of processes level by level on a thread pool.
+
+    The levels are computed once when the scheduler is created so the gates are fixed.
+
+    Parameters
+    ----------
+    runner : ProcessRunner
+        The process runner to run the processes with
+    processes : List[Process]
+        The processes to run each step
+    max_workers : int, optional
+        The number of threads, by default the ThreadPoolExecutor default
+
+    Example:
+    ```
+    with process_runner.schedule(processes) as step:
+        for _ in range(row_count):
+            state = step(state)
+            process_runner.tm.advance_row()
+    ```
+    """
+
+    def __init__(
+        self,
+        runner: 'ProcessRunner',
+        processes: List[Process],
+        max_workers: int = None,
+    ):
+        self.runner = runner
+        self.processes = processes
+        self.levels = build_levels(processes)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _run_func(self, process: Process, state: Any, row_index: int) -> Any:
+        runner = self.runner
+        args, kwargs = get_inputs_from_process(
+            process, state, runner.config, runner.parameters, runner.external_state, row_index)
+        return runner.call_process_func(process, args, kwargs)
+
+    def _run_serially(self, level: List[int]) -> bool:
+        runner = self.runner
+        uses_disk_cache = runner.disk_cache is not None and any(
+            self.processes[i].disk_cache for i in level)
+        return len(level) == 1 or runner.DEBUG_MODE or runner.PROFILE_MODE or uses_disk_cache
+
+    def __call__(self, state: Any) -> Any:
+        runner = self.runner
+        for level in self.levels:
+            if self._run_serially(level):
+                for i in level:
+                    state = runner.process_switcher(state, self.processes[i])
+                continue
+            row_index = runner.tm.row_index
+            futures = [
+                self._executor.submit(self._run_func, self.processes[i], state, row_index)
+                for i in level]
+            results = [f.result() for f in futures]
+            for i, result in zip(level, results):
+                state = runner.map_outputs(state, self.processes[i], result)
+        runner.current_state = state
+        return state
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self) -> 'ParallelScheduler':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
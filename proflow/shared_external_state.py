@@ -0,0 +1,164 @@
+"""Share the NumPy arrays of an external state between processes.
+
+`publish_external_state` copies each NumPy array field of an external state dataclass into
+`multiprocessing.shared_memory` once. The returned handle is small and cheap to pickle.
+Workers call `attach_external_state` with the handle to rebuild the same dataclass where the
+array fields are zero copy views of the shared memory.
+
+Example:
+```
+with publish_external_state(external_state) as shared:
+    ensemble.run([
+        (config, parameters, shared.handle, initial_state)
+        for config in site_configs
+    ])
+```
+"""
+import inspect
+from dataclasses import dataclass, fields, is_dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """The location and layout of an array in shared memory."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class SharedExternalStateHandle:
+    """A picklable reference to an external state published to shared memory.
+
+    Parameters:
+        cls: type
+            The external state dataclass
+        arrays: Dict[str, SharedArraySpec]
+            The shared memory location of each array field
+        values: Dict[str, Any]
+            The fields that are not shared. These are pickled with the handle.
+    """
+    cls: type
+    arrays: Dict[str, SharedArraySpec]
+    values: Dict[str, Any]
+
+
+class SharedExternalState:
+    """Owns the shared memory segments of a published external state.
+
+    The segments are freed when `close` is called or the context manager exits.
+    """
+
+    def __init__(self, handle: SharedExternalStateHandle, segments: List[SharedMemory]):
+        self.handle = handle
+        self._segments = segments
+
+    def close(self):
+        for shm in self._segments:
+            shm.close()
+            shm.unlink()
+        self._segments = []
+
+    def __enter__(self) -> 'SharedExternalState':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def publish_external_state(external_state: object) -> SharedExternalState:
+    """Copy the NumPy array fields of the external state into shared memory.
+
+    Parameters
+    ----------
+    external_state : object
+        An External_State_Shape dataclass
+
+    Returns
+    -------
+    SharedExternalState
+        Owns the shared memory. Pass `.handle` to the workers.
+    """
+    if not is_dataclass(external_state):
+        raise TypeError(f'Expected a dataclass external state but got {type(external_state)}')
+    arrays = {}
+    values = {}
+    segments = []
+    try:
+        for f in fields(external_state):
+            if not f.init:
+                continue
+            val = getattr(external_state, f.name)
+            if not isinstance(val, np.ndarray) or val.dtype.hasobject or val.nbytes == 0:
+                values[f.name] = val
+                continue
+            shm = SharedMemory(create=True, size=val.nbytes)
+            segments.append(shm)
+            np.ndarray(val.shape, dtype=val.dtype, buffer=shm.buf)[...] = val
+            arrays[f.name] = SharedArraySpec(shm.name, val.shape, val.dtype.str)
+    except Exception:
+        SharedExternalState(None, segments).close()
+        raise
+    handle = SharedExternalStateHandle(type(external_state), arrays, values)
+    return SharedExternalState(handle, segments)
+
+
+# Segments attached in this process. Kept open for the lifetime of the process so that the
+# array views stay valid.
+_attached_segments: Dict[str, SharedMemory] = {}
+
+
+# Only the publishing process should unlink the segments.
+# Before python 3.13 attaching registers the segment with the resource tracker. Pool workers
+# share the resource tracker of the parent process so this is a no op for them.
+_TRACK_KWARGS = {'track': False} \
+    if 'track' in inspect.signature(SharedMemory.__init__).parameters else {}
+
+
+def _attach_segment(name: str) -> SharedMemory:
+    shm = _attached_segments.get(name)
+    if shm is None:
+        shm = SharedMemory(name=name, **_TRACK_KWARGS)
+        _attached_segments[name] = shm
+    return shm
+
+
+def attach_external_state(
+    handle: SharedExternalStateHandle,
+    writeable: bool = False,
+) -> object:
+    """Rebuild the external state with array fields that are views of the shared memory.
+
+    Parameters
+    ----------
+    handle : SharedExternalStateHandle
+        The handle returned by `publish_external_state`
+    writeable : bool, optional
+        If False the shared arrays are read only, by default False
+
+    Returns
+    -------
+    object
+        An instance of the original external state dataclass
+    """
+    kwargs = dict(handle.values)
+    for field_name, spec in handle.arrays.items():
+        shm = _attach_segment(spec.name)
+        arr = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+        arr.flags.writeable = writeable
+        kwargs[field_name] = arr
+    return handle.cls(**kwargs)
+
+
+def detach_all():
+    """Close all shared memory segments attached in this process.
+
+    Any attached external states must be deleted first.
+    """
+    for shm in _attached_segments.values():
+        shm.close()
+    _attached_segments.clear()
@@ -100,3 +100,15 @@ def test_advanceing_row():
     assert tm.minute == 0
     assert tm.second == 0
     assert tm.millisecond == 0
+
+
+def test_advancing_row_per_day_and_millisecond():
+    tm = TimeManager(row_per=TimeScale.DAY)
+    tm.advance_row(2)
+    assert tm.row_index == 2
+    assert tm.day == 2
+    tm = TimeManager(row_per=TimeScale.MILLISECOND)
+    tm.advance_row(1001)
+    assert tm.row_index == 1001
+    assert tm.second == 1
+    assert tm.millisecond == 1
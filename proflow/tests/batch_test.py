@@ -0,0 +1,147 @@
+from dataclasses import dataclass, field
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from proflow.tests.mocks import get_process_runner
+from proflow.logger import log_values
+
+from ..batch import BatchItemView, get_batch_size, map_result_to_batch_state
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+@dataclass
+class Mock_Batch_Nested_State:
+    na: np.ndarray = field(default_factory=lambda: np.zeros(4))
+
+
+@dataclass
+class Mock_Batch_State:
+    a: np.ndarray = field(default_factory=lambda: np.arange(4, dtype=np.float64))
+    b: np.ndarray = field(default_factory=lambda: np.zeros((4, 2)))
+    nested: Mock_Batch_Nested_State = field(default_factory=Mock_Batch_Nested_State)
+    label: str = 'foo'
+
+
+@dataclass(frozen=True)
+class Mock_Batch_External_State:
+    data: np.ndarray = field(default_factory=lambda: np.arange(12).reshape(4, 3))
+
+
+def test_batch_item_view():
+    state = Mock_Batch_State()
+    view = BatchItemView(state, 2, 4)
+    assert view.a == 2.0
+    assert isinstance(view.a, float)
+    assert list(view.b) == [0, 0]
+    assert view.label == 'foo'
+    view.nested.na = 5
+    view.b[1] = 3
+    assert list(state.nested.na) == [0, 0, 5, 0]
+    assert state.b[2, 1] == 3
+    assert get_batch_size(state) == 4
+
+
+def test_map_result_to_batch_state_mask():
+    state = Mock_Batch_State()
+    mask = np.array([True, False, True, False])
+    map_result_to_batch_state(
+        state, lambda result: [(result, 'a'), (result[:, None], 'b')], np.full(4, 9.0), mask)
+    assert list(state.a) == [9, 1, 9, 3]
+    assert list(state.b[:, 0]) == [9, 0, 9, 0]
+
+
+def test_run_processes_batch():
+    func_per_item = MagicMock(side_effect=lambda x, y: x + y)
+    func_vectorized = MagicMock(side_effect=lambda x: x * 2)
+    processes = [
+        Process(
+            func=func_per_item,
+            state_inputs=lambda state: [
+                I(state.a, as_='x'),
+            ],
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data[row_index], as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'nested.na'),
+            ],
+        ),
+        Process(
+            func=func_vectorized,
+            vectorized=True,
+            gate=np.array([True, True, False, True]),
+            state_inputs=lambda state: [
+                I(state.nested.na, as_='x'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'a'),
+            ],
+        ),
+        log_values(
+            state_inputs=lambda state: [
+                I(state.a, as_='a'),
+            ],
+        ),
+    ]
+    process_runner = get_process_runner(Mock_Batch_External_State())
+    state = process_runner.run_processes_batch(
+        processes, Mock_Batch_State(), batched_external_state=True)
+    assert func_per_item.call_count == 4
+    assert func_vectorized.call_count == 1
+    assert list(state.nested.na) == [0, 4, 8, 12]
+    assert list(state.a) == [0, 8, 2, 24]
+    assert list(process_runner.state_logs[0]['a']) == [0, 8, 2, 24]
+    assert process_runner.state_logs[0]['a'] is not state.a
+
+
+def test_run_processes_batch_gate_mask_per_item():
+    func = MagicMock(side_effect=lambda x: x + 1)
+    processes = [
+        Process(
+            func=func,
+            gate=np.array([False, True, False, True]),
+            state_inputs=lambda state: [
+                I(state.a, as_='x'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'a'),
+            ],
+        ),
+        Process(func=func, gate=False),
+    ]
+    process_runner = get_process_runner(Mock_Batch_External_State())
+    state = process_runner.run_processes_batch(processes, Mock_Batch_State())
+    assert func.call_count == 2
+    assert list(state.a) == [0, 2, 2, 4]
+
+
+def test_run_processes_batch_invalid_mask():
+    processes = [Process(func=lambda: 1, gate=np.array([True]))]
+    process_runner = get_process_runner(Mock_Batch_External_State())
+    with pytest.raises(ValueError):
+        process_runner.run_processes_batch(processes, Mock_Batch_State())
+
+
+def test_run_processes_batch_cached_process():
+    func = MagicMock(side_effect=lambda x: x + 1)
+    processes = [
+        Process(
+            func=func,
+            cache=True,
+            config_inputs=lambda config: [
+                I(config.foo, as_='x'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'nested.na'),
+            ],
+        ),
+    ]
+    process_runner = get_process_runner(Mock_Batch_External_State())
+    state = process_runner.run_processes_batch(processes, Mock_Batch_State())
+    assert func.call_count == 1
+    assert list(state.nested.na) == [2, 2, 2, 2]
+    [info] = process_runner.cache_info().values()
+    assert (info.hits, info.misses) == (3, 1)
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pytest
+
+from proflow.tests.mocks import Mock_Array_State, Mock_Series_External_State, \
+    get_process_runner
+
+from ..checkpoint import AutoCheckpoint, OBJECTS_KEY, dump_checkpoint, load_checkpoint
+from ..log_sinks import NpzLogSink
+from ..Objects.Process import Process, ProcessType
+from ..Objects.Interface import I
+
+
+def get_processes():
+    return [
+        Process(
+            func=lambda total, values, x: (total + x, values + x),
+            state_inputs=lambda state: [
+                I(state.total, as_='total'),
+                I(state.values, as_='values'),
+            ],
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data[row_index], as_='x')],
+            state_outputs=lambda result: [
+                (result[0], 'total'),
+                (result[1], 'values'),
+            ],
+        ),
+        Process(
+            ptype=ProcessType.LOG,
+            state_inputs=lambda state: [I(state.total, as_='total')],
+        ),
+    ]
+
+
+def test_dump_checkpoint_stores_arrays_natively(tmp_path):
+    path = str(tmp_path / 'checkpoint.npz')
+    values = np.arange(1000, dtype=np.float32)
+    dump_checkpoint(path, {'a': values, 'b': [values, 'x'], 'c': np.array([None])})
+    with np.load(path, allow_pickle=False) as data:
+        assert OBJECTS_KEY in data.files
+        # The object array is pickled
+        assert len(data.files) == 3
+        assert data[OBJECTS_KEY].nbytes < values.nbytes
+    loaded = load_checkpoint(path)
+    assert np.array_equal(loaded['a'], values)
+    assert loaded['a'].dtype == np.float32
+    assert loaded['b'][1] == 'x'
+    assert loaded['c'][0] is None
+    assert os.listdir(tmp_path) == ['checkpoint.npz']
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_checkpoint_and_restore(tmp_path, columnar):
+    path = str(tmp_path / 'checkpoint.npz')
+    process_runner = get_process_runner(Mock_Series_External_State(), COLUMNAR_LOGS=columnar)
+    process_runner.run_timeseries(get_processes(), Mock_Array_State(), n_rows=5)
+    process_runner.checkpoint(path)
+
+    restored = get_process_runner(Mock_Series_External_State(), COLUMNAR_LOGS=columnar)
+    restored.restore(path)
+    assert restored.tm.row_index == 5
+    assert restored.current_state.total == process_runner.current_state.total
+    state = restored.run_timeseries(get_processes(), row_range=(5, 10))
+
+    expected_runner = get_process_runner(Mock_Series_External_State(), COLUMNAR_LOGS=columnar)
+    expected = expected_runner.run_timeseries(get_processes(), Mock_Array_State(), n_rows=10)
+    assert state.total == expected.total
+    assert np.array_equal(state.values, expected.values)
+    if columnar:
+        assert np.array_equal(
+            restored.state_logs.as_dict()['total'], expected_runner.state_logs.as_dict()['total'])
+    else:
+        assert restored.state_logs == expected_runner.state_logs
+
+
+def test_checkpoint_and_restore_log_sink(tmp_path):
+    path = str(tmp_path / 'checkpoint.npz')
+    log_directory = str(tmp_path / 'logs')
+    process_runner = get_process_runner(
+        Mock_Series_External_State(), log_sink=NpzLogSink(log_directory, chunk_rows=3))
+    process_runner.run_timeseries(get_processes(), Mock_Array_State(), n_rows=5)
+    process_runner.checkpoint(path)
+
+    restored = get_process_runner(
+        Mock_Series_External_State(), log_sink=NpzLogSink(log_directory, chunk_rows=3))
+    restored.restore(path)
+    restored.run_timeseries(get_processes(), row_range=(5, 10))
+    assert [row['total'] for row in restored.read_logs()] == [sum(range(i + 1)) for i in range(10)]
+    assert len(os.listdir(log_directory)) == len(restored.log_sink.chunk_paths)
+
+
+def test_auto_checkpoint(tmp_path):
+    checkpoint = AutoCheckpoint(str(tmp_path), every_n_rows=3, keep=2)
+    process_runner = get_process_runner(Mock_Series_External_State())
+    process_runner.run_timeseries(
+        get_processes(), Mock_Array_State(), n_rows=10, checkpoint=checkpoint)
+    assert [os.path.basename(p) for p in checkpoint.checkpoints()] == [
+        'checkpoint_000000006.npz', 'checkpoint_000000009.npz']
+
+    restored = get_process_runner(Mock_Series_External_State())
+    restored.restore(checkpoint.latest())
+    assert restored.tm.row_index == 9
+    assert restored.current_state.total == sum(range(9))
+    state = restored.run_timeseries(get_processes(), row_range=(9, 10))
+    assert state.total == process_runner.current_state.total
+
+
+def test_auto_checkpoint_settings(tmp_path):
+    with pytest.raises(ValueError):
+        AutoCheckpoint(str(tmp_path), every_n_rows=0)
+    assert AutoCheckpoint(str(tmp_path / 'missing'), every_n_rows=1).latest() is None
@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+import pytest
+
+from proflow.tests.mocks import Mock_Model_State_Shape, get_process_runner
+
+from ..disk_cache import DiskCache, get_func_fingerprint
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+CALLS = []
+
+
+def expensive_func(x, y):
+    CALLS.append((x, y))
+    return x + sum(y)
+
+
+def array_func(x):
+    CALLS.append(x)
+    return np.full((3, 2), x, dtype=np.float32)
+
+
+def get_process(func=expensive_func, comment=''):
+    return Process(
+        func=func,
+        comment=comment,
+        disk_cache=True,
+        state_inputs=lambda state: [
+            I(state.ind, as_='x'),
+            I(state.matrix[0], as_='y'),
+        ],
+        state_outputs=lambda result: [
+            (result, 'c'),
+        ],
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+
+
+def test_disk_cache_hit_across_instances(tmp_path):
+    process = get_process()
+    cache = DiskCache(str(tmp_path))
+    assert cache.call(process, [1], {'y': [1, 2]}) == 4
+    assert cache.call(process, [1], {'y': [1, 2]}) == 4
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache_b = DiskCache(str(tmp_path))
+    assert cache_b.call(get_process(), [1], {'y': [1, 2]}) == 4
+    assert (cache_b.hits, cache_b.misses) == (1, 0)
+    assert len(CALLS) == 1
+
+
+def test_disk_cache_array_result(tmp_path):
+    process = Process(func=array_func, disk_cache=True)
+    cache = DiskCache(str(tmp_path))
+    cache.call(process, [2.0], {})
+    result = DiskCache(str(tmp_path)).call(process, [2.0], {})
+    assert result.dtype == np.float32
+    assert np.array_equal(result, np.full((3, 2), 2.0))
+    assert [f for _, _, files in os.walk(tmp_path) for f in files][0].endswith('.npy')
+    assert len(CALLS) == 1
+
+
+def test_disk_cache_key(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    process = get_process()
+    key = cache.get_key(process, [1], {'y': np.array([1, 2])})
+    assert key == cache.get_key(get_process(), [1], {'y': np.array([1, 2])})
+    assert key != cache.get_key(process, [2], {'y': np.array([1, 2])})
+    assert key != cache.get_key(process, [1], {'y': np.array([1, 3])})
+    assert key != cache.get_key(get_process(comment='other'), [1], {'y': np.array([1, 2])})
+
+
+def test_func_fingerprint_includes_closure():
+    def make_func(scale):
+        return lambda x: x * scale
+    assert get_func_fingerprint(make_func(2)) == get_func_fingerprint(make_func(2))
+    assert get_func_fingerprint(make_func(2)) != get_func_fingerprint(make_func(3))
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    process = Process(func=array_func, disk_cache=True)
+    cache = DiskCache(str(tmp_path), max_bytes=400)
+    for i in range(3):
+        cache.call(process, [float(i)], {})
+        # Make the mtimes distinct
+        os.utime(cache._path(cache.get_key(process, [float(i)], {}), '.npy'), (i, i))
+    cache.call(process, [3.0], {})
+    assert cache._size <= 400
+    cache.call(process, [0.0], {})
+    assert cache.misses == 5
+
+
+def test_runner_disk_cached_process(tmp_path):
+    def run(state):
+        process_runner = get_process_runner(disk_cache=DiskCache(str(tmp_path)))
+        for ind in [0, 1, 0]:
+            state.ind = ind
+            state = process_runner.run_processes([get_process()], state)
+            assert state.c == ind + 6
+        return process_runner
+
+    run(Mock_Model_State_Shape(a=1, b=2))
+    assert len(CALLS) == 2
+    process_runner = run(Mock_Model_State_Shape(a=1, b=2))
+    assert len(CALLS) == 2
+    assert process_runner.disk_cache.hits == 3
+
+
+def test_runner_without_disk_cache_calls_func():
+    process_runner = get_process_runner()
+    state = Mock_Model_State_Shape(a=1, b=2)
+    state = process_runner.run_processes([get_process()], state)
+    state = process_runner.run_processes([get_process()], state)
+    assert len(CALLS) == 2
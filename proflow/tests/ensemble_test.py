@@ -0,0 +1,87 @@
+import pytest
+
+from proflow.tests.mocks import Mock_Config_Shape, Mock_External_State_Shape, \
+    Mock_Model_State_Shape, Mock_Parameters_Shape, get_timeseries_processes
+
+from ..ensemble import EnsembleJob, EnsembleRunner
+from ..errors import Ensemble_Job_Error, Run_Process_Error
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def get_jobs(values):
+    """Get jobs where external_state.data_a is the value on every row."""
+    return [
+        (Mock_Config_Shape(), Mock_Parameters_Shape(),
+         Mock_External_State_Shape(data_a=[value] * 4), Mock_Model_State_Shape(a=0, b=0))
+        for value in values
+    ]
+
+
+def test_ensemble_runner_in_process():
+    ensemble = EnsembleRunner(get_timeseries_processes, max_workers=0)
+    results = ensemble.run(get_jobs([1, 2, 3]))
+    assert [r.state.a for r in results] == [1, 2, 3]
+    assert [r.logs for r in results] == [[{'a': 1}], [{'a': 2}], [{'a': 3}]]
+
+
+def test_ensemble_runner_pool_returns_results_in_order():
+    ensemble = EnsembleRunner(get_timeseries_processes, n_rows=3, max_workers=2, chunksize=2)
+    results = ensemble.run(get_jobs(range(7)))
+    assert [r.index for r in results] == list(range(7))
+    assert [r.state.a for r in results] == [value * 3 for value in range(7)]
+    assert all(r.ok for r in results)
+    assert results[2].logs == [{'a': 2}, {'a': 4}, {'a': 6}]
+
+
+def test_ensemble_runner_failing_job():
+    jobs = get_jobs([1, None, 3])
+    jobs[0] = EnsembleJob(*jobs[0])
+    ensemble = EnsembleRunner(
+        get_timeseries_processes, max_workers=2, runner_kwargs={'DEBUG_MODE': True})
+    results = ensemble.run(jobs)
+    assert results[0].state.a == 1
+    assert results[2].state.a == 3
+    assert not results[1].ok
+    assert isinstance(results[1].error, Run_Process_Error)
+
+
+def test_ensemble_runner_unpicklable_error():
+    def get_failing_processes():
+        class Unpicklable_Error(Exception):
+            pass
+
+        def fail():
+            raise Unpicklable_Error('bad job')
+        return [Process(func=fail)]
+
+    ensemble = EnsembleRunner(get_failing_processes, max_workers=1)
+    results = ensemble.run(get_jobs([1]))
+    assert isinstance(results[0].error, Run_Process_Error)
+    assert isinstance(results[0].error.error, Ensemble_Job_Error)
+    assert results[0].error.error.error_type == 'Unpicklable_Error'
+    assert 'bad job' in str(results[0].error)
+
+
+@pytest.mark.parametrize('n_rows', [None, 3])
+def test_ensemble_runner_failing_job_process_context(n_rows):
+    def get_failing_processes():
+        return get_timeseries_processes() + [
+            Process(
+                func=lambda a: 1 / (a - 2),
+                comment='fail on two',
+                state_inputs=lambda state: [I(state.a, as_='a')],
+            ),
+        ]
+
+    ensemble = EnsembleRunner(get_failing_processes, n_rows=n_rows, max_workers=1)
+    results = ensemble.run(get_jobs([1, 2]))
+    assert results[0].ok != (n_rows is not None)
+    error = results[1].error
+    assert isinstance(error, Run_Process_Error)
+    assert isinstance(error.error, ZeroDivisionError)
+    assert error.message == 'Failed to run "fail on two"'
+    assert '"a": 2' in error.kwargs_str
+    assert error.row_index == 0
+    if n_rows is not None:
+        assert results[0].error.row_index == 1
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from proflow.tests.mocks import Mock_Model_State_Shape, get_process_runner
+
+from ..flat_state import FlatState, FlatStateNode
+from ..helpers import rgetattr, rsetattr
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def get_flat_state():
+    return FlatState(Mock_Model_State_Shape(a=2.1, b=4.1, lst=[1, 2, 3]))
+
+
+def test_flat_state_layout():
+    flat = get_flat_state()
+    assert flat.paths[:4] == ['a', 'b', 'c', 'd']
+    assert flat.index['nested.na'] == flat.paths.index('nested.na')
+    assert flat.index['matrix.1.2'] == flat.paths.index('matrix.1.2')
+    assert flat.arrays['matrix'] == (flat.index['matrix.0.0'], (2, 3))
+    assert 'nested_lst_obj.1.nab' in flat.index
+    assert 'target' not in flat.index
+    assert flat.buffer.dtype == np.float64
+    assert len(flat.buffer) == len(flat.paths)
+
+
+def test_flat_state_proxy_read_write():
+    flat = get_flat_state()
+    state = flat.state
+    assert isinstance(state, FlatStateNode)
+    assert state.a == 2.1
+    assert state.nested.na == 7
+    assert isinstance(state.nested.na, int)
+    assert state.matrix[1][2] == 6
+    assert state.nested_lst_obj[1].na == 3
+    assert state.target == 'a'
+
+    state.a = 5.0
+    state.nested.na = 9
+    state.matrix[0][1] = 20
+    state.nested_lst_obj[0].nab = 30
+    state.target = 'b'
+    assert flat.buffer[flat.index['a']] == 5.0
+    assert flat.buffer[flat.index['nested.na']] == 9
+    assert flat.buffer[flat.index['matrix.0.1']] == 20
+    assert flat.buffer[flat.index['nested_lst_obj.0.nab']] == 30
+    assert state.target == 'b'
+
+
+def test_flat_state_rgetattr_rsetattr():
+    flat = get_flat_state()
+    rsetattr(flat.state, 'nested.nab', 11)
+    rsetattr(flat.state, 'matrix.1.0', 12)
+    rsetattr(flat.state, 'nested_lst_obj.1.na', 13)
+    assert rgetattr(flat.state, 'nested.nab') == 11
+    assert flat.read('matrix.1.0') == 12
+    assert flat.read('nested_lst_obj.1.na') == 13
+    flat.write('lst.2', 14)
+    assert list(flat.read('lst')) == [1, 2, 14]
+
+
+def test_flat_state_cannot_replace_node():
+    flat = get_flat_state()
+    with pytest.raises(TypeError):
+        flat.state.nested = None
+
+
+def test_flat_state_snapshot_restore_diff():
+    flat = get_flat_state()
+    snapshot = flat.snapshot()
+    flat.state.b = 1.0
+    flat.state.matrix[0][0] = 10
+    assert flat.diff(snapshot) == {'b': (4.1, 1.0), 'matrix.0.0': (1, 10)}
+    flat.restore(snapshot)
+    assert flat.diff(snapshot) == {}
+    assert flat.state.b == 4.1
+
+
+def test_flat_state_to_state():
+    initial_state = Mock_Model_State_Shape(a=2.1, b=4.1, lst=[1, 2, 3])
+    flat = FlatState(initial_state)
+    flat.state.nested_lst_obj[1].na = 8
+    flat.state.matrix[1][1] = 9
+    state_out = flat.to_state()
+    assert isinstance(state_out, Mock_Model_State_Shape)
+    assert state_out.nested_lst_obj[1].na == 8
+    assert state_out.matrix == [[1, 2, 3], [4, 9, 6]]
+    assert isinstance(state_out.matrix[0][0], int)
+    assert state_out.lst == [1, 2, 3]
+    assert initial_state.nested_lst_obj[1].na == 3
+
+
+def test_flat_state_run_processes():
+    processes = [
+        Process(
+            func=lambda x, y: x + y,
+            state_inputs=lambda state: [
+                I(state.a, as_='x'),
+                I(state.matrix[1][2], as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+                (result, 'matrix.0.0'),
+                (result, 'nested.na'),
+            ],
+        ),
+    ]
+    process_runner = get_process_runner()
+    flat = get_flat_state()
+    snapshot = flat.snapshot()
+    state_out = process_runner.run_processes(processes, flat.state)
+    assert state_out is flat.state
+    assert flat.read('c') == 8.1
+    assert set(flat.diff(snapshot)) == {'c', 'matrix.0.0', 'nested.na'}
+
+    step = process_runner.compile(processes)
+    flat.restore(snapshot)
+    step(flat.state)
+    assert flat.read('matrix.0.0') == 8.1
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from proflow.tests.mocks import Mock_Array_State, Mock_Config_Shape, \
+    Mock_Series_External_State, get_process_runner
+
+from ..fork import apply_overrides
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def get_processes():
+    return [
+        Process(
+            func=lambda total, x, foo: total + x * foo,
+            state_inputs=lambda state: [I(state.total, as_='total')],
+            config_inputs=lambda config: [I(config.foo, as_='foo')],
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data[row_index], as_='x')],
+            state_outputs=lambda result: [(result, 'total')],
+        ),
+        Process(
+            func=lambda na: na + 1,
+            state_inputs=lambda state: [I(state.nested.na, as_='na')],
+            state_outputs=lambda result: [(result, 'nested.na')],
+        ),
+    ]
+
+
+def test_apply_overrides():
+    config = Mock_Config_Shape()
+    out = apply_overrides(
+        {'config': config, 'parameters': None}, {'config.foo': 5, 'config.roo.abc': 6})
+    assert out['config'].foo == 5
+    assert out['config'].roo['abc'] == 6
+    assert config.foo == 1
+    assert config.roo['abc'] == 5
+    assert out['parameters'] is None
+    with pytest.raises(ValueError):
+        apply_overrides({'config': config}, {'state.a': 1})
+
+
+def test_fork_scenarios_match_full_runs():
+    process_runner = get_process_runner(Mock_Series_External_State())
+    warm_up = process_runner.run_timeseries(get_processes(), Mock_Array_State(), n_rows=5)
+    branches = [
+        process_runner.fork(overrides={'config.foo': foo}) for foo in [1, 2]
+    ] + [process_runner.fork(external_state=Mock_Series_External_State(data=[1] * 100))]
+    assert not process_runner.IMMUTABLE_MODE
+    assert all(b.current_state is warm_up for b in branches)
+
+    states = [b.run_timeseries(get_processes(), n_rows=5) for b in branches]
+    parent_state = process_runner.run_timeseries(get_processes(), n_rows=5)
+
+    assert warm_up.total == sum(range(5))
+    assert warm_up.nested.na == 12
+    assert states[0].total == parent_state.total == sum(range(10))
+    assert states[1].total == sum(range(5)) + 2 * sum(range(5, 10))
+    assert states[2].total == sum(range(5)) + 5
+    assert all(s.nested.na == 17 for s in states)
+    assert all(b.tm.row_index == 10 for b in branches)
+    # Unchanged parts of the state are shared
+    assert all(s.values is warm_up.values for s in states)
+
+
+def test_fork_non_dataclass_state():
+    process_runner = get_process_runner(Mock_Series_External_State())
+    state = SimpleNamespace(total=0, nested=SimpleNamespace(na=7))
+    warm_up = process_runner.run_timeseries(get_processes(), state, n_rows=2)
+    branch = process_runner.fork()
+    branch_state = branch.run_timeseries(get_processes(), n_rows=2)
+    assert branch_state.nested.na == 11
+    assert warm_up.nested.na == 9
+
+
+def test_fork_logs_and_modes():
+    process_runner = get_process_runner(
+        Mock_Series_External_State(), DEBUG_MODE=True, COLUMNAR_LOGS=True)
+    process_runner.run_timeseries(get_processes(), Mock_Array_State(), n_rows=2)
+    branch = process_runner.fork()
+    assert branch.DEBUG_MODE and branch.COLUMNAR_LOGS
+    assert not branch.IMMUTABLE_MODE
+    assert len(branch.state_logs) == 0
+    assert branch.config is process_runner.config
+
+
+def test_fork_copies_each_written_object_once():
+    process_runner = get_process_runner(Mock_Series_External_State())
+    warm_up = process_runner.run_timeseries(get_processes(), Mock_Array_State(), n_rows=1)
+    warm_up_values = warm_up.values.copy()
+    branch = process_runner.fork()
+    processes = [
+        Process(
+            func=lambda x: x,
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data[row_index], as_='x')],
+            state_outputs=lambda result: [(result, 'values.0'), (result, 'nested.na')],
+        ),
+    ]
+    branch.run_timeseries(processes, n_rows=1)
+    # The state, values and nested objects
+    assert branch.copy_on_write.copy_count == 3
+    branch_state = branch.run_timeseries(processes, n_rows=20)
+    assert branch.copy_on_write.copy_count == 3
+    assert branch_state.values[0] == 21
+    assert branch_state.nested.na == 21
+    assert np.array_equal(warm_up.values, warm_up_values)
+    assert warm_up.nested.na == 8
+
+
+def test_fork_compiled_steps_copy_on_write():
+    process_runner = get_process_runner(Mock_Series_External_State())
+    warm_up = process_runner.run_timeseries(get_processes(), Mock_Array_State(), n_rows=2)
+    branch = process_runner.fork()
+    step = branch.compile(get_processes())
+    state = branch.current_state
+    for _ in range(3):
+        state = step(state)
+        branch.tm.advance_row()
+    assert branch.copy_on_write.copy_count == 2
+    assert state.nested.na == 12
+    assert warm_up.nested.na == 9
+    assert state.values is warm_up.values
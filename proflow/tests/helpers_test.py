@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
+from typing import List
+import pytest
 from vendor.test_helpers import use_benchmark_time
 import numpy as np
 from timeit import repeat
-from ..helpers import rgetattr, rsetattr
+from ..helpers import rgetattr, rsetattr, compile_setter, compile_path
 
 
 # def test_get_key_values():
@@ -58,6 +60,55 @@ def test_rgetattr_convert_str_index():
     assert v == 6
 
 
+def test_rgetattr_default():
+    @dataclass
+    class Foo:
+        bar: int = 0
+
+    assert rgetattr(Foo(), 'roo', 4) == 4
+    assert rgetattr(Foo(), 'bar', 4) == 0
+    assert rgetattr({'foo': Foo()}, 'foo.roo', None) is None
+
+
+def test_compile_path():
+    @dataclass
+    class Nested:
+        roo: List[int] = field(default_factory=lambda: [1, 2, 3])
+
+    @dataclass
+    class Foo:
+        nest: Nested = field(default_factory=lambda: Nested())
+        data: dict = field(default_factory=lambda: {'a': Nested()})
+
+    get_roo = compile_path('nest.roo.1')
+    assert compile_path('nest.roo.1') is get_roo
+    assert get_roo(Foo()) == 2
+    assert get_roo(Foo(nest=Nested(roo=np.arange(4)))) == 1
+    # Types in the path can change between calls
+    assert get_roo({'nest': {'roo': {1: 'x', '1': 'y'}}}) == 'y'
+    assert get_roo(Foo()) == 2
+    assert compile_path(['data', 'a', 'roo', '2'])(Foo()) == 3
+
+
+def test_compile_path_errors():
+    @dataclass
+    class Foo:
+        bar: List[int] = field(default_factory=lambda: [1, 2, 3])
+
+    get_bar = compile_path('bar.4')
+    with pytest.raises(IndexError):
+        get_bar(Foo())
+    assert get_bar(Foo(bar=[1, 2, 3, 4, 5])) == 5
+    with pytest.raises(IndexError):
+        get_bar(Foo())
+
+
+def test_rgetattr_time(benchmark_fixture):
+    obj = {'foo': [{'bar': 3}]}
+    t1 = min(repeat(lambda: rgetattr(obj, 'foo.0.bar')))
+    assert t1 < 0.8/benchmark_fixture
+
+
 def test_rsetattr():
     v = rsetattr([1, 2, 3], 0, 7)
     assert v == [7, 2, 3]
@@ -83,6 +134,21 @@ def test_rsetattr_with_dataclass():
     assert v.nest.roo == 4
 
 
+def test_rsetattr_numpy():
+    v = rsetattr({'foo': np.zeros(3)}, 'foo.1', 4)
+    assert list(v['foo']) == [0, 4, 0]
+
+
+def test_compile_setter():
+    setter = compile_setter('foo.1')
+    assert compile_setter('foo.1') is setter
+    assert compile_setter(['foo', '1']) is compile_setter(['foo', '1'])
+    # The same setter can be used with different parent types
+    assert setter({'foo': [1, 2, 3]}, 7) == {'foo': [1, 7, 3]}
+    assert setter({'foo': {'1': 'a'}}, 7) == {'foo': {'1': 7}}
+    assert setter({'foo': [1, 2, 3]}, 8) == {'foo': [1, 8, 3]}
+
+
 def test_rsetattr_time(benchmark_fixture):
     obj = {'foo': {'bar': 3}}
     t1 = min(repeat(lambda: rsetattr(obj, 'foo', 'zzz')))
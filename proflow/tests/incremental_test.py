@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from proflow.tests.mocks import Mock_Model_State_Shape, get_process_runner
+
+from ..incremental import get_dirty_processes, split_changed_paths
+from ..log_sinks import NpzLogSink
+from ..Objects.Process import Process, ProcessType
+from ..Objects.Interface import I
+
+
+def get_processes():
+    return [
+        # Reads c from the previous row
+        Process(
+            func=MagicMock(side_effect=lambda c: c * 2),
+            state_inputs=lambda state: [I(state.c, as_='c')],
+            state_outputs=lambda result: [(result, 'nested.na')],
+        ),
+        Process(
+            func=MagicMock(side_effect=lambda a, foo: a + foo),
+            state_inputs=lambda state: [I(state.a, as_='a')],
+            config_inputs=lambda config: [I(config.foo, as_='foo')],
+            state_outputs=lambda result: [(result, 'c')],
+        ),
+        Process(
+            func=MagicMock(side_effect=lambda b, bar: b + bar),
+            state_inputs=lambda state: [I(state.b, as_='b')],
+            parameters_inputs=lambda parameters: [I(parameters.bar, as_='bar')],
+            state_outputs=lambda result: [(result, 'd')],
+        ),
+        Process(
+            func=MagicMock(side_effect=lambda a, data: a + data),
+            state_inputs=lambda state: [I(state.a, as_='a')],
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data_a[row_index], as_='data')],
+            state_outputs=lambda result: [(result, 'a')],
+        ),
+        Process(
+            ptype=ProcessType.LOG,
+            state_inputs=lambda state: [
+                I(state.c, as_='c'),
+                I(state.d, as_='d'),
+                I(state.nested.na, as_='na'),
+            ],
+        ),
+    ]
+
+
+def test_split_changed_paths():
+    assert split_changed_paths(['config.foo', 'parameters.roo.abc']) == ({'foo'}, {'roo.abc'})
+    with pytest.raises(ValueError):
+        split_changed_paths(['state.a'])
+
+
+def test_get_dirty_processes():
+    processes = get_processes()
+    assert get_dirty_processes(processes, ['parameters.bar']) == [
+        False, False, True, False, False]
+    # c is read by the first process on the next row
+    assert get_dirty_processes(processes, ['config.foo']) == [
+        True, True, False, False, False]
+    assert get_dirty_processes(processes, ['config.bar']) == [False] * 5
+    assert get_dirty_processes(processes, ['config']) == [True, True, False, False, False]
+
+
+def test_get_dirty_processes_unparsable_writes():
+    processes = get_processes()
+    processes[2].state_outputs = MagicMock(__name__='unparsable')
+    assert get_dirty_processes(processes, ['parameters.bar']) == [True, True, True, True, False]
+
+
+def test_rerun_matches_full_run():
+    processes = get_processes()
+    process_runner = get_process_runner()
+    process_runner.record_baseline(processes, Mock_Model_State_Shape(a=1, b=2), n_rows=4)
+    assert [p.func.call_count for p in processes[:4]] == [4, 4, 4, 4]
+
+    process_runner.config.foo = 10
+    state = process_runner.rerun(['config.foo'])
+    assert [p.func.call_count for p in processes[:4]] == [8, 8, 4, 4]
+
+    expected_runner = get_process_runner()
+    expected_runner.config.foo = 10
+    expected = expected_runner.run_timeseries(
+        get_processes(), Mock_Model_State_Shape(a=1, b=2), n_rows=4)
+    assert state == expected
+    assert process_runner.state_logs == expected_runner.state_logs
+    assert process_runner.tm.row_index == 4
+
+
+def test_rerun_can_be_chained():
+    processes = get_processes()
+    process_runner = get_process_runner()
+    process_runner.record_baseline(processes, Mock_Model_State_Shape(a=1, b=2), n_rows=3)
+    process_runner.config.foo = 10
+    process_runner.rerun(['config.foo'])
+    process_runner.parameters.bar = 20
+    state = process_runner.rerun(['parameters.bar'])
+
+    expected_runner = get_process_runner()
+    expected_runner.config.foo = 10
+    expected_runner.parameters.bar = 20
+    expected = expected_runner.run_timeseries(
+        get_processes(), Mock_Model_State_Shape(a=1, b=2), n_rows=3)
+    assert state == expected
+
+
+def test_rerun_with_log_sink(tmp_path):
+    process_runner = get_process_runner(
+        log_sink=NpzLogSink(str(tmp_path / 'rerun'), chunk_rows=2))
+    process_runner.record_baseline(get_processes(), Mock_Model_State_Shape(a=1, b=2), n_rows=3)
+    process_runner.config.foo = 10
+    process_runner.rerun(['config.foo'])
+
+    expected_runner = get_process_runner()
+    expected_runner.config.foo = 10
+    expected_runner.run_timeseries(get_processes(), Mock_Model_State_Shape(a=1, b=2), n_rows=3)
+    assert list(process_runner.read_logs()) == expected_runner.state_logs
+    assert len(process_runner.log_sink.chunk_paths) == 2
+
+
+def test_rerun_without_baseline():
+    with pytest.raises(ValueError):
+        get_process_runner().rerun(['config.foo'])
@@ -0,0 +1,103 @@
+import inspect
+import os
+from unittest.mock import patch
+
+import pytest
+
+from proflow import process_inspector
+from proflow.process_inspector import ParseCache, parse_inputs, parse_outputs, parse_state_reads
+
+from ..inspector_cache import InspectorDiskCache, get_line_range, use_disk_cache
+
+DEMO_MODULE = '''
+from proflow.Objects.Interface import I
+
+state_inputs = lambda state: [
+    I(state.a, as_='x'),
+    I(state.nested.na, as_='y'),
+]
+
+state_outputs = lambda result: [
+    (result, 'c'),
+]
+'''
+
+
+def load_module(path):
+    namespace = {}
+    exec(compile(path.read_text(), str(path), 'exec'), namespace)
+    return namespace
+
+
+def parse_module(namespace):
+    return (
+        parse_inputs(namespace['state_inputs']),
+        parse_outputs(namespace['state_outputs']),
+        parse_state_reads(namespace['state_inputs']),
+    )
+
+
+@pytest.fixture
+def new_session(monkeypatch, tmp_path):
+    """Get a function that imitates a new Python session using the cache directory."""
+    def _new_session():
+        parse_cache = ParseCache()
+        monkeypatch.setattr(process_inspector, 'PARSE_CACHE', parse_cache)
+        return use_disk_cache(str(tmp_path / 'cache'), parse_cache)
+    return _new_session
+
+
+def test_get_line_range():
+    fn = lambda: [  # noqa: E731
+        1,
+    ]
+    first, last = get_line_range(fn.__code__)
+    assert last >= first + 1
+
+
+def test_inspector_disk_cache_between_sessions(tmp_path, new_session):
+    source_file = tmp_path / 'demo_model.py'
+    source_file.write_text(DEMO_MODULE)
+
+    disk_cache = new_session()
+    expected = parse_module(load_module(source_file))
+    assert expected[0] == {'x': 'state.a', 'y': 'state.nested.na'}
+    assert disk_cache.hits == 0
+    disk_cache.flush()
+    assert len(os.listdir(disk_cache.directory)) == 1
+
+    disk_cache = new_session()
+    with patch('proflow.process_inspector.inspect.getsource', wraps=inspect.getsource) as getsource:
+        assert parse_module(load_module(source_file)) == expected
+    assert getsource.call_count == 0
+    assert disk_cache.misses == 0
+    assert disk_cache.hits > 0
+
+
+def test_inspector_disk_cache_reparses_changed_files(tmp_path, new_session):
+    source_file = tmp_path / 'demo_model.py'
+    source_file.write_text(DEMO_MODULE)
+    disk_cache = new_session()
+    parse_module(load_module(source_file))
+    disk_cache.flush()
+
+    source_file.write_text(DEMO_MODULE.replace('state.a', 'state.b'))
+    disk_cache = new_session()
+    inputs, _, reads = parse_module(load_module(source_file))
+    assert inputs == {'x': 'state.b', 'y': 'state.nested.na'}
+    assert reads == {'b', 'nested.na'}
+    assert disk_cache.hits == 0
+    disk_cache.flush()
+    # The outdated results are removed
+    assert len(os.listdir(disk_cache.directory)) == 1
+
+
+def test_inspector_disk_cache_ignores_functions_without_files(tmp_path):
+    disk_cache = InspectorDiskCache(str(tmp_path))
+    namespace = {}
+    exec('fn = lambda state: [state.a]', namespace)
+    code = namespace['fn'].__code__
+    disk_cache.set('inputs', code, {})
+    assert disk_cache.get('inputs', code) == (False, None)
+    disk_cache.flush()
+    assert os.listdir(disk_cache.directory) == []
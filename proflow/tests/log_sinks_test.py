@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from proflow.Objects.Interface import I
+from proflow.logger import log_values
+from proflow.tests.mocks import Mock_Model_State_Shape
+from proflow.ProcessRunnerCls import ProcessRunner
+
+from ..log_sinks import ROW_INDEX_KEY, CsvLogSink, LogSink, NpzLogSink, ParquetLogSink
+
+
+def get_sink_types():
+    sink_types = [NpzLogSink, CsvLogSink]
+    try:
+        import pyarrow  # noqa: F401
+        sink_types.append(ParquetLogSink)
+    except ImportError:
+        pass
+    return sink_types
+
+
+@pytest.mark.parametrize('Sink', get_sink_types())
+def test_log_sink_writes_chunks(tmp_path, Sink):
+    sink = Sink(str(tmp_path), chunk_rows=4)
+    for i in range(10):
+        sink.log(i, {'a': i * 1.5, 'foo': f'row{i}'})
+    assert len(sink.chunk_paths) == 2
+    assert len(sink._buffer) == 2
+    chunks = list(sink.read_chunks())
+    assert [len(c[ROW_INDEX_KEY]) for c in chunks] == [4, 4, 2]
+    assert list(chunks[1][ROW_INDEX_KEY]) == [4, 5, 6, 7]
+    rows = list(sink.read_rows())
+    assert rows[9] == {'a': 13.5, 'foo': 'row9'}
+    sink.close()
+    assert len(sink.chunk_paths) == 3
+
+
+def test_log_sink_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        LogSink(str(tmp_path))
+
+
+def test_log_sink_merges_values_in_row(tmp_path):
+    sink = NpzLogSink(str(tmp_path), chunk_rows=4)
+    sink.log(0, {'a': 1.0})
+    sink.log(0, {'b': 2.0})
+    sink.log(2, {'a': 3.0})
+    sink.flush()
+    rows = list(sink.read_rows())
+    assert rows[0] == {'a': 1.0, 'b': 2.0}
+    assert np.isnan(rows[1]['a'])
+    with pytest.raises(ValueError):
+        sink.log(1, {'a': 1.0})
+
+
+def test_log_sink_rejects_rows_before_buffer(tmp_path):
+    sink = NpzLogSink(str(tmp_path), chunk_rows=4)
+    sink.log(2, {'a': 1.0})
+    with pytest.raises(ValueError):
+        sink.log(1, {'a': 2.0})
+    sink.flush()
+    assert list(sink.read_rows()) == [{'a': 1.0}]
+
+
+def test_process_runner_log_sink(tmp_path):
+    state = Mock_Model_State_Shape(a=1.1, b=2.2, target='humbug')
+    processes = [
+        log_values(
+            state_inputs=lambda state: [
+                I(state.a, as_='a'),
+                I(state.target, as_='foo'),
+            ],
+        ),
+    ]
+    sink = NpzLogSink(str(tmp_path), chunk_rows=2)
+    process_runner = ProcessRunner(log_sink=sink)
+    process_runner.run_timeseries(processes, state, n_rows=5)
+    assert len(sink.chunk_paths) == 3
+    assert process_runner.state_logs == [{}]
+    assert list(process_runner.read_logs()) == [{'a': 1.1, 'foo': 'humbug'}] * 5
+
+
+def test_process_runner_read_logs_without_sink():
+    process_runner = ProcessRunner()
+    process_runner.run_processes([
+        log_values(state_inputs=lambda state: [I(state.a, as_='a')]),
+    ], Mock_Model_State_Shape(a=1.1, b=2.2))
+    assert list(process_runner.read_logs()) == [{'a': 1.1}]
@@ -1,6 +1,9 @@
+import numpy as np
+import pytest
+
 from proflow.Objects.Interface import I
 from proflow.Objects.Process import Process
-from proflow.logger import log_values
+from proflow.logger import ColumnarLogs, log_values
 from proflow.tests.mocks import Mock_Model_State_Shape
 from proflow.ProcessRunnerCls import ProcessRunner
 
@@ -115,3 +118,57 @@ def test_log_skip_row():
     assert process_runner.state_logs[0] == {'a': 1.1, 'foo': 'humbug'}
     assert process_runner.state_logs[1] == {}
     assert process_runner.state_logs[2] == {'a': 1.1, 'foo': 'humbug'}
+
+
+def test_columnar_logs():
+    logs = ColumnarLogs(chunk_size=4)
+    logs.log(0, {'a': 1.1, 'foo': 'humbug'})
+    logs.log(0, {'bar': 2})
+    logs.log(5, {'a': 3.3})
+    assert len(logs) == 6
+    assert logs.capacity == 8
+    assert logs[0] == {'a': 1.1, 'foo': 'humbug', 'bar': 2.0}
+    assert logs.columns['a'].dtype == np.float64
+    assert logs.columns['foo'].dtype == object
+    out = logs.as_dict()
+    assert len(out['a']) == 6
+    assert out['a'][5] == 3.3
+    assert np.isnan(out['a'][1])
+    assert out['foo'][5] is None
+    assert np.shares_memory(out['a'], logs.columns['a'])
+
+
+def test_columnar_logs_mixed_types():
+    logs = ColumnarLogs()
+    logs.log(0, {'a': 1.1})
+    logs.log(1, {'a': 'x'})
+    assert list(logs.as_dict()['a']) == [1.1, 'x']
+
+
+def test_columnar_logs_to_dataframe():
+    pd = pytest.importorskip('pandas')
+    logs = ColumnarLogs()
+    logs.log(0, {'a': 1.1})
+    logs.log(1, {'a': 2.2})
+    df = logs.to_dataframe()
+    assert isinstance(df, pd.DataFrame)
+    assert list(df['a']) == [1.1, 2.2]
+
+
+def test_log_values_columnar():
+    state = Mock_Model_State_Shape(a=1.1, b=2.2, target='humbug')
+    processes = [
+        log_values(
+            state_inputs=lambda state: [
+                I(state.a, as_='a'),
+                I(state.target, as_='foo'),
+            ],
+        ),
+    ]
+    process_runner = ProcessRunner(COLUMNAR_LOGS=True)
+    process_runner.run_timeseries(processes, state, n_rows=3)
+    assert isinstance(process_runner.state_logs, ColumnarLogs)
+    assert len(process_runner.state_logs) == 3
+    assert list(process_runner.state_logs) == [{'a': 1.1, 'foo': 'humbug'}] * 3
+    process_runner.reset()
+    assert len(process_runner.state_logs) == 0
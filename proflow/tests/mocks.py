@@ -1,6 +1,13 @@
 from dataclasses import dataclass, field
 from typing import List
 
+import numpy as np
+
+from proflow.ProcessRunnerCls import ProcessRunner
+from proflow.logger import log_values
+from proflow.Objects.Interface import I
+from proflow.Objects.Process import Process
+
 
 @dataclass
 class Mock_Nested_State:
@@ -57,3 +64,55 @@ class Mock_Parameters_Shape:
 class Mock_External_State_Shape:
     data_a: List[int] = field(default_factory=lambda: [1, 1, 2, 3])
     data_b: List[int] = field(default_factory=lambda: [5, 1, 2, 3])
+
+
+@dataclass
+class Mock_Array_State:
+    total: float = 0
+    nested: Mock_Nested_State = field(default_factory=Mock_Nested_State)
+    values: np.ndarray = field(default_factory=lambda: np.zeros(3))
+    names: List[str] = field(default_factory=lambda: ['a'])
+
+
+@dataclass
+class Mock_Series_External_State:
+    data: List[int] = field(default_factory=lambda: list(range(100)))
+
+
+def process_add(x, y):
+    return x + y
+
+
+def get_process_runner(external_state=None, **kwargs) -> ProcessRunner:
+    """Get a ProcessRunner with the mock config and parameters.
+
+    Uses Mock_External_State_Shape if external_state is not set.
+    """
+    return ProcessRunner(
+        Mock_Config_Shape(),
+        Mock_External_State_Shape() if external_state is None else external_state,
+        Mock_Parameters_Shape(),
+        **kwargs)
+
+
+def get_timeseries_processes() -> List[Process]:
+    """Get processes that add external_state.data_a at the row to state.a and log state.a."""
+    return [
+        Process(
+            func=lambda x, y: x + y,
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data_a[row_index], as_='x'),
+            ],
+            state_inputs=lambda state: [
+                I(state.a, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'a'),
+            ],
+        ),
+        log_values(
+            state_inputs=lambda state: [
+                I(state.a, as_='a'),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+import pytest
+
+from proflow.tests.demodata import DEMO_PROCESSES
+from proflow.process_inspector import PARSE_CACHE, ProflowParsingError, \
+    inspect_process_to_interfaces
+
+from ..parallel_inspector import inspect_processes_to_interfaces
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+DEMO_OUTPUTS = lambda result: [(result, 'a')]  # noqa: E731
+
+PROCESSES = DEMO_PROCESSES + [
+    Process(
+        func=lambda x: x,
+        config_inputs=lambda config: [I(config.foo, as_='x')],
+        state_outputs=DEMO_OUTPUTS,
+    ),
+]
+
+
+@pytest.mark.parametrize('max_workers', [0, 2])
+def test_inspect_processes_matches_serial(max_workers):
+    expected = [inspect_process_to_interfaces(p) for p in PROCESSES]
+    PARSE_CACHE.clear()
+    out = inspect_processes_to_interfaces(PROCESSES, max_workers=max_workers)
+    assert out == expected
+
+
+def test_inspect_processes_shares_module_ast():
+    PARSE_CACHE.clear()
+    inspect_processes_to_interfaces(PROCESSES, max_workers=0)
+    kinds = {kind for kind, _ in PARSE_CACHE._entries}
+    # The map functions are located in the module AST instead of parsing each source
+    assert 'ast' not in kinds
+    assert {'source', 'inputs', 'outputs'} <= kinds
+
+
+def test_inspect_processes_without_code():
+    process = Process(state_inputs=None, state_outputs=DEMO_OUTPUTS)
+    [out] = inspect_processes_to_interfaces([process], max_workers=0)
+    assert out.state_inputs is None
+    assert out.state_outputs == [I(from_='result', as_='state.a')]
+
+
+def test_inspect_processes_error():
+    namespace = {}
+    exec('state_inputs = lambda state: [state.a]', namespace)
+    process = Process(comment='bad process', state_inputs=namespace['state_inputs'])
+    with pytest.raises(ProflowParsingError):
+        inspect_process_to_interfaces(process)
+    with pytest.raises(ProflowParsingError, match='bad process'):
+        inspect_processes_to_interfaces([DEMO_PROCESSES[0], process], max_workers=0)
@@ -0,0 +1,124 @@
+import pickle
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from proflow.tests.mocks import Mock_Model_State_Shape, Mock_Nested_State, get_process_runner
+
+from ..process_cache import CacheSettings, ProcessCache, get_cache_settings, make_hashable
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def get_cached_process(func, cache=True):
+    return Process(
+        func=func,
+        cache=cache,
+        state_inputs=lambda state: [
+            I(state.ind, as_='x'),
+            I(state.matrix[0], as_='y'),
+        ],
+        state_outputs=lambda result: [
+            (result, 'c'),
+        ],
+    )
+
+
+def test_make_hashable():
+    assert make_hashable(np.array([1, 2])) == make_hashable(np.array([1, 2]))
+    assert make_hashable(np.array([1, 2])) != make_hashable(np.array([1.0, 2.0]))
+    assert make_hashable([1, {'a': [2]}]) == make_hashable([1, {'a': [2]}])
+    with pytest.raises(TypeError):
+        make_hashable(i for i in range(2))
+
+
+def test_make_hashable_uses_object_content():
+    nested = Mock_Nested_State()
+    key = make_hashable(nested)
+    assert key == make_hashable(Mock_Nested_State())
+    nested.na = 8
+    assert make_hashable(nested) != key
+    assert make_hashable(object.__new__(type('Unhashable', (), {'__hash__': None}))) is not None
+
+
+def test_process_cache_mutable_input():
+    func = MagicMock(side_effect=lambda nested: nested.na)
+    cache = ProcessCache()
+    nested = Mock_Nested_State()
+    assert cache.call(func, [nested], {}) == 7
+    nested.na = 8
+    assert cache.call(func, [nested], {}) == 8
+    assert cache.call(func, [Mock_Nested_State(na=8)], {}) == 8
+    assert func.call_count == 2
+
+
+def test_process_cache_unkeyable_input():
+    func = MagicMock(side_effect=lambda values: 1)
+    cache = ProcessCache()
+    values = (i for i in range(2))
+    assert cache.call(func, [values], {}) == 1
+    assert cache.call(func, [values], {}) == 1
+    assert func.call_count == 2
+    assert cache.info() == (0, 2, 0, cache.maxsize)
+
+
+def test_get_cache_settings():
+    assert get_cache_settings(True) == CacheSettings()
+    assert get_cache_settings(4).maxsize == 4
+    with pytest.raises(ValueError):
+        get_cache_settings(0)
+
+
+def test_process_cache_lru():
+    func = MagicMock(side_effect=lambda x: x * 2)
+    cache = ProcessCache(maxsize=2)
+    assert cache.call(func, [1], {}) == 2
+    assert cache.call(func, [2], {}) == 4
+    assert cache.call(func, [1], {}) == 2
+    assert cache.call(func, [3], {}) == 6
+    # 2 was the least recently used
+    assert cache.call(func, [2], {}) == 4
+    assert func.call_count == 4
+    assert cache.info() == (1, 4, 2, 2)
+
+
+def test_process_cache_key_fn():
+    func = MagicMock(side_effect=lambda x: x)
+    cache = ProcessCache(key_fn=lambda args, kwargs: round(args[0], 1))
+    cache.call(func, [np.float64(1.01)], {})
+    cache.call(func, [np.float64(1.02)], {})
+    assert func.call_count == 1
+
+
+def test_runner_cached_process():
+    func = MagicMock(side_effect=lambda x, y: x + sum(y))
+    process = get_cached_process(func)
+    process_runner = get_process_runner()
+    state = Mock_Model_State_Shape(a=1, b=2)
+    for ind in [0, 0, 1, 0]:
+        state.ind = ind
+        state = process_runner.run_processes([process], state)
+        assert state.c == ind + 6
+    assert func.call_count == 2
+    [info] = process_runner.cache_info().values()
+    assert (info.hits, info.misses) == (2, 2)
+
+
+@pytest.mark.parametrize('runner_kwargs', [{'DEBUG_MODE': True}, {'PROFILE_MODE': True}])
+def test_runner_cached_process_modes(runner_kwargs):
+    func = MagicMock(side_effect=lambda x, y: x + sum(y))
+    process = get_cached_process(func)
+    process_runner = get_process_runner(**runner_kwargs)
+    state = Mock_Model_State_Shape(a=1, b=2)
+    step = process_runner.compile([process])
+    for _ in range(3):
+        state = step(state)
+    assert func.call_count == 1
+
+
+def test_cached_process_pickles():
+    process = get_cached_process(lambda x, y: x, cache=CacheSettings(4, lambda a, k: a[0]))
+    loaded = pickle.loads(pickle.dumps(process))
+    assert loaded.cache.maxsize == 4
+    assert loaded.cache.key_fn([3], {}) == 3
@@ -0,0 +1,248 @@
+from timeit import repeat
+from unittest.mock import MagicMock
+
+from proflow.tests.mocks import Mock_Model_State_Shape, get_process_runner, process_add
+from proflow.ProcessRunnerCls import advance_time_step_process
+from proflow.logger import log_values
+from proflow.process_compiler import is_invariant_process
+from vendor.helpers.list_helpers import flatten_list
+
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def get_demo_processes():
+    return flatten_list([
+        Process(
+            func=process_add,
+            config_inputs=lambda config: [
+                I(config.foo, as_='x'),
+                I(config.bar, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        Process(
+            func=lambda *args, z=0: sum(args) + z,
+            args=[100],
+            config_inputs=lambda config: [
+                I(config.foo),
+            ],
+            state_inputs=lambda state: [
+                I(state.a),
+            ],
+            parameters_inputs=lambda parameters: [
+                I(parameters.bar, as_='z'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'nested.na'),
+            ],
+        ),
+        Process(
+            func=process_add,
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data_b[row_index], as_='x'),
+            ],
+            additional_inputs=lambda: [
+                I(10, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+        Process(
+            func=MagicMock(),
+            gate=False,
+        ),
+        Process(
+            func=lambda: [1, 2],
+            format_output=True,
+            state_outputs=lambda result: [
+                (result, 'lst'),
+            ],
+        ),
+        log_values(
+            state_inputs=lambda state: [
+                I(state.d, as_='d'),
+            ],
+        ),
+        advance_time_step_process(),
+        Process(
+            func=process_add,
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data_b[row_index], as_='x'),
+            ],
+            state_inputs=lambda state: [
+                I(state.d, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+    ])
+
+
+def test_compiled_processes_match_run_processes():
+    processes = get_demo_processes()
+    process_runner = get_process_runner()
+    state_expected = process_runner.run_processes(
+        processes, Mock_Model_State_Shape(a=2.1, b=4.1))
+    logs_expected = process_runner.state_logs
+
+    process_runner = get_process_runner()
+    step = process_runner.compile(processes)
+    state_out = step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert state_out == state_expected
+    assert state_out.nested.na == 100 + 1 + 2.1 + 3
+    assert state_out.d == 16
+    assert process_runner.state_logs == logs_expected
+    assert process_runner.current_state is state_out
+    assert process_runner.tm.row_index == 1
+    assert not processes[3].func.called
+
+
+def test_compiled_processes_multiline_comment():
+    process = Process(
+        func=process_add,
+        comment='add\rc\r\nand d\n',
+        config_inputs=lambda config: [I(config.foo, as_='x'), I(config.bar, as_='y')],
+        state_outputs=lambda result: [(result, 'c')],
+    )
+    step = get_process_runner().compile([process])
+    assert '# 0: add c and d\n' in step.__source__
+    assert step(Mock_Model_State_Shape(a=2.1, b=4.1)).c == 4
+
+
+def test_compiled_processes_debug_mode():
+    processes = get_demo_processes()
+    process_runner = get_process_runner(DEBUG_MODE=True)
+    step = process_runner.compile(processes)
+    state_out = step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert state_out.d == 16
+    assert [t[0] for t in process_runner.time_logs] == \
+        ['process_add', '<lambda>', 'process_add', '<lambda>', 'process_add']
+
+
+def test_compiled_processes_immutable_mode():
+    processes = get_demo_processes()
+    process_runner = get_process_runner(IMMUTABLE_MODE=True)
+    step = process_runner.compile(processes)
+    state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    state_out = step(state)
+    assert state_out.d == 16
+    assert state.d == 0
+
+
+def test_compiled_processes_are_faster():
+    processes = flatten_list([get_demo_processes()[0:3] for _ in range(20)])
+    process_runner = get_process_runner()
+    state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    run_processes = process_runner.initialize_processes(processes)
+    step = process_runner.compile(processes)
+    time_original = min(repeat(lambda: run_processes(initial_state=state), number=200, repeat=5))
+    time_compiled = min(repeat(lambda: step(state), number=200, repeat=5))
+    assert time_compiled < time_original
+
+
+def get_invariant_processes(func_invariant):
+    return [
+        Process(
+            func=func_invariant,
+            config_inputs=lambda config: [
+                I(config.foo, as_='x'),
+                I(config.bar, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        Process(
+            func=func_invariant,
+            additional_inputs=lambda: [
+                I(1, as_='x'),
+                I(2, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+        Process(
+            func=process_add,
+            state_inputs=lambda state: [
+                I(state.c, as_='x'),
+                I(state.d, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+    ]
+
+
+def test_is_invariant_process():
+    processes = get_demo_processes()
+    assert is_invariant_process(processes[0])
+    assert not is_invariant_process(processes[1])
+    assert not is_invariant_process(processes[3])
+    assert is_invariant_process(
+        Process(func=process_add, pure=True, external_state_inputs=lambda e, i: []))
+    assert not is_invariant_process(Process(func=process_add, pure=False))
+    # Processes that read the state are never hoisted
+    assert not is_invariant_process(
+        Process(func=process_add, pure=True, state_inputs=lambda s: [I(s.a, as_='x')]))
+
+
+def test_compiled_processes_hoist_invariants():
+    func_invariant = MagicMock(side_effect=process_add)
+    processes = get_invariant_processes(func_invariant)
+    process_runner = get_process_runner()
+    step = process_runner.compile(processes, hoist_invariants=True)
+    assert func_invariant.call_count == 2
+    state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    for _ in range(3):
+        state = step(state)
+    assert func_invariant.call_count == 2
+    # c is written once and d is replayed as it is overwritten
+    assert 'if 0 in write_once_pending' in step.__source__
+    assert 'if 1 in write_once_pending' not in step.__source__
+    assert state.c == 4
+    assert state.d == 7
+
+    state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    state = step(state)
+    assert state.c == 0
+    step.reset_hoisted()
+    state = step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert state.c == 4
+
+
+def test_compiled_processes_hoist_invariants_copies_replayed_outputs():
+    processes = [
+        Process(
+            func=lambda: [0, 0],
+            state_outputs=lambda result: [(result, 'lst')],
+        ),
+        Process(
+            func=lambda x: x + 1,
+            state_inputs=lambda state: [I(state.lst[0], as_='x')],
+            state_outputs=lambda result: [(result, 'lst.0')],
+        ),
+    ]
+    process_runner = get_process_runner()
+    step = process_runner.compile(processes, hoist_invariants=True)
+    state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    for _ in range(3):
+        state = step(state)
+        assert state.lst == [1, 0]
+
+
+def test_compiled_processes_hoist_invariants_matches_run_processes():
+    processes = get_demo_processes()
+    process_runner = get_process_runner()
+    state_expected = process_runner.run_processes(
+        processes, Mock_Model_State_Shape(a=2.1, b=4.1))
+
+    process_runner = get_process_runner()
+    step = process_runner.compile(processes, hoist_invariants=True)
+    assert step(Mock_Model_State_Shape(a=2.1, b=4.1)) == state_expected
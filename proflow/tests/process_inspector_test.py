@@ -1,7 +1,9 @@
 """Tests for the process inspector."""
 
 import ast
+import os
 import pytest
+from unittest.mock import patch
 from proflow.process_inspector import (
     inspect_process,
     parse_arg,
@@ -13,6 +15,10 @@ from proflow.process_inspector import (
     extract_output_lines,
     strip_out_comments,
     reset_id,
+    parse_state_reads,
+    parse_state_writes,
+    PARSE_CACHE,
+    ParseCache,
 )
 
 from proflow.Objects.Interface import I
@@ -679,3 +685,86 @@ class TestParseArg:
             ])
         out = parse_arg(attr)
         assert out == (['foo,bar'], {"op": "And"})
+
+
+def test_parse_state_reads():
+    DEMO_INPUTS = lambda state: [  # noqa: E731
+        I(state.a, as_='x'),
+        I(lget(state.matrix[0], state.ind)),
+        I(state.nested.na + state.lst[2], as_='y'),
+        I(state.nested_lst_obj[state.ind].na, as_='z'),
+    ]
+    out = parse_state_reads(DEMO_INPUTS)
+    assert out == {'a', 'matrix.0', 'ind', 'nested.na', 'lst.2', 'nested_lst_obj'}
+
+
+def test_parse_state_reads_whole_state():
+    DEMO_INPUTS = lambda state: [  # noqa: E731
+        I(state, as_='x'),
+    ]
+    assert parse_state_reads(DEMO_INPUTS) == {''}
+
+
+def test_parse_state_writes():
+    DEMO_OUTPUTS = lambda result: [  # noqa: E731
+        (result, 'a'),
+        (result[0], 'nested.na'),
+        (result, 'lst.+'),
+    ]
+    assert parse_state_writes(DEMO_OUTPUTS) == {'a', 'nested.na', 'lst'}
+
+
+def test_parse_state_writes_lambda_inside_process_call():
+    processes = [
+        Process(
+            func=lget,
+            state_outputs=lambda result: [
+                (result, 'a'),
+                (result, 'nested.na')]),
+    ]
+    assert parse_state_writes(processes[0].state_outputs) == {'a', 'nested.na'}
+
+
+def test_parse_state_writes_unknown():
+    DEMO_OUTPUTS = lambda result: [  # noqa: E731
+        (result[iL], f'foo.{iL}.bar')
+        for iL in range(3)
+    ]
+    assert parse_state_writes(DEMO_OUTPUTS) is None
+
+
+class TestParseCache:
+
+    def test_parse_cache_hits(self):
+        PARSE_CACHE.clear()
+        with patch('proflow.process_inspector.inspect.getsource',
+                   wraps=__import__('inspect').getsource) as getsource:
+            out_a = DEMO_PROCESS.human()
+            source_reads = getsource.call_count
+            out_b = DEMO_PROCESS.human()
+            inspect_process(DEMO_PROCESS)
+            inspect_process_to_interfaces(DEMO_PROCESS)
+        assert out_a == out_b
+        assert getsource.call_count == source_reads
+        info = PARSE_CACHE.info()
+        assert info.hits > info.misses
+
+    def test_parse_cache_results_are_copies(self):
+        out = parse_inputs(DEMO_PROCESS.state_inputs)
+        out['foo'] = 'bar'
+        assert parse_inputs(DEMO_PROCESS.state_inputs) == {'y': 'state.a'}
+
+    def test_parse_cache_invalidated_on_file_change(self, tmp_path):
+        cache = ParseCache()
+        source_file = tmp_path / 'demo.py'
+        source_file.write_text('fn = lambda: None\n')
+        namespace = {}
+        exec(compile(source_file.read_text(), str(source_file), 'exec'), namespace)
+        fn = namespace['fn']
+        parse = lambda f: object()  # noqa: E731
+        first = cache.get('kind', fn, parse)
+        assert cache.get('kind', fn, parse) is first
+        mtime = os.stat(source_file).st_mtime
+        os.utime(source_file, (mtime, mtime + 1))
+        assert cache.get('kind', fn, parse) is not first
+        assert cache.info() == (1, 2, 1)
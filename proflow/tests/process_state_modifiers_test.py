@@ -1,9 +1,13 @@
+from dataclasses import dataclass, field
 from timeit import repeat
+from types import SimpleNamespace
+from unittest.mock import patch
 import numpy as np
 
-from .mocks import Mock_Model_State_Shape
+from .mocks import Mock_Model_State_Shape, Mock_Nested_State
 from ..Objects.Interface import I
 from ..Objects.Process import Process
+from ..ProcessRunnerCls import ProcessRunner
 from proflow.process_state_modifiers import build_up_args, get_new_val_fn, replace_state_val, \
     map_result_to_state_fn
 
@@ -36,6 +40,33 @@ def test_get_new_val_list_append():
     assert len(attr) < len(new_obj)
 
 
+def test_get_new_val_object():
+    attr = SimpleNamespace(foo=1, bar=2)
+    new_obj = get_new_val_fn(attr, {'foo': 99})
+    assert new_obj.foo == 99
+    assert new_obj.bar == 2
+    assert attr.foo == 1
+
+
+def test_get_new_val_dataclass_init_false_field():
+    @dataclass
+    class WithDerived:
+        foo: int = 1
+        derived: list = field(init=False)
+        post_init_calls: int = field(init=False, default=0)
+
+        def __post_init__(self):
+            self.derived = [self.foo]
+            self.post_init_calls += 1
+
+    attr = WithDerived()
+    new_obj = get_new_val_fn(attr, {'foo': 99})
+    assert new_obj.foo == 99
+    assert new_obj.derived is attr.derived
+    assert new_obj.post_init_calls == 1
+    assert attr.foo == 1
+
+
 def test_build_up_args():
     state = {
         'abc': {
@@ -113,3 +144,104 @@ def test_map_result_to_state_fn():
     # assert prev_state.nested.na == Mock_Model_State_Shape(a=2.1, b=4.1).nested.na
     # assert prev_state.nested.na == 7
     assert state_out.nested.na == 'zzz'
+
+
+def test_replace_state_val_shares_unmodified_state():
+    prev_state = Mock_Model_State_Shape(a=2.1, b=4.1, lst=[[1, 2], [3, 4]])
+    new_state = replace_state_val(prev_state, 'lst.0.1', 99)
+    assert new_state.lst == [[1, 99], [3, 4]]
+    assert prev_state.lst == [[1, 2], [3, 4]]
+    # Only the objects on the target path are copied
+    assert new_state.lst is not prev_state.lst
+    assert new_state.lst[1] is prev_state.lst[1]
+    assert new_state.nested is prev_state.nested
+    assert new_state.matrix is prev_state.matrix
+
+
+def test_immutable_mode_shares_unmodified_state():
+    process_runner = ProcessRunner(IMMUTABLE_MODE=True)
+    processes = [
+        Process(
+            func=lambda x: x + 1,
+            state_inputs=lambda state: [
+                I(state.nested.na, as_='x'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'nested.na'),
+                (result, 'matrix.1.2'),
+            ],
+        ),
+    ]
+    prev_state = Mock_Model_State_Shape(a=2.1, b=4.1, matrix=[np.zeros(3), np.zeros(3)])
+    new_state = process_runner.run_processes(processes, prev_state)
+    assert new_state.nested.na == 8
+    assert new_state.matrix[1][2] == 8
+    assert prev_state.nested.na == 7
+    assert prev_state.matrix[1][2] == 0
+    assert new_state.matrix[0] is prev_state.matrix[0]
+    assert new_state.nested_lst_obj is prev_state.nested_lst_obj
+    compiled_state = process_runner.compile(processes)(prev_state)
+    assert compiled_state.nested.na == 8
+    assert compiled_state.matrix[1][2] == 8
+    assert prev_state.nested.na == 7
+    assert prev_state.matrix[1][2] == 0
+
+
+def test_map_result_to_state_fn_copies_each_parent_once():
+    prev_state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    with patch('proflow.process_state_modifiers.get_new_val_fn', wraps=get_new_val_fn) as spy:
+        state_out = map_result_to_state_fn(
+            prev_state,
+            lambda result: [
+                (result, 'nested.na'),
+                (result + 1, 'nested.nab'),
+                (result, 'a'),
+                (result, 'nested_lst_obj.1.na'),
+            ],
+            10,
+        )
+    # root, nested, nested_lst_obj, nested_lst_obj.1
+    assert spy.call_count == 4
+    assert state_out.nested.na == 10
+    assert state_out.nested.nab == 11
+    assert state_out.a == 10
+    assert state_out.nested_lst_obj[1].na == 10
+    assert state_out.nested_lst_obj[0] is prev_state.nested_lst_obj[0]
+    assert prev_state.nested.na == 7
+
+
+def test_map_result_to_state_fn_keeps_output_order():
+    prev_state = Mock_Model_State_Shape(a=2.1, b=4.1, lst=[1, 2])
+    state_out = map_result_to_state_fn(
+        prev_state,
+        lambda result: [
+            (Mock_Nested_State(1, 2), 'nested'),
+            (result, 'nested.na'),
+            (result, 'lst.+'),
+            (result + 1, 'lst.+'),
+            (result, 'lst.0'),
+        ],
+        10,
+    )
+    assert state_out.nested == Mock_Nested_State(10, 2)
+    assert state_out.lst == [10, 2, 10, 11]
+    assert prev_state.lst == [1, 2]
+
+
+def test_immutable_mode_non_dataclass_state():
+    process_runner = ProcessRunner(IMMUTABLE_MODE=True)
+    processes = [
+        Process(
+            func=lambda x: x + 1,
+            state_inputs=lambda state: [I(state.inner.foo, as_='x')],
+            state_outputs=lambda result: [(result, 'inner.foo')],
+        ),
+    ]
+    prev_state = SimpleNamespace(inner=SimpleNamespace(foo=1), other=SimpleNamespace(bar=2))
+    new_state = process_runner.run_processes(processes, prev_state)
+    assert new_state.inner.foo == 2
+    assert prev_state.inner.foo == 1
+    assert new_state.other is prev_state.other
+    compiled_state = process_runner.compile(processes)(prev_state)
+    assert compiled_state.inner.foo == 2
+    assert prev_state.inner.foo == 1
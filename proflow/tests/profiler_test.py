@@ -0,0 +1,90 @@
+import pytest
+
+from proflow.tests.mocks import Mock_Model_State_Shape, get_process_runner, process_add
+
+from ..profiler import ProcessStats, get_process_id
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def get_processes():
+    return [
+        Process(
+            func=process_add,
+            config_inputs=lambda config: [
+                I(config.foo, as_='x'),
+                I(config.bar, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        Process(
+            func=process_add,
+            comment='add d',
+            state_inputs=lambda state: [
+                I(state.c, as_='x'),
+                I(state.a, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+    ]
+
+
+def test_process_stats_record():
+    stats = ProcessStats('foo')
+    stats.record(1, 10, 2)
+    stats.record(3, 4, 5)
+    assert stats.count == 2
+    assert stats.total_ns == 14
+    assert stats.min_ns == 4
+    assert stats.max_ns == 10
+    assert stats.input_ns == 4
+    assert stats.output_ns == 7
+    assert stats.mean_ns == 7
+
+
+def test_get_process_id():
+    process_a, process_b = get_processes()
+    assert get_process_id(process_a).startswith('process_add (')
+    assert get_process_id(process_b).startswith('add d (')
+    assert get_process_id(process_a) == get_process_id(get_processes()[0])
+
+
+def test_profile_mode():
+    processes = get_processes()
+    process_runner = get_process_runner(PROFILE_MODE=True)
+    state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    for _ in range(3):
+        state = process_runner.run_processes(processes, state)
+    assert state.d == 4 + 2.1
+    assert process_runner.time_logs == []
+    stats = process_runner.process_stats[get_process_id(processes[1])]
+    assert stats.count == 3
+    assert stats.min_ns <= stats.max_ns <= stats.total_ns
+    assert len(process_runner.process_stats) == 2
+    process_runner.reset_logs()
+    assert process_runner.process_stats == {}
+
+
+def test_profile_mode_compiled():
+    processes = get_processes()
+    process_runner = get_process_runner(PROFILE_MODE=True)
+    step = process_runner.compile(processes)
+    state = step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert state.d == 4 + 2.1
+    assert all(s.count == 1 for s in process_runner.process_stats.values())
+
+
+def test_profile_mode_sample_rate():
+    processes = get_processes()
+    process_runner = get_process_runner(PROFILE_MODE=True, profile_sample_rate=0.25)
+    state = Mock_Model_State_Shape(a=2.1, b=4.1)
+    for _ in range(8):
+        state = process_runner.run_processes(processes, state)
+    assert [s.count for s in process_runner.process_stats.values()] == [2, 2]
+    assert [s.call_count for s in process_runner.process_stats.values()] == [8, 8]
+    with pytest.raises(ValueError):
+        get_process_runner(profile_sample_rate=0)
@@ -0,0 +1,95 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from proflow.tests.mocks import Mock_Model_State_Shape, get_process_runner, \
+    get_timeseries_processes
+from proflow.ProcessRunnerCls import advance_time_step_process
+
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def test_run_timeseries():
+    process_runner = get_process_runner()
+    state_out = process_runner.run_timeseries(
+        get_timeseries_processes(), Mock_Model_State_Shape(a=0, b=0), n_rows=4)
+    assert state_out.a == 1 + 1 + 2 + 3
+    assert process_runner.tm.row_index == 4
+    assert process_runner.tm.hour == 4
+    assert process_runner.current_state is state_out
+    assert [r['a'] for r in process_runner.state_logs] == [1, 2, 4, 7]
+
+
+def test_run_timeseries_matches_run_processes():
+    process_runner = get_process_runner()
+    processes = get_timeseries_processes() + [advance_time_step_process()]
+    state = Mock_Model_State_Shape(a=0, b=0)
+    for _ in range(4):
+        state = process_runner.run_processes(processes, state)
+
+    process_runner_b = get_process_runner()
+    state_b = process_runner_b.run_timeseries(
+        get_timeseries_processes(), Mock_Model_State_Shape(a=0, b=0), n_rows=4)
+    assert state_b == state
+    assert process_runner_b.state_logs == process_runner.state_logs
+    assert process_runner_b.tm.row_index == process_runner.tm.row_index
+
+
+def test_run_timeseries_in_chunks():
+    process_runner = get_process_runner()
+    state = process_runner.run_timeseries(
+        get_timeseries_processes(), Mock_Model_State_Shape(a=0, b=0), row_range=(0, 2))
+    assert state.a == 2
+    state = process_runner.run_timeseries(get_timeseries_processes(), row_range=(2, 4))
+    assert state.a == 7
+    assert process_runner.tm.row_index == 4
+
+
+def test_run_timeseries_skip_to_row():
+    process_runner = get_process_runner()
+    state = process_runner.run_timeseries(
+        get_timeseries_processes(), Mock_Model_State_Shape(a=0, b=0), row_range=(2, 4))
+    assert state.a == 5
+    assert process_runner.tm.row_index == 4
+    with pytest.raises(ValueError):
+        process_runner.run_timeseries(get_timeseries_processes(), row_range=(0, 2))
+    with pytest.raises(ValueError):
+        process_runner.run_timeseries(get_timeseries_processes())
+
+
+def test_run_timeseries_hoist_invariants():
+    func_invariant = MagicMock(side_effect=lambda x: x * 10)
+    processes = [
+        Process(
+            func=func_invariant,
+            config_inputs=lambda config: [
+                I(config.foo, as_='x'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        *get_timeseries_processes(),
+    ]
+    process_runner = get_process_runner()
+    state = process_runner.run_timeseries(
+        processes, Mock_Model_State_Shape(a=0, b=0), n_rows=4, hoist_invariants=True)
+    assert func_invariant.call_count == 1
+    assert state.c == 10
+    assert state.a == 7
+
+
+def test_run_timeseries_falsy_initial_state():
+    processes = [
+        Process(
+            func=lambda: 1,
+            state_outputs=lambda result: [(result, 'a')],
+        ),
+    ]
+    process_runner = get_process_runner()
+    process_runner.current_state = {'a': 0, 'previous': True}
+    state = process_runner.run_timeseries(processes, {}, n_rows=2)
+    assert state == {'a': 1}
+    process_runner.record_baseline(processes, {}, n_rows=2)
+    assert process_runner.baseline.initial_state == {}
@@ -0,0 +1,208 @@
+from threading import Barrier
+from unittest.mock import MagicMock
+
+import pytest
+
+from proflow.tests.mocks import Mock_Model_State_Shape, get_process_runner, process_add
+from proflow.ProcessRunnerCls import advance_time_step_process
+from proflow.errors import Run_Process_Error
+from proflow.logger import log_values
+
+from ..scheduler import build_levels, paths_overlap
+from ..Objects.Process import Process
+from ..Objects.Interface import I
+
+
+def get_processes():
+    return [
+        # 0
+        Process(
+            func=process_add,
+            config_inputs=lambda config: [
+                I(config.foo, as_='x'),
+            ],
+            state_inputs=lambda state: [
+                I(state.a, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        # 1: independent of 0
+        Process(
+            func=process_add,
+            state_inputs=lambda state: [
+                I(state.b, as_='x'),
+                I(state.nested.na, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+        # 2: reads outputs of 0 and 1
+        Process(
+            func=process_add,
+            state_inputs=lambda state: [
+                I(state.c, as_='x'),
+                I(state.d, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'nested.nab'),
+            ],
+        ),
+        # 3: writes a key that 1 reads
+        Process(
+            func=lambda: 100,
+            state_outputs=lambda result: [
+                (result, 'nested.na'),
+            ],
+        ),
+        # 4: overlapping output with 0
+        Process(
+            func=lambda x: x * 2,
+            state_inputs=lambda state: [
+                I(state.matrix[state.ind][0], as_='x'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        log_values(
+            state_inputs=lambda state: [
+                I(state.c, as_='c'),
+            ],
+        ),
+        Process(
+            func=lambda: 1,
+            gate=False,
+        ),
+    ]
+
+
+def test_paths_overlap():
+    assert paths_overlap('a', 'a')
+    assert paths_overlap('nested', 'nested.na')
+    assert paths_overlap('', 'a')
+    assert not paths_overlap('nested.na', 'nested.nab')
+    assert not paths_overlap('a', 'ab')
+
+
+def test_build_levels():
+    levels = build_levels(get_processes())
+    # 4 overwrites c so must wait for 2 to read it
+    assert levels == [[0, 1], [2, 3], [4], [5]]
+
+
+def test_parallel_scheduler_matches_run_processes():
+    processes = get_processes()
+    process_runner = get_process_runner()
+    state_expected = process_runner.run_processes(
+        processes, Mock_Model_State_Shape(a=2.1, b=4.1))
+    logs_expected = process_runner.state_logs
+
+    process_runner = get_process_runner()
+    with process_runner.schedule(processes) as step:
+        state_out = step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert state_out == state_expected
+    assert state_out.c == 2
+    assert process_runner.state_logs == logs_expected
+
+
+def test_parallel_scheduler_runs_level_concurrently():
+    # Both processes must be waiting on the barrier at the same time
+    barrier = Barrier(2, timeout=5)
+
+    def wait_then_return(val):
+        barrier.wait()
+        return val
+
+    processes = [
+        Process(
+            func=lambda: wait_then_return(1),
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        Process(
+            func=lambda: wait_then_return(2),
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+    ]
+    process_runner = get_process_runner()
+    with process_runner.schedule(processes, max_workers=2) as step:
+        state_out = step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert (state_out.c, state_out.d) == (1, 2)
+
+
+def test_parallel_scheduler_time_process_is_barrier():
+    processes = [
+        Process(
+            func=process_add,
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data_b[row_index], as_='x'),
+                I(0, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'c'),
+            ],
+        ),
+        advance_time_step_process(),
+        Process(
+            func=process_add,
+            external_state_inputs=lambda e_state, row_index: [
+                I(e_state.data_b[row_index], as_='x'),
+                I(0, as_='y'),
+            ],
+            state_outputs=lambda result: [
+                (result, 'd'),
+            ],
+        ),
+    ]
+    process_runner = get_process_runner()
+    with process_runner.schedule(processes) as step:
+        assert len(step.levels) == 3
+        state_out = step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert (state_out.c, state_out.d) == (5, 1)
+
+
+def get_independent_processes(**kwargs):
+    return [
+        Process(
+            func=MagicMock(side_effect=process_add),
+            config_inputs=lambda config: [I(config.foo, as_='x')],
+            state_inputs=lambda state: [I(state.a, as_='y')],
+            state_outputs=lambda result: [(result, 'c')],
+            **kwargs,
+        ),
+        Process(
+            func=MagicMock(side_effect=process_add),
+            state_inputs=lambda state: [I(state.b, as_='x'), I(state.nested.na, as_='y')],
+            state_outputs=lambda result: [(result, 'd')],
+            **kwargs,
+        ),
+    ]
+
+
+def test_parallel_scheduler_uses_process_cache():
+    processes = get_independent_processes(cache=True)
+    process_runner = get_process_runner()
+    with process_runner.schedule(processes) as step:
+        assert step.levels == [[0, 1]]
+        state = Mock_Model_State_Shape(a=2.1, b=4.1)
+        for _ in range(3):
+            state = step(state)
+    assert (state.c, state.d) == (3.1, 11.1)
+    assert [p.func.call_count for p in processes] == [1, 1]
+    assert [info.hits for info in process_runner.cache_info().values()] == [2, 2]
+
+
+def test_parallel_scheduler_debug_mode():
+    processes = get_independent_processes()
+    processes[1].func.side_effect = ValueError('bad')
+    process_runner = get_process_runner(DEBUG_MODE=True)
+    with process_runner.schedule(processes) as step:
+        with pytest.raises(Run_Process_Error):
+            step(Mock_Model_State_Shape(a=2.1, b=4.1))
+    assert len(process_runner.time_logs) == 1
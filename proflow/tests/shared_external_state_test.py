@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+import pickle
+
+import numpy as np
+import pytest
+
+from proflow.tests.mocks import Mock_Config_Shape, Mock_Model_State_Shape, \
+    Mock_Parameters_Shape, get_timeseries_processes
+
+from ..ensemble import EnsembleRunner
+from ..shared_external_state import SharedExternalStateHandle, attach_external_state, \
+    publish_external_state
+
+
+@dataclass(frozen=True)
+class Mock_Array_External_State:
+    data_a: np.ndarray = field(default_factory=lambda: np.arange(24, dtype=np.float64))
+    data_b: np.ndarray = field(default_factory=lambda: np.ones((24, 2), dtype=np.int32))
+    site: str = 'foo'
+
+
+def test_publish_and_attach_external_state():
+    external_state = Mock_Array_External_State()
+    with publish_external_state(external_state) as shared:
+        handle = pickle.loads(pickle.dumps(shared.handle))
+        assert isinstance(handle, SharedExternalStateHandle)
+        assert set(handle.arrays) == {'data_a', 'data_b'}
+        attached = attach_external_state(handle)
+        assert isinstance(attached, Mock_Array_External_State)
+        assert attached.site == 'foo'
+        assert np.array_equal(attached.data_a, external_state.data_a)
+        assert attached.data_b.dtype == np.int32
+        assert attached.data_b.shape == (24, 2)
+        assert not np.shares_memory(attached.data_a, external_state.data_a)
+        with pytest.raises(ValueError):
+            attached.data_a[0] = 1
+
+
+def test_shared_external_state_in_ensemble():
+    external_state = Mock_Array_External_State()
+    with publish_external_state(external_state) as shared:
+        ensemble = EnsembleRunner(get_timeseries_processes, n_rows=24, max_workers=2)
+        results = ensemble.run([
+            (Mock_Config_Shape(), Mock_Parameters_Shape(), shared.handle,
+             Mock_Model_State_Shape(a=i, b=0))
+            for i in range(4)
+        ])
+    assert [r.state.a for r in results] == [i + sum(range(24)) for i in range(4)]